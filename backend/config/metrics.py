@@ -0,0 +1,233 @@
+# config/metrics.py
+import threading
+import time
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 기본 구간 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                    for name, value in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """메트릭 공통 부분 (라벨 값 조합마다 값을 따로 저장)"""
+    TYPE = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """라벨 값이 정해진 메트릭 반환 (labels("detect").observe(...))"""
+        return _Bound(self, tuple(str(v) for v in values))
+
+    def _header(self):
+        documentation = self.documentation.replace("\\", "\\\\").replace("\n", "\\n")  # HELP 줄 이스케이프
+        return [f"# HELP {self.name} {documentation}", f"# TYPE {self.name} {self.TYPE}"]
+
+
+class _Bound:
+    def __init__(self, metric, key):
+        self.metric = metric
+        self.key = key
+
+    def __getattr__(self, attr):
+        method = getattr(self.metric, attr)
+        return lambda *args, **kwargs: method(*args, key=self.key, **kwargs)
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    TYPE = "counter"
+
+    def inc(self, amount=1, key=()):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """현재 값 게이지 (set_function으로 수집 시점에 값을 계산할 수도 있음)"""
+    TYPE = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, key=()):
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """수집 시점에 호출할 함수 등록 -> 숫자 또는 {라벨 값 튜플: 숫자}"""
+        self._function = function
+
+    def collect(self):
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        if self._function is not None:
+            try:
+                value = self._function()
+                items = list(value.items()) if isinstance(value, dict) else [((), value)]
+            except Exception as e:
+                print(f"⚠️ 메트릭 {self.name} 수집 오류: {e}")
+        for key, value in items:
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """지연 시간 히스토그램 (구간별 누적 개수 + 합계 + 개수)"""
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, key=()):
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, key=()):
+        """with 블록 실행 시간 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, key=key)
+
+    def collect(self):
+        lines = self._header()
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Prometheus 텍스트 형식으로 내보내는 메트릭 저장소
+    - 같은 이름으로 다시 만들면 기존 메트릭을 반환 (모듈을 여러 번 import해도 안전)
+    - 모든 메트릭은 스레드 안전 (카메라/분석/스트림 스레드에서 바로 기록)
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """텍스트 노출 형식 (text/plain; version=0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+# 싱글톤 인스턴스 생성
+registry = MetricsRegistry()
+
+def get_registry():
+    """메트릭 저장소 인스턴스 반환"""
+    return registry
+
+
+# ✅ 공통 메트릭 정의 (서비스들이 import해서 바로 기록)
+CAMERA_READ_SECONDS = registry.histogram(
+    "dms_camera_read_seconds", "프레임당 카메라 읽기 시간 (VideoCapture.read)", ("source",))
+PIPELINE_STAGE_SECONDS = registry.histogram(
+    "dms_pipeline_stage_seconds", "모니터링 파이프라인 단계별 프레임당 처리 시간", ("stage",))
+STREAM_ENCODE_SECONDS = registry.histogram(
+    "dms_stream_encode_seconds", "스트림 프레임당 JPEG 인코딩 시간")
+MDE_INFERENCE_SECONDS = registry.histogram(
+    "dms_mde_inference_seconds", "깊이 추정(MDE) 모델 추론 시간")
+MILVUS_SEARCH_SECONDS = registry.histogram(
+    "dms_milvus_search_seconds", "Milvus 얼굴 벡터 검색 시간")
+MYSQL_QUERY_SECONDS = registry.histogram(
+    "dms_mysql_query_seconds", "MySQL 쿼리 시간")
+DROPPED_FRAMES = registry.counter(
+    "dms_dropped_frames_total", "소비자에게 전달되기 전에 버려진 프레임 수", ("where",))
+WEBSOCKET_DROPPED_MESSAGES = registry.counter(
+    "dms_websocket_dropped_messages_total", "송신 큐가 가득 차서 버린 WebSocket 메시지 수")
+WEBSOCKET_QUEUE_DEPTH = registry.gauge(
+    "dms_websocket_queue_depth", "WebSocket 송신 큐에서 대기 중인 메시지 수", ("topic",))
+WEBSOCKET_CONNECTIONS = registry.gauge(
+    "dms_websocket_connections", "열려 있는 WebSocket 연결 수", ("topic",))
+MODEL_MEMORY_BYTES = registry.gauge(
+    "dms_model_memory_bytes", "로드된 모델별 대략적인 메모리 크기 (바이트)", ("model",))
+MODEL_LOADED = registry.gauge(
+    "dms_model_loaded", "등록된 모델 로드 여부 (로드됨 1, 아니면 0)", ("model",))
+FRAME_POOL_ALLOCATIONS = registry.counter(
+    "dms_frame_pool_allocations_total", "풀에 남는 버퍼가 없어서 새로 할당한 프레임 버퍼 수", ("pool",))
+CAMERA_FRAME_AGE_SECONDS = registry.histogram(
+    "dms_camera_frame_age_seconds", "프레임 캡처부터 소비자에게 전달될 때까지 걸린 시간", ("source",))
+MONITORING_IDLE = registry.gauge(
+    "dms_monitoring_idle", "얼굴이 없어서 모니터링 세션이 저주기(idle) 모드인지 여부 (idle 1, 아니면 0)", ("session",))
+MONITORING_ANALYZED_FRAMES = registry.counter(
+    "dms_monitoring_analyzed_frames_total", "모니터링 루프가 분석한 프레임 수", ("session", "mode"))
+MONITORING_SHED_STAGES = registry.counter(
+    "dms_monitoring_shed_stages_total", "프레임 기한을 넘겨서 건너뛴 부가 단계 (오버레이 / 인코딩) 수", ("session", "stage"))
+MONITORING_ALERT_LATENCY_SECONDS = registry.histogram(
+    "dms_monitoring_alert_latency_seconds", "프레임 캡처부터 분석과 상태 발행이 끝날 때까지 걸린 시간", ("session",))
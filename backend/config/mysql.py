@@ -1,5 +1,16 @@
 # MySQL 데이터베이스 연결 설정
 import pymysql
+import pymysql.cursors
+
+from config.metrics import MYSQL_QUERY_SECONDS
+
+
+class TimedCursor(pymysql.cursors.Cursor):
+    """쿼리 실행 시간을 메트릭으로 기록하는 커서"""
+    def execute(self, query, args=None):
+        with MYSQL_QUERY_SECONDS.time():
+            return super().execute(query, args)
+
 
 mysql_config = {
     'host': 'project-db-campus.smhrd.com',
@@ -7,4 +18,5 @@ mysql_config = {
     'user': 'campus_24IS_IOT2_p3_3',    # 데이터베이스 사용자 이름
     'password': 'smhrd3', # 데이터베이스 비밀번호
     'db': 'campus_24IS_IOT2_p3_3',  # 데이터베이스 이름
-}
\ No newline at end of file
+    'cursorclass': TimedCursor,  # 쿼리 시간 측정 (/metrics)
+}
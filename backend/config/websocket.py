@@ -1,38 +1,193 @@
 # config/websocket.py
+import asyncio
+import json
+from collections import deque
 from fastapi import WebSocket
-from typing import List
+from typing import Dict, List, Set
+
+from config.metrics import WEBSOCKET_DROPPED_MESSAGES, WEBSOCKET_QUEUE_DEPTH, WEBSOCKET_CONNECTIONS
+
+# 토픽 이름 (엔드포인트별로 구독하는 메시지 종류)
+DEFAULT_TOPIC = "default"  # /ws
+MONITORING_TOPIC = "monitoring"  # /monitoring/ws
+FACE_STATUS_TOPIC = "face-status"  # /login/ws/face-status
+
+# 송신 큐가 가득 찼을 때의 정책
+DROP_OLDEST = "drop_oldest"  # 가장 오래된 메시지를 버리고 새 메시지 추가
+LATEST = "latest"  # 대기 중인 메시지를 모두 버리고 최신 메시지만 유지
+DISCONNECT = "disconnect"  # 따라오지 못하는 클라이언트 연결 종료
+
+
+class ClientConnection:
+    """
+    WebSocket 연결 하나의 송신 큐 + 전송 태스크
+    - put()은 큐에 넣고 바로 반환, 실제 전송은 연결마다 있는 writer 태스크가 수행
+    - 느린 클라이언트는 자기 큐만 밀리고 다른 클라이언트 전송에는 영향 없음
+    """
+    def __init__(self, websocket: WebSocket, queue_size=32, policy=DROP_OLDEST, on_close=None):
+        self.websocket = websocket
+        self.queue_size = queue_size
+        self.policy = policy
+        self.on_close = on_close  # 전송 실패/정책에 의한 종료 시 호출 (매니저에서 제거)
+        self.queue = deque()
+        self.dropped = 0  # 큐가 가득 차서 버린 메시지 수
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._writer())
+
+    def put(self, message: str):
+        """송신 큐에 메시지 추가 (이벤트 루프 스레드에서 호출)"""
+        if self.closed:
+            return
+        if len(self.queue) >= self.queue_size:
+            if self.policy == DISCONNECT:
+                print(f"⚠️ 송신 큐가 가득 차서 연결을 종료합니다 ({self.queue_size}개 대기)")
+                self._close_connection()
+                return
+            if self.policy == LATEST:
+                self.dropped += len(self.queue)
+                WEBSOCKET_DROPPED_MESSAGES.inc(len(self.queue))
+                self.queue.clear()
+            else:
+                self.dropped += 1
+                WEBSOCKET_DROPPED_MESSAGES.inc()
+                self.queue.popleft()
+        self.queue.append(message)
+        self._ready.set()
+
+    def queue_depth(self):
+        return len(self.queue)
+
+    async def _writer(self):
+        try:
+            while True:
+                await self._ready.wait()
+                while self.queue:
+                    await self.websocket.send_text(self.queue.popleft())
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"메시지 전송 중 오류: {e}")
+            self._close_connection()
+
+    def _close_connection(self):
+        self.close()
+        asyncio.ensure_future(self._close_socket())
+        if self.on_close:
+            self.on_close(self.websocket)
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=1013)  # 1013: Try Again Later
+        except Exception:
+            pass
+
+    def close(self):
+        """전송 태스크 종료 (대기 중인 메시지는 버림)"""
+        self.closed = True
+        self.queue.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
 
 class ConnectionManager:
-    def __init__(self):
+    """
+    토픽 기반 WebSocket 연결 관리자
+    - 연결마다 구독한 토픽이 있고, broadcast(topic, message)는 해당 토픽 구독자에게만 전송
+    - dict 메시지는 토픽당 한 번만 JSON 직렬화해서 모든 구독자가 공유
+    - 연결마다 크기가 제한된 송신 큐와 전송 태스크가 있어서 broadcast는 큐에 넣고 바로 반환
+      (큐가 가득 찼을 때의 정책: drop_oldest / latest / disconnect)
+    """
+    def __init__(self, queue_size=32, policy=DROP_OLDEST):
+        self.queue_size = queue_size
+        self.policy = policy
         self.active_connections: List[WebSocket] = []
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.topics: Dict[str, Set[WebSocket]] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, topic: str = DEFAULT_TOPIC, policy: str = None):
         await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size, policy or self.policy, self.disconnect)
+        client.start()
+        self.clients[websocket] = client
         self.active_connections.append(websocket)
-        print(f"WebSocket 연결 성공: 현재 {len(self.active_connections)}개 연결")
+        self.subscribe(websocket, topic)
+        print(f"WebSocket 연결 성공 [{topic}]: 현재 {len(self.active_connections)}개 연결")
 
     def disconnect(self, websocket: WebSocket):
+        for subscribers in self.topics.values():
+            subscribers.discard(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.close()
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             print(f"WebSocket 연결 종료: 현재 {len(self.active_connections)}개 연결")
 
-    async def broadcast(self, message: str):
-        """모든 연결된 클라이언트에 메시지 브로드캐스트"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"메시지 전송 중 오류: {e}")
-                disconnected.append(connection)
-        
-        # 연결 끊긴 클라이언트 제거
-        for conn in disconnected:
-            self.disconnect(conn)
+    def subscribe(self, websocket: WebSocket, topic: str):
+        """연결에 토픽 구독 추가"""
+        self.topics.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        """연결의 토픽 구독 해제 (연결은 유지)"""
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self.topics.get(topic, ()))
+
+    def queue_depths(self) -> Dict[WebSocket, int]:
+        """연결별 송신 대기 메시지 수"""
+        return {websocket: client.queue_depth() for websocket, client in self.clients.items()}
+
+    def topic_queue_depths(self) -> Dict[str, int]:
+        """토픽별 송신 대기 메시지 수 합계 (메트릭용)"""
+        depths = self.queue_depths()
+        return {topic: sum(depths.get(websocket, 0) for websocket in list(subscribers))
+                for topic, subscribers in list(self.topics.items())}
+
+    def topic_connection_counts(self) -> Dict[str, int]:
+        """토픽별 연결 수 (메트릭용)"""
+        return {topic: len(subscribers) for topic, subscribers in list(self.topics.items())}
+
+    def publish(self, topic: str, message):
+        """토픽 구독자들의 송신 큐에 메시지 추가 (이벤트 루프 스레드에서 호출, 바로 반환)"""
+        subscribers = list(self.topics.get(topic, ()))
+        if not subscribers:
+            return
+
+        # 직렬화는 토픽당 한 번만
+        if not isinstance(message, str):
+            message = json.dumps(message)
+
+        for websocket in subscribers:
+            client = self.clients.get(websocket)
+            if client is not None:
+                client.put(message)
+
+    async def broadcast(self, topic: str, message):
+        """토픽 구독자에게 메시지 브로드캐스트 (message: str 또는 dict, 큐에 넣고 바로 반환)"""
+        self.publish(topic, message)
+
+    async def send(self, websocket: WebSocket, message):
+        """연결 하나에 메시지 전송 (같은 송신 큐를 거쳐서 순서 유지)"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        if not isinstance(message, str):
+            message = json.dumps(message)
+        client.put(message)
 
 # 싱글톤 인스턴스 생성
 manager = ConnectionManager()
+WEBSOCKET_QUEUE_DEPTH.set_function(manager.topic_queue_depths)
+WEBSOCKET_CONNECTIONS.set_function(manager.topic_connection_counts)
 
 def get_manager():
     """WebSocket 연결 관리자 인스턴스 반환"""
-    return manager
\ No newline at end of file
+    return manager
@@ -2,9 +2,13 @@ from fastapi import APIRouter, HTTPException
 from starlette.responses import StreamingResponse
 from fastapi.responses import StreamingResponse
 import cv2
-import dlib
 import numpy as np
+from typing import Optional
 from service.face_reset_service import FaceResetService
+from service.vision_pool import create_face_detector
+from service.camera_service import get_camera_bus
+from service.face_detection import RoiFaceDetector
+from service.stream_service import StreamQuality, adaptive_stream
 from model.face_reset_model import FaceResetRequest
 from model.face_data import FaceData
 from model.face_reset_model import FaceIDRequest
@@ -23,34 +27,37 @@ def reset_face(request: FaceResetRequest):
 
 # 웹캠 스트리밍 API
 def generate_frames():
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    detector = dlib.get_frontal_face_detector()  # 얼굴 감지기 로드
+    cap = get_camera_bus().subscribe()  # 공유 카메라 버스 구독
+    if cap is None:
+        return
+    face_detector = RoiFaceDetector(create_face_detector(), upsample=1)  # 얼굴 감지기 로드 (기존과 같이 1번 확대해서 탐색)
 
-    while True:
-        success, frame = cap.read()
-        if not success:
-            break
+    try:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            frame = frame.copy()  # 공유 프레임이므로 그리기 전에 복사
         
-        # ✅ 그레이스케일 변환 후 얼굴 감지
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = detector(gray, 1)
-
-        # ✅ 감지된 얼굴마다 바운딩 박스 추가
-        for face in faces:
-            x, y, w, h = face.left(), face.top(), face.width(), face.height()
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)  # 초록색 사각형
+            # ✅ 그레이스케일 변환 후 얼굴 감지
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = face_detector.detect(gray)
+
+            # ✅ 감지된 얼굴마다 바운딩 박스 추가
+            for face in faces:
+                x, y, w, h = face.left(), face.top(), face.width(), face.height()
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)  # 초록색 사각형
         
-        # ✅ 프레임을 웹 브라우저로 전송
-        _, buffer = cv2.imencode(".jpg", frame)
-        yield (b"--frame\r\n"
-               b"Content-Type: image/jpeg\r\n\r\n" + buffer.tobytes() + b"\r\n")
-
-    cap.release()
+            # ✅ 프레임을 웹 브라우저로 전송 (인코딩은 adaptive_stream에서 수행)
+            yield frame
+    finally:
+        cap.release()
 
-# 웹캠 스트리밍을 제공하는 API   
+# 웹캠 스트리밍을 제공하는 API (max_width/max_quality/max_fps로 품질 상한 고정 가능)
 @router.get("/stream")
-def stream_video(): 
-    return StreamingResponse(generate_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+def stream_video(max_width: Optional[int] = None, max_quality: Optional[int] = None, max_fps: Optional[float] = None): 
+    quality = StreamQuality(max_width, max_quality, max_fps)
+    return StreamingResponse(adaptive_stream(generate_frames(), quality), media_type="multipart/x-mixed-replace; boundary=frame")
 
 # 얼굴 촬영 및 벡터 출력 API
 @router.get("/capture-face")
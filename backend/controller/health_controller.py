@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from service.startup_service import get_startup_manager
+
+router = APIRouter(tags=["health"])
+startup_manager = get_startup_manager()
+
+@router.get("/healthz")
+async def healthz():
+    """프로세스 생존 확인 (초기화 진행 여부와 관계없이 바로 응답)"""
+    return {"status": "ok", "uptime": round(startup_manager.status()["uptime"], 3)}
+
+@router.get("/readyz")
+async def readyz():
+    """
+    준비 상태 확인 (라우터 import, 모델 로드, MySQL / Milvus 연결)
+    - 모두 준비되면 200, 아직이면 503 + 단계별 상태 / 소요 시간
+    """
+    status = startup_manager.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
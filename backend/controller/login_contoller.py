@@ -7,15 +7,17 @@ import json
 import os
 import numpy as np
 import time
+from typing import Optional
 
 
 from service.login_service import LoginService, set_websocket_manager
 from service.anti_spoofing_service import AntiSpoofingService
+from service.stream_service import StreamQuality
 from model.login_model import FaceIDRequest, FaceRegistrationRequest, FaceDirection
 from model.profile_model import Profile
 from model.face_data import FaceData 
 
-from config.websocket import get_manager, ConnectionManager
+from config.websocket import get_manager, ConnectionManager, FACE_STATUS_TOPIC, LATEST
 
 router = APIRouter(prefix="/login", tags=["login"])
 login_service = LoginService()
@@ -30,15 +32,16 @@ TEMP_FACE_DIR = "../temp_faces"
 if not os.path.exists(TEMP_FACE_DIR):
     os.makedirs(TEMP_FACE_DIR)
 
-# 로그인 페이지 API
+# 로그인 페이지 API (max_width/max_quality/max_fps로 품질 상한 고정 가능)
 @router.get("/stream")
-def login_page():
-    return StreamingResponse(login_service.generate_frames_with_face_vectors(),
+def login_page(max_width: Optional[int] = None, max_quality: Optional[int] = None, max_fps: Optional[float] = None):
+    quality = StreamQuality(max_width, max_quality or 85, max_fps)
+    return StreamingResponse(login_service.generate_frames_with_face_vectors(quality),
                              media_type="multipart/x-mixed-replace; boundary=frame")
     
 @router.websocket("/ws/face-status")
 async def face_status_ws(websocket: WebSocket):
-    await manager.connect(websocket)
+    await manager.connect(websocket, FACE_STATUS_TOPIC, policy=LATEST)  # 최신 얼굴 상태만 의미 있음
     print("WebSocket 연결됨: 현재", len(manager.active_connections), "개 연결")
     
     # 마지막 상태와 시간 추적
@@ -78,7 +81,7 @@ async def face_status_ws(websocket: WebSocket):
                 if current_status != last_status:
                     message = json.dumps({"face_detected": current_status})
                     print(f"WebSocket으로 전송: {message}")
-                    await websocket.send_text(message)
+                    await manager.send(websocket, message)
                     last_status = current_status
             
             # 비동기 대기 (CPU 부하 감소)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from config.metrics import get_registry
+
+router = APIRouter(tags=["metrics"])
+registry = get_registry()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus 텍스트 형식 메트릭 (카메라/분석 단계/인코딩/MDE/Milvus/MySQL 지연 시간,
+    버려진 프레임 수, WebSocket 송신 큐 길이)
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/models")
+async def models():
+    """모델 레지스트리 상태 (모델별 로드 여부, 로드 시간, 메모리 사용량, 스레드 안전성)"""
+    from service.model_registry import get_model_registry  # dlib import는 요청 시점에
+    return {"models": get_model_registry().describe()}
@@ -1,30 +1,40 @@
-from fastapi import APIRouter,WebSocket, WebSocketDisconnect
+from fastapi import APIRouter,WebSocket, WebSocketDisconnect, HTTPException
 
 from fastapi.responses import StreamingResponse
-from service.monitoring_service import MonitoringService
+from service.monitoring_session_service import get_session_manager, SessionLimitError
+from service.stream_service import StreamQuality
 import json
 import asyncio
+from typing import Optional
 
 from config.websocket import get_manager
+from model.monitoring_model import MonitoringSessionCreate
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
-monitoring_service = MonitoringService()
+session_manager = get_session_manager()
+monitoring_service = session_manager.default()  # 기존 라우트는 기본 세션 사용
 
 manager = get_manager()
 
 @router.websocket("/ws")
-async def monitoring_websocket(websocket: WebSocket):
-    """모니터링 정보를 실시간으로 전송하는 WebSocket 엔드포인트"""
+async def monitoring_websocket(websocket: WebSocket, last_seq: Optional[int] = None):
+    """
+    모니터링 정보를 실시간으로 전송하는 WebSocket 엔드포인트
+    - 상태가 바뀔 때만 이벤트 전송 (type: "status", seq 증가)
+    - HEARTBEAT_INTERVAL마다 heartbeat 전송 (seq는 증가하지 않음, 누락 확인용)
+    - 재연결 시 ?last_seq=N 또는 {"resume": N} 메시지로 N 이후 이벤트부터 이어받기
+    """
+    await serve_status_websocket(websocket, monitoring_service, last_seq)
 
-    await manager.connect(websocket)
+async def serve_status_websocket(websocket: WebSocket, session, last_seq=None):
+    """세션 상태 WebSocket 처리 (세션 토픽 구독 + 이어받기 + ping/get_status)"""
+    publisher = session.status_publisher
+
+    await manager.connect(websocket, session.topic)
     
     try:
-        # 초기 상태 전송
-        initial_status = {
-            "distraction_state": monitoring_service.get_distraction_status(),
-            "drowsiness_state": monitoring_service.get_drowsiness_status(),
-        }
-        await websocket.send_text(json.dumps(initial_status))
+        # 초기 상태 전송 (last_seq가 있으면 놓친 이벤트만)
+        await send_resume(websocket, publisher, last_seq)
         
         # 클라이언트와 통신 유지
         while True:
@@ -33,14 +43,18 @@ async def monitoring_websocket(websocket: WebSocket):
             
             if data == "ping":
                 # 핑-퐁 메시지로 연결 유지
-                await websocket.send_text("pong")
+                await manager.send(websocket, "pong")
             elif data == "get_status":
                 # 최신 상태 요청 처리
-                current_status = {
-                    "distraction_state": monitoring_service.get_distraction_status(),
-                    "drowsiness_state": monitoring_service.get_drowsiness_status(),
-                }
-                await websocket.send_text(json.dumps(current_status))
+                await manager.send(websocket, publisher.snapshot_message())
+            else:
+                # 이어받기 요청 처리 {"resume": 마지막으로 받은 seq}
+                try:
+                    request = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(request, dict) and "resume" in request:
+                    await send_resume(websocket, publisher, request["resume"])
     
     except WebSocketDisconnect:
         # 연결이 끊어지면 매니저에서 제거
@@ -49,6 +63,21 @@ async def monitoring_websocket(websocket: WebSocket):
         print(f"WebSocket 통신 오류: {e}")
         manager.disconnect(websocket)
 
+async def send_resume(websocket: WebSocket, publisher, last_seq):
+    """last_seq 이후 이벤트 재전송 (보관 범위를 벗어났거나 처음 연결이면 스냅샷 전송)"""
+    events = None
+    if last_seq is not None:
+        try:
+            events = publisher.events_since(int(last_seq))
+        except (TypeError, ValueError):
+            events = None
+
+    if events is None:
+        await manager.send(websocket, publisher.snapshot_message())
+        return
+    for event in events:
+        await manager.send(websocket, event)
+
 @router.get("/status")
 def get_monitoring_status():
     """✅ 현재 모니터링 상태 조회 (True/False)"""
@@ -75,22 +104,98 @@ def toggle_monitoring():
 # 중복 함수 라우팅 하나 삭제 => /video
 # 카메라 실행 안되면 예외처리 추가 
 @router.get("/video_feed")
-def video_feed():
-    """웹캠 스트리밍 API"""
+def video_feed(max_width: Optional[int] = None, max_quality: Optional[int] = None, max_fps: Optional[float] = None):
+    """웹캠 스트리밍 API (전송 속도에 맞춰 품질 자동 조절, 쿼리 파라미터로 상한 고정 가능)"""
     try:
         # 모니터링 서비스가 초기화되었는지 확인
         if monitoring_service.status is False:
             return {"error": "모니터링 서비스가 초기화되지 않았습니다"}
         
         # 스트리밍 응답 반환
-        return StreamingResponse(
-            monitoring_service.generate_frames(),
-            media_type="multipart/x-mixed-replace; boundary=frame"
-        )
+        return stream_session(monitoring_service, max_width, max_quality, max_fps)
     except Exception as e:
         print(f"❌ [API] 비디오 피드 처리 중 오류: {str(e)}")
         return {"error": f"비디오 스트리밍 중 오류 발생: {str(e)}"}
     
+def stream_session(session, max_width=None, max_quality=None, max_fps=None):
+    """세션 영상 multipart 스트리밍 응답"""
+    return StreamingResponse(
+        session.generate_frames(StreamQuality(max_width, max_quality, max_fps)),
+        media_type="multipart/x-mixed-replace; boundary=frame"
+    )
+
+# ===== 세션별 라우트 (좌석/차량마다 독립된 모니터링) =====
+def get_session_or_404(session_id: str):
+    session = session_manager.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail={"message": f"세션을 찾을 수 없습니다: {session_id}"})
+    return session
+
+@router.get("/sessions")
+def list_sessions():
+    """모든 모니터링 세션 상태 조회"""
+    return {"sessions": [session_manager.describe(session) for session in session_manager.sessions()]}
+
+@router.post("/sessions")
+def create_session(item: MonitoringSessionCreate):
+    """모니터링 세션 생성 (카메라 소스, 임계값 지정)"""
+    try:
+        session = session_manager.create(item.session_id, item.camera_source, item.thresholds)
+    except SessionLimitError as e:
+        raise HTTPException(status_code=429, detail={"message": str(e)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e)})
+    return session_manager.describe(session)
+
+@router.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    """모니터링 세션 중지 후 삭제"""
+    if not session_manager.remove(session_id):
+        raise HTTPException(status_code=404, detail={"message": f"세션을 찾을 수 없습니다: {session_id}"})
+    return {"status": "session removed", "session_id": session_id}
+
+@router.get("/sessions/{session_id}/status")
+def get_session_status(session_id: str):
+    """세션 상태 조회"""
+    return session_manager.describe(get_session_or_404(session_id))
+
+@router.post("/sessions/{session_id}/start")
+def start_session(session_id: str):
+    """세션 모니터링 시작"""
+    session = get_session_or_404(session_id)
+    session.start_monitoring()
+    return session_manager.describe(session)
+
+@router.post("/sessions/{session_id}/stop")
+def stop_session(session_id: str):
+    """세션 모니터링 중지"""
+    session = get_session_or_404(session_id)
+    session.stop_monitoring()
+    return session_manager.describe(session)
+
+@router.get("/sessions/{session_id}/video_feed")
+def session_video_feed(session_id: str, max_width: Optional[int] = None, max_quality: Optional[int] = None, max_fps: Optional[float] = None):
+    """세션 영상 스트리밍"""
+    session = get_session_or_404(session_id)
+    if session.status is False:
+        return {"error": "모니터링이 시작되지 않은 세션입니다"}
+    return stream_session(session, max_width, max_quality, max_fps)
+
+@router.get("/sessions/{session_id}/drowsiness/metrics")
+def get_session_drowsiness_metrics(session_id: str):
+    """세션 졸음 지표 (최근 윈도우의 PERCLOS, 분당 눈 깜빡임/하품, 평균 깜빡임 시간)"""
+    session = get_session_or_404(session_id)
+    return {"session_id": session_id, **session.get_drowsiness_metrics()}
+
+@router.websocket("/sessions/{session_id}/ws")
+async def session_websocket(websocket: WebSocket, session_id: str, last_seq: Optional[int] = None):
+    """세션 상태 WebSocket (/ws와 같은 메시지 형식)"""
+    session = session_manager.get(session_id)
+    if session is None:
+        await websocket.close(code=1008)
+        return
+    await serve_status_websocket(websocket, session, last_seq)
+    
 # @router.get("/distraction")
 # def get_distraction_status():
 #     """현재 주의분산 감지 상태 반환"""
@@ -114,18 +219,24 @@ def get_drowsiness_status():
     """졸음 감지 상태 반환 API"""
     return {"status": monitoring_service.get_monitoring_status()}
 
-# 주기적으로 모든 클라이언트에게 상태 업데이트를 보내는 백그라운드 작업
-async def background_status_update():
+@router.get("/drowsiness/metrics")
+def get_drowsiness_metrics():
+    """졸음 지표 API (최근 윈도우의 PERCLOS, 분당 눈 깜빡임/하품, 평균 깜빡임 시간)"""
+    return monitoring_service.get_drowsiness_metrics()
+
+# 상태 변경 이벤트는 분석 스레드에서 바로 발행하고, 여기서는 저빈도 heartbeat만 전송
+HEARTBEAT_INTERVAL = 10  # 초
+
+async def background_heartbeat():
     while True:
-        if manager.active_connections:  # 연결된 클라이언트가 있을 때만 실행    
-            current_status = {
-                "distraction_state": monitoring_service.get_distraction_status(),
-                "drowsiness_state": monitoring_service.get_drowsiness_status(),
-            }
-            await manager.broadcast(json.dumps(current_status))
-        await asyncio.sleep(1)  # 1초마다 업데이트
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        for session in session_manager.sessions():
+            if manager.subscriber_count(session.topic):  # 구독 중인 클라이언트가 있을 때만 실행
+                await manager.broadcast(session.topic, session.status_publisher.heartbeat_message())
         
 # 라우터 초기화 부분에 추가
 @router.on_event("startup")
 async def start_background_tasks():
-    asyncio.create_task(background_status_update())
+    # 분석 스레드에서 이벤트를 보낼 수 있도록 서버 이벤트 루프 등록
+    session_manager.attach_loop(asyncio.get_running_loop())
+    asyncio.create_task(background_heartbeat())
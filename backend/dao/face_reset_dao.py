@@ -6,7 +6,14 @@ import cv2
 
 class FaceResetDAO:
     def __init__(self):
-        self.conn = pymysql.connect(**mysql_config)
+        self._conn = None  # 처음 쿼리할 때 연결 (서버 시작을 막지 않도록)
+
+    @property
+    def conn(self):
+        """MySQL 연결 (없거나 닫혔으면 새로 연결)"""
+        if self._conn is None or not self._conn.open:
+            self._conn = pymysql.connect(**mysql_config)
+        return self._conn
 
     # 트랜잭션을 위한 컨텍스트 매니저 제공
     def transaction(self): 
@@ -4,24 +4,31 @@ import numpy as np
 from pymilvus import Collection, CollectionSchema, FieldSchema, DataType, connections, utility
 import time
 from model.User import User
+from config.metrics import MILVUS_SEARCH_SECONDS
 
 class LoginDAO:
     def __init__(self, milvus_host='localhost', milvus_port='19530'):
         self.mysql_config = mysql_config
-        self.conn = pymysql.connect(**self.mysql_config)
+        self._conn = None  # 처음 쿼리할 때 연결 (서버 시작을 막지 않도록)
         self.milvus_host = milvus_host
         self.milvus_port = milvus_port
         self.collection_name = "user_face_vectors"
         self.collection = None
         
-        # Milvus 연결 설정
-        self._connect_milvus()
+        # Milvus 연결은 처음 컬렉션을 사용할 때 (get_face_collection)
+
+    @property
+    def conn(self):
+        """MySQL 연결 (없거나 닫혔으면 새로 연결)"""
+        if self._conn is None or not self._conn.open:
+            self._conn = pymysql.connect(**self.mysql_config)
+        return self._conn
         
     def _close_connection(self):
         """연결 닫기 (필요한 경우)"""
-        if self.conn and not self.conn._closed:
-            self.conn.close()
-            self.conn = None
+        if self._conn and self._conn.open:
+            self._conn.close()
+        self._conn = None
 
     def _connect_milvus(self):
         """Milvus 서버에 연결"""
@@ -117,13 +124,14 @@ class LoginDAO:
             query_vector_list = query_vector.tolist() if not isinstance(query_vector, list) else query_vector
             
             # 유사 벡터 검색 수행
-            search_result = collection.search(
-                data=[query_vector_list],
-                anns_field="vector",
-                param=search_params,
-                limit=top_k,
-                output_fields=["user_id","timestamp"]
-            )
+            with MILVUS_SEARCH_SECONDS.time():
+                search_result = collection.search(
+                    data=[query_vector_list],
+                    anns_field="vector",
+                    param=search_params,
+                    limit=top_k,
+                    output_fields=["user_id","timestamp"]
+                )
             
             print("조회결과:",search_result)
             
@@ -1,10 +1,15 @@
 import sys
+import time
+
+STARTED = time.time()  # 서버 시작 시간 측정용 (import 전에 기록)
+
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, Depends
 from fastapi.logger import logger
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 import uvicorn
 import logging
+import os
 from typing import List
 import json
 
@@ -15,18 +20,18 @@ sys.stderr.reconfigure(encoding='utf-8')
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# 컨트롤러 임포트
-from controller import (
-    face_reset_controller,
-    monitoring_controller,
-    profile_controller,
-    seat_controller,
-    login_contoller,
-)
+# 컨트롤러 임포트 (가벼운 라우터만, 나머지는 서버 시작 후 백그라운드에서 import)
+from controller import health_controller, metrics_controller
+from service.startup_service import get_startup_manager, FAST_STARTUP, RouterGateMiddleware
 
 # 웹소켓 설정 가져오기
 from config.websocket import get_manager
 
+# 서버 시작 시 백그라운드로 미리 로드할 모델 (쉼표 구분, 비우면 첫 사용 시 로드)
+MODEL_WARM_UP = os.environ.get("MODEL_WARM_UP", "landmark_68,face_recognition")
+
+startup_manager = get_startup_manager()
+
 app = FastAPI()
 
 
@@ -49,6 +54,10 @@ async def add_cors_header(request, call_next):
     
     return response
 
+# 백그라운드에서 아직 로드 중인 라우터 경로는 503 (잠시 후 다시 요청), 로드에 실패했으면 500 + 오류 응답
+# (HTTP와 WebSocket 모두, 실패한 라우터는 /readyz에도 failed로 표시)
+app.add_middleware(RouterGateMiddleware, manager=startup_manager)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins= origins,  # React 앱의 주소
@@ -75,17 +84,16 @@ async def websocket_endpoint(websocket: WebSocket, manager=Depends(get_manager))
     try:
         while True:
             data = await websocket.receive_text()
-            await websocket.send_text(f"메세지 받음: {data}")
+            await manager.send(websocket, f"메세지 받음: {data}")
     except WebSocketDisconnect:
         manager.disconnect(websocket)
         print("클라이언트 종료")
 
 # 라우터 등록
-app.include_router(face_reset_controller.router)
-app.include_router(monitoring_controller.router)
-app.include_router(profile_controller.router)
-app.include_router(seat_controller.router)
-app.include_router(login_contoller.router)
+app.include_router(health_controller.router)
+app.include_router(metrics_controller.router)
+if not FAST_STARTUP:
+    startup_manager.load_routers(app)  # 기존처럼 서버 시작 전에 모두 로드
 
 @app.get("/session-chk")
 def session_chk(request:Request):
@@ -109,6 +117,10 @@ def session_chk(request:Request):
 async def startup_event():
     logger.info("애플리케이션 시작")
     logger.info("WebSocket 관리자 초기화 완료")
+    # 라우터 / 모델 / MySQL / Milvus는 요청을 막지 않도록 백그라운드에서 초기화 (/readyz로 확인)
+    names = [name.strip() for name in MODEL_WARM_UP.split(",") if name.strip()]
+    startup_manager.start(app, names, started=STARTED)
+    logger.info(f"요청 처리 시작까지 {startup_manager.serving_seconds:.2f}초")
 
 if __name__ == "__main__":
     uvicorn.run(
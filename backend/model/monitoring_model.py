@@ -1,4 +1,10 @@
+from typing import Dict, Optional, Union
 from pydantic import BaseModel
 
 class MonitoringStatus(BaseModel):
     status: str
+
+class MonitoringSessionCreate(BaseModel):
+    session_id: str  # 좌석/차량/운전자 구분용 세션 이름
+    camera_source: Optional[Union[int, str]] = None  # 카메라 인덱스 또는 서버에 설정된 소스 이름 (없으면 기본 카메라)
+    thresholds: Optional[Dict[str, float]] = None  # 분석기 임계값 덮어쓰기
@@ -0,0 +1,222 @@
+"""
+모니터링 분석 오프라인 재생 / 벤치마크 도구
+- 녹화된 영상 파일이나 이미지 폴더를 웹캠 없이 모니터링 분석 단계에 그대로 통과시킴
+- fps, 단계별 처리 시간 백분위(gray / detect / landmarks / pose / metrics / overlay / encode),
+  시선 이탈 / 졸음 상태 변화 타임라인을 출력 (카메라 없는 CI 서버에서도 실행 가능)
+- 모든 프레임의 EAR / MAR / 머리 각도(yaw / pitch) 분포를 한 번에(배치) 계산해서 임계값 조정에 사용
+
+사용 예 (backend 폴더에서):
+    python replay.py drive.mp4
+    python replay.py frames/ --fps 15 --realtime
+    python replay.py drive.mp4 --json result.json
+    python replay.py synthetic --max-frames 900
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import dlib
+import numpy as np
+
+from service.camera_sources import open_source
+from service.face_geometry import FaceGeometry
+from service.monitoring_analyzers import create_monitoring_stage
+from service.overlay_service import get_overlay_renderer
+
+STAGES = ["gray", "detect", "landmarks", "pose", "metrics", "overlay", "encode"]
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "models", "shape_predictor_68_face_landmarks.dat")
+
+
+def read_frames(source, fps=None):
+    """영상 파일 / 이미지 폴더 / 합성 영상에서 (영상 시각, 프레임) 생성 -> 영상 시각은 fps 기준"""
+    cap = open_source(source, fps=fps, loop=False, realtime=False)
+    if not cap.isOpened():
+        raise RuntimeError(f"영상을 열 수 없습니다: {source}")
+    fps = cap.fps or 30.0
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index / fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def percentiles(values):
+    """처리 시간 목록(초) -> 백분위 (밀리초)"""
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    values = np.asarray(values) * 1000.0
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def geometry_summary(landmarks, poses=()):
+    """
+    프레임별 랜드마크 (N, 68, 2)를 한 번에 계산 -> 특징별 백분위
+    - poses: 프레임별 (yaw, pitch, roll) (시선 이탈 각도 임계값 보정용 yaw / pitch 분포)
+    """
+    if not landmarks:
+        return {}
+    geometry = FaceGeometry(np.stack(landmarks))
+    features = {"ear": geometry.ear, "mar": geometry.mar}
+    poses = np.array([pose for pose in poses if pose is not None], dtype=np.float64).reshape(-1, 3)
+    features["yaw"], features["pitch"] = poses[:, 0], poses[:, 1]
+    summary = {}
+    for name, values in features.items():
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            continue
+        summary[name] = {
+            "p5": float(np.percentile(values, 5)),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+        }
+    return summary
+
+
+def replay(source, model_path=DEFAULT_MODEL_PATH, fps=None, realtime=False,
+           max_frames=None, quality=90, overlay=True):
+    """영상을 분석 단계에 통과시키고 결과(dict) 반환"""
+    if str(source).startswith("synthetic") and not max_frames:
+        raise RuntimeError("합성 영상은 끝이 없으므로 --max-frames를 지정해야 합니다")
+    if not os.path.exists(model_path):
+        raise RuntimeError(f"랜드마크 모델 파일이 없습니다: {model_path}")
+
+    renderer = get_overlay_renderer()
+    stage, gaze_analyzer, drowsiness_analyzer = create_monitoring_stage(
+        dlib.get_frontal_face_detector(), dlib.shape_predictor(model_path), renderer.put_text)
+
+    timings = {name: [] for name in STAGES}
+    timeline = []
+    last_state = None
+    frame_count = 0
+    face_frames = 0
+    face_landmarks = []  # 프레임별 첫 번째 얼굴 랜드마크 (배치 기하 계산용)
+    face_poses = []  # 프레임별 첫 번째 얼굴 머리 자세 (yaw, pitch, roll)
+
+    started = time.perf_counter()
+    for video_time, frame in read_frames(source, fps):
+        if max_frames and frame_count >= max_frames:
+            break
+
+        # 실시간 재생이면 영상 시각에 맞춰 대기
+        if realtime:
+            delay = video_time - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+        analysis = stage.process(frame, video_time)
+        for name, elapsed in analysis.timings.items():
+            timings[name].append(elapsed)
+        if analysis.face_detected:
+            face_frames += 1
+            # 랜드마크 버퍼는 다음 프레임에 재사용되므로 복사해서 보관
+            face_landmarks.append(analysis.landmarks[0].copy())
+            face_poses.append(analysis.head_poses[0])
+
+        if overlay:
+            overlay_started = time.perf_counter()
+            frame = stage.draw(frame, analysis)
+            timings["overlay"].append(time.perf_counter() - overlay_started)
+
+        encode_started = time.perf_counter()
+        cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        timings["encode"].append(time.perf_counter() - encode_started)
+
+        # 상태 변화 기록
+        state = (gaze_analyzer.status(), drowsiness_analyzer.status())
+        if state != last_state:
+            timeline.append({
+                "time": round(video_time, 3),
+                "frame": frame_count,
+                "distraction_state": state[0],
+                "drowsiness_state": state[1],
+            })
+            last_state = state
+
+        frame_count += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "source": source,
+        "frames": frame_count,
+        "face_frames": face_frames,
+        "elapsed": elapsed,
+        "fps": frame_count / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {name: percentiles(values) for name, values in timings.items()},
+        "timeline": timeline,
+        "drowsiness_metrics": drowsiness_analyzer.state.metrics(),
+        "geometry": geometry_summary(face_landmarks, face_poses),
+    }
+
+
+def print_report(result):
+    print(f"\n📼 {result['source']}")
+    print(f"프레임: {result['frames']}개 (얼굴 감지 {result['face_frames']}개) | "
+          f"소요 시간: {result['elapsed']:.2f}초 | 처리 속도: {result['fps']:.1f} fps")
+
+    print(f"\n{'단계':<10}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    for name in STAGES:
+        p = result["latency_ms"][name]
+        print(f"{name:<10}{p['p50']:>9.2f}{p['p90']:>9.2f}{p['p99']:>9.2f}{p['max']:>9.2f}")
+
+    metrics = result["drowsiness_metrics"]
+    blink_duration = metrics["mean_blink_duration"]
+    print(f"\n졸음 지표 (마지막 윈도우): PERCLOS {metrics['perclos'] * 100:.1f}% | "
+          f"눈 깜빡임 {metrics['blinks_per_minute']:.1f}회/분 "
+          f"(평균 {blink_duration * 1000 if blink_duration is not None else 0:.0f}ms) | "
+          f"하품 {metrics['yawns_per_minute']:.1f}회/분")
+
+    if result["geometry"]:
+        print(f"\n{'특징':<10}{'p5':>9}{'p50':>9}{'p95':>9}  (얼굴 감지 프레임)")
+        for name, p in result["geometry"].items():
+            print(f"{name:<10}{p['p5']:>9.3f}{p['p50']:>9.3f}{p['p95']:>9.3f}")
+
+    print("\n상태 변화 타임라인")
+    for event in result["timeline"]:
+        print(f"  {event['time']:>8.2f}초 (프레임 {event['frame']:>6}) "
+              f"시선 이탈: {event['distraction_state']:<7} 졸음: {event['drowsiness_state']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모니터링 분석 오프라인 재생 / 벤치마크")
+    parser.add_argument("source", help="영상 파일, 이미지 폴더 또는 synthetic (합성 영상, --max-frames 필요)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="68 랜드마크 모델 경로")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="영상 시각 계산용 fps (기본: 영상 정보, 이미지 폴더는 30)")
+    parser.add_argument("--realtime", action="store_true", help="영상 시각에 맞춰 실시간 속도로 재생")
+    parser.add_argument("--max-frames", type=int, default=None, help="처리할 최대 프레임 수")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG 인코딩 품질")
+    parser.add_argument("--no-overlay", action="store_true", help="오버레이 그리기 생략")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    try:
+        result = replay(args.source, args.model, args.fps, args.realtime,
+                        args.max_frames, args.quality, not args.no_overlay)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,6 @@ import numpy as np
 import cv2
 import os
 import time
-import dlib
 import queue
 
 import sys
@@ -17,8 +16,10 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 # 이제 moca 폴더의 파일을 직접 임포트할 수 있음
-from moca.moca_validation import DepthValidator
 from moca.utils import frame_to_rgb_frame
+from service.face_detection import RoiFaceDetector
+from service.model_registry import get_model_registry
+from service.vision_pool import create_face_detector
 
 class AntiSpoofingService:
     def __init__(self):
@@ -28,22 +29,21 @@ class AntiSpoofingService:
         # 현재 프레임 저장 변수
         self.current_frame = None
         
-        # 깊이 처리 객체 초기화 (한 번만 초기화)
-        self.depth_validator = DepthValidator()
+        # 깊이 처리 객체 (모델 레지스트리에서 공유, 처음 사용할 때 Depth-Anything 로드)
+        self.depth_validator = get_model_registry().lazy("depth_validator")
         
         # 폐이스 마스크 저장 디렉토리
         self.MASK_SAVE_DIR = "./face_mask_values"
         os.makedirs(self.MASK_SAVE_DIR, exist_ok=True)
         
-        # dlib 모델 로드
-        RECOGNITION_MODEL_PATH = "models/dlib_face_recognition_resnet_model_v1.dat"
+        # dlib 모델 (임베딩 모델은 레지스트리에서 공유)
+        self.detector = create_face_detector()
+        self.face_detector = RoiFaceDetector(self.detector)  # 마지막 얼굴 주변만 축소해서 탐지
+        self.face_rec_model = get_model_registry().lazy("face_recognition")
         
-        print(f"모델 경로 확인: {os.path.exists(RECOGNITION_MODEL_PATH)}")
-        
-        self.detector = dlib.get_frontal_face_detector()
-        self.face_rec_model = dlib.face_recognition_model_v1(RECOGNITION_MODEL_PATH)
-        
-        self.pipeline = self.depth_validator.pipeline
+    @property
+    def pipeline(self):
+        return self.depth_validator.pipeline
         
     def start(self):
         """깊이 센서와 관련 서비스 시작"""
@@ -128,12 +128,8 @@ class AntiSpoofingService:
         # 그레이 스케일로 변환
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-        # dlib 얼굴 탐지기 초기화 (한 번만 로드)
-        if not hasattr(self, '_dlib_detector'):
-            self._dlib_detector = dlib.get_frontal_face_detector()
-
-        # 얼굴 탐지
-        faces = self._dlib_detector(gray, 0)
+        # 얼굴 탐지 (축소/ROI 탐지 후 원본 좌표로 변환)
+        faces = self.face_detector.detect(gray)
 
         if len(faces) == 0:
             return None
@@ -256,6 +252,7 @@ class AntiSpoofingService:
     def __del__(self):
         """소멸자: 리소스 해제"""
         try:
-            self.stop()
+            if get_model_registry().is_loaded("depth_validator"):
+                self.stop()
         except:
             pass
\ No newline at end of file
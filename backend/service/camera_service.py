@@ -0,0 +1,418 @@
+import cv2
+import os
+import threading
+import time
+import logging
+
+from config.metrics import CAMERA_READ_SECONDS, CAMERA_FRAME_AGE_SECONDS, DROPPED_FRAMES
+from service.camera_sources import CAMERA_API, open_source
+from service.frame_pool import FramePool
+
+logger = logging.getLogger(__name__)
+
+# 카메라 소스 설정 (환경 변수)
+# - CAMERA_SOURCE: 기본 카메라 소스 ("0", "file:drive.mp4", "images:frames/", "synthetic", "synthetic:noise")
+# - SKIP_CAMERA: true면 장치를 찾지 않고 합성 영상 사용 (카메라 없는 서버)
+# - CAMERA_WIDTH / CAMERA_HEIGHT / CAMERA_FPS: 해상도와 fps (fps를 비우면 장치/영상 기본값)
+CAMERA_SOURCE = os.environ.get("CAMERA_SOURCE", "").strip() or None
+SKIP_CAMERA = os.environ.get("SKIP_CAMERA", "false").lower() in ("1", "true", "yes")
+CAMERA_WIDTH = int(os.environ.get("CAMERA_WIDTH", "640") or 640)
+CAMERA_HEIGHT = int(os.environ.get("CAMERA_HEIGHT", "480") or 480)
+CAMERA_FPS = float(os.environ.get("CAMERA_FPS", "0") or 0) or None
+
+# 캡처 방식
+# - latest: 읽기 스레드는 grab()만 계속하고 (드라이버 버퍼를 비움), 기다리는 소비자가 있을 때만
+#           가장 최근에 grab한 프레임을 retrieve() (디코딩) -> 소비자는 항상 지금 프레임을 받음
+# - ring: 모든 프레임을 read()해서 링 버퍼에 저장
+LATEST_FRAME = "latest"
+RING_BUFFER = "ring"
+CAMERA_CAPTURE_MODE = os.environ.get("CAMERA_CAPTURE_MODE", LATEST_FRAME).lower()
+# 소비자에게 줄 수 있는 프레임의 최대 나이 (초, 이보다 오래된 프레임은 버리고 새 프레임을 기다림, 0이면 제한 없음)
+CAMERA_MAX_STALENESS = float(os.environ.get("CAMERA_MAX_STALENESS", "0.2") or 0) or None
+
+
+def warn_if_virtual(source, reason="CAMERA_SOURCE"):
+    """실제 카메라가 아닌 소스(합성 영상 / 영상 파일 / 이미지 폴더)를 기본 카메라로 쓰면 경고 (운영 환경 설정 실수 확인용)"""
+    if isinstance(source, int) or str(source).isdigit() or str(source).startswith("device:"):
+        return
+    message = f"⚠️ [Camera] {reason} 설정으로 카메라 장치 대신 가상 소스({source})를 사용합니다 - 운영 환경이면 설정을 확인하세요"
+    logger.warning(message)
+    print(message)
+
+
+class CameraSubscription:
+    """
+    카메라 프레임 소비자
+    - cv2.VideoCapture와 같은 read()/isOpened()/release() 인터페이스 제공
+    - 소비자마다 마지막으로 읽은 프레임 번호를 따로 기억해서 같은 프레임을 두 번 받지 않음
+    - 프레임은 복사하지 않고 모든 소비자가 같은 배열을 공유하므로, 그림을 그릴 때는 copy() 후 사용
+    - 프레임은 풀 버퍼라서 같은 소비자(consumer)가 다음 read()를 하거나 release_frame() / release()를
+      호출하면 풀로 돌아감 (그 뒤에도 필요하면 copy() 해서 보관)
+    - consumer를 주지 않으면 구독 자체가 소비자 (스레드풀에서 next()마다 스레드가 바뀌는 제너레이터도 안전),
+      한 구독을 여러 곳에서 동시에 읽으면 각자 consumer 토큰을 넘기고 끝나면 release_frame(consumer) 호출
+    """
+    def __init__(self, capture):
+        self.capture = capture
+        self.last_seq = 0
+        self.last_timestamp = None  # 마지막으로 읽은 프레임의 캡처 시각
+        self.closed = False
+        self._held = {}  # 소비자별로 아직 사용 중인 프레임 (다음 read()에서 반환)
+        self._held_lock = threading.Lock()
+
+    def read(self, timeout=1.0, consumer=None):
+        """아직 읽지 않은 가장 최신 프레임 반환 (cv2와 동일하게 (성공여부, 프레임))"""
+        consumer = self if consumer is None else consumer
+        self.release_frame(consumer)
+        if self.closed:
+            return False, None
+
+        item = self.capture.wait_frame(self.last_seq, timeout)
+        if item is None:
+            return False, None
+
+        seq, timestamp, frame = item
+        with self._held_lock:
+            self._held[consumer] = frame
+        self.capture.frame_age.observe(time.time() - timestamp)  # 캡처 ~ 소비자 전달까지 걸린 시간
+        if self.last_timestamp is not None and seq > self.last_seq + 1:
+            # 소비자가 느려서 건너뛴 프레임 수
+            DROPPED_FRAMES.labels("camera").inc(seq - self.last_seq - 1)
+        self.last_seq = seq
+        self.last_timestamp = timestamp
+        return True, frame.array
+
+    def release_frame(self, consumer=None):
+        """소비자가 (consumer가 없으면 구독 자체가) 마지막으로 읽은 프레임을 풀로 반환"""
+        with self._held_lock:
+            frame = self._held.pop(self if consumer is None else consumer, None)
+        if frame is not None:
+            frame.release()
+
+    def _release_held(self):
+        """모든 소비자가 들고 있던 프레임을 풀로 반환"""
+        with self._held_lock:
+            frames = list(self._held.values())
+            self._held.clear()
+        for frame in frames:
+            frame.release()
+
+    def isOpened(self):
+        return not self.closed and self.capture.is_opened()
+
+    def get(self, prop):
+        """카메라 속성 (cv2.CAP_PROP_FPS 등, 장치가 열려 있지 않으면 0)"""
+        return self.capture.get(prop)
+
+    def release(self):
+        """구독 해제 (장치는 버스가 관리하므로 여기서 닫지 않음)"""
+        if not self.closed:
+            self.closed = True
+            self.capture.unsubscribe(self)
+        self._release_held()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class CameraCapture:
+    """
+    카메라 소스 하나를 소유하는 캡처 객체
+    - source: 장치 인덱스 또는 소스 지정 문자열 (영상 파일 / 이미지 폴더 / 합성 영상, camera_sources.open_source 참고)
+    - 하나의 스레드만 소스에서 프레임을 읽어 타임스탬프가 붙은 링 버퍼에 저장
+    - 구독자가 모두 빠져도 idle_timeout 동안은 장치를 열어둬서
+      로그인 <-> 모니터링 전환 시 카메라를 다시 여는 비용을 없앰
+    - 프레임은 미리 만든 버퍼에 바로 읽어 넣고 (read(image=...)), 링 버퍼와 모든 소비자가
+      놓아주면 다음 프레임에 재사용 (매 프레임 배열 할당 없음)
+    - mode=latest면 기다리는 소비자가 있을 때만 가장 최근 프레임을 디코딩 (CAMERA_CAPTURE_MODE 참고)
+    - max_staleness보다 오래된 프레임은 소비자에게 주지 않고 새 프레임을 기다림
+    """
+    def __init__(self, source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS,
+                 buffer_size=4, idle_timeout=10.0, mode=CAMERA_CAPTURE_MODE, max_staleness=CAMERA_MAX_STALENESS):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.idle_timeout = idle_timeout
+        self.mode = mode
+        self.max_staleness = max_staleness
+        self.frame_age = CAMERA_FRAME_AGE_SECONDS.labels(source)
+
+        self._cap = None
+        self._thread = None
+        self._running = False
+        self._generation = 0  # 장치를 다시 열 때마다 증가 (이전 읽기 스레드 종료용)
+        self._cond = threading.Condition()
+
+        # 링 버퍼: (프레임 번호, 캡처 시각, PooledFrame) - 링이 참조 하나를 가짐
+        self._ring = [None] * buffer_size
+        self._pool = FramePool(f"camera:{source}", max_free=buffer_size + 4)
+        self._seq = 0
+        self._first_seq = 0  # 장치를 (다시) 연 시점의 프레임 번호 (이전 실행의 프레임은 무시)
+
+        self._subscribers = set()
+        self._idle_since = None
+        self._waiting = []  # 새 프레임을 기다리는 소비자들의 last_seq (latest 모드에서 이때만 디코딩)
+
+    def subscribe(self):
+        """새 소비자 등록 (필요하면 장치를 열고 읽기 스레드 시작)"""
+        with self._cond:
+            self._idle_since = None
+            if not self._running:
+                self._start()
+            subscription = CameraSubscription(self)
+            subscription.last_seq = self._first_seq
+            self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            self._subscribers.discard(subscription)
+            if not self._subscribers:
+                self._idle_since = time.time()
+
+    def is_opened(self):
+        return self._running and self._cap is not None and self._cap.isOpened()
+
+    def get(self, prop):
+        cap = self._cap
+        return cap.get(prop) if cap is not None else 0.0
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def _has_frame(self, last_seq):
+        """last_seq 이후의 프레임이 있고 max_staleness보다 오래되지 않았는지 (_cond 안에서 호출)"""
+        if self._seq <= last_seq:
+            return False
+        if self.max_staleness is None:
+            return True
+        timestamp = self._ring[self._seq % self.buffer_size][1]
+        return time.time() - timestamp <= self.max_staleness
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        """
+        last_seq 이후의 새 프레임이 들어올 때까지 대기 후 가장 최신 프레임 반환
+        -> (프레임 번호, 캡처 시각, PooledFrame), 프레임은 retain된 상태라 호출한 쪽에서 release
+        """
+        with self._cond:
+            if not self._has_frame(last_seq):
+                self._waiting.append(last_seq)
+                try:
+                    self._cond.wait_for(lambda: self._has_frame(last_seq) or not self._running, timeout)
+                finally:
+                    self._waiting.remove(last_seq)
+                if not self._has_frame(last_seq):
+                    return None
+            seq, timestamp, frame = self._ring[self._seq % self.buffer_size]
+            return seq, timestamp, frame.retain()
+
+    def latest(self):
+        """가장 최근 프레임 (없으면 None, 프레임은 retain된 상태라 호출한 쪽에서 release)"""
+        with self._cond:
+            if self._seq == self._first_seq:
+                return None
+            seq, timestamp, frame = self._ring[self._seq % self.buffer_size]
+            return seq, timestamp, frame.retain()
+
+    def _open(self):
+        try:
+            cap = open_source(self.source, self.width, self.height, self.fps)
+        except Exception as e:
+            logger.error(f"카메라 소스 {self.source} 설정 오류: {e}")
+            return None
+        if not cap.isOpened():
+            cap.release()
+            return None
+        return cap
+
+    def _start(self):
+        self._cap = self._open()
+        if self._cap is None:
+            logger.error(f"카메라 {self.source}를 열 수 없습니다")
+            return
+        logger.info(f"카메라 {self.source} 시작됨")
+        self._first_seq = self._seq
+        self._running = True
+        self._generation += 1
+        self._thread = threading.Thread(target=self._reader, args=(self._generation,), daemon=True)
+        self._thread.start()
+
+    def _reader(self, generation):
+        """장치에서 프레임을 읽어 링 버퍼에 넣는 유일한 스레드"""
+        cap = self._cap
+        failures = 0
+        read_seconds = CAMERA_READ_SECONDS.labels(self.source)
+        shape = None  # 첫 프레임을 읽은 뒤 알게 되는 프레임 모양
+        while True:
+            with self._cond:
+                # 구독자가 없는 상태로 idle_timeout이 지나면 장치 해제
+                if self._idle_since is not None and time.time() - self._idle_since >= self.idle_timeout:
+                    logger.info(f"카메라 {self.source} 사용자가 없어 해제합니다")
+                    self._running = False
+                if not self._running or self._generation != generation:
+                    break
+
+            buffer = None
+            if self.mode == LATEST_FRAME:
+                # grab()은 디코딩 없이 드라이버 버퍼만 비움, 기다리는 소비자가 있을 때만 디코딩
+                with read_seconds.time():
+                    ret = cap.grab()
+                captured = time.time()
+                if ret:
+                    with self._cond:
+                        # 아직 새 프레임을 받지 못한 소비자가 있을 때만
+                        wanted = any(not self._has_frame(last_seq) for last_seq in self._waiting)
+                    if not wanted:
+                        failures = 0
+                        continue
+                    buffer = self._pool.acquire(shape) if shape is not None else None
+                    ret, frame = cap.retrieve(buffer.array) if buffer is not None else cap.retrieve()
+            else:
+                # 풀 버퍼에 바로 읽어 넣기 (모양이 다르면 소스가 새 배열을 만들어 반환)
+                buffer = self._pool.acquire(shape) if shape is not None else None
+                with read_seconds.time():
+                    ret, frame = cap.read(buffer.array) if buffer is not None else cap.read()
+                captured = time.time()
+            if not ret:
+                if buffer is not None:
+                    buffer.release()
+                failures += 1
+                # 연속으로 실패하면 장치를 다시 열어봄
+                if failures >= 30:
+                    logger.warning(f"카메라 {self.source} 프레임 읽기 실패, 재연결 시도")
+                    cap.release()
+                    time.sleep(1.0)
+                    cap = self._cap = self._open()
+                    if cap is None:
+                        break
+                    failures = 0
+                continue
+            failures = 0
+
+            if buffer is None or frame is not buffer.array:
+                # 첫 프레임이거나 해상도가 바뀜 -> 새 배열을 풀 버퍼로 등록하고 이후 같은 모양으로 읽음
+                if buffer is not None:
+                    buffer.release()
+                buffer = self._pool.adopt(frame)
+                shape = frame.shape
+
+            with self._cond:
+                if self._generation != generation:
+                    buffer.release()
+                    break
+                self._seq += 1
+                index = self._seq % self.buffer_size
+                previous = self._ring[index]
+                self._ring[index] = (self._seq, captured, buffer)
+                self._cond.notify_all()
+            if previous is not None:
+                previous[2].release()  # 링에서 밀려난 프레임 (소비자가 놓으면 풀로 돌아감)
+
+        if cap is not None:
+            cap.release()
+        with self._cond:
+            if self._generation == generation:
+                self._running = False
+                self._cap = None
+            self._cond.notify_all()
+
+    def stop(self):
+        """구독자와 상관없이 즉시 장치 해제 (프레임을 기다리던 소비자도 바로 깨움)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+
+class CameraBus:
+    """카메라 소스별 CameraCapture를 하나씩만 만들어 모든 서비스가 공유"""
+    def __init__(self):
+        self._captures = {}
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()  # 장치 탐색은 한 번에 하나만 (버스 락과 별도)
+        self._default_source = None
+
+    def find_camera(self):
+        """
+        기본 카메라 소스 (한 번 찾으면 캐시해서 재사용)
+        - CAMERA_SOURCE가 있으면 그 소스, SKIP_CAMERA면 합성 영상, 아니면 사용 가능한 장치 탐색
+        - 버스 락 밖에서 호출 (장치 탐색이 느려도 다른 소스 구독은 막지 않음)
+        """
+        if self._default_source is not None:
+            return self._default_source
+        with self._probe_lock:
+            return self._find_camera()
+
+    def _find_camera(self):
+        if self._default_source is not None:
+            return self._default_source  # 기다리는 동안 다른 스레드가 찾음
+
+        if CAMERA_SOURCE is not None:
+            self._default_source = int(CAMERA_SOURCE) if CAMERA_SOURCE.isdigit() else CAMERA_SOURCE
+            logger.info(f"설정된 카메라 소스 사용: {self._default_source}")
+            warn_if_virtual(self._default_source)
+            return self._default_source
+        if SKIP_CAMERA:
+            self._default_source = "synthetic"
+            warn_if_virtual(self._default_source, "SKIP_CAMERA=true")
+            return self._default_source
+
+        # 이미 열려 있는 장치가 있으면 다시 탐색하지 않음
+        with self._lock:
+            captures = list(self._captures.items())
+        for source, capture in captures:
+            if capture.is_opened():
+                self._default_source = source
+                return source
+
+        for index in range(10):  # 0부터 9까지 카메라 인덱스 확인
+            temp_cap = cv2.VideoCapture(index, CAMERA_API)
+            if temp_cap.isOpened():
+                temp_cap.release()  # 테스트 후 즉시 해제
+                logger.info(f"사용 가능한 카메라 발견: 인덱스 {index}")
+                self._default_source = index
+                return index
+
+        logger.error("사용 가능한 카메라를 찾을 수 없습니다")
+        return None
+
+    def get_capture(self, source=None):
+        """소스별 CameraCapture 반환 (source가 없으면 기본 카메라)"""
+        if source is None:
+            source = self.find_camera()  # 장치 탐색은 락 밖에서
+            if source is None:
+                return None
+        with self._lock:
+            if source not in self._captures:
+                self._captures[source] = CameraCapture(source)
+            return self._captures[source]
+
+    def subscribe(self, source=None):
+        """카메라 구독 (실패 시 None)"""
+        capture = self.get_capture(source)
+        if capture is None:
+            return None
+        subscription = capture.subscribe()
+        if not capture.is_opened():
+            subscription.release()
+            return None
+        return subscription
+
+    def release_all(self):
+        with self._lock:
+            for capture in self._captures.values():
+                capture.stop()
+            self._captures.clear()
+
+
+# 싱글톤 인스턴스 생성
+camera_bus = CameraBus()
+
+def get_camera_bus():
+    """카메라 버스 인스턴스 반환"""
+    return camera_bus
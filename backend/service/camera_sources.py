@@ -0,0 +1,306 @@
+import glob
+import os
+import time
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 윈도우에서는 DirectShow 사용 (기존 얼굴 등록 코드와 동일), 그 외에는 OpenCV 기본값
+CAMERA_API = cv2.CAP_DSHOW if os.name == "nt" else cv2.CAP_ANY
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_VIRTUAL_FPS = 30.0  # 이미지 폴더 / 합성 영상 기본 fps
+
+
+class FramePacer:
+    """가상 소스를 정해진 fps로 내보내기 위한 대기 (fps가 없으면 대기하지 않음)"""
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        if self._next is None or now - self._next > self.interval:
+            self._next = now  # 처음이거나 많이 밀렸으면 기준 시각을 다시 잡음 (따라잡으려고 몰아서 내보내지 않음)
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+
+class FrameSource:
+    """
+    카메라 소스 공통 인터페이스 (cv2.VideoCapture와 같은 read()/grab()/retrieve()/isOpened()/release()/get())
+    - grab()은 다음 프레임으로 넘어가기만 하고 (싸다), retrieve()가 실제로 프레임을 만듦 (디코딩/리사이즈)
+    - width/height를 주면 그 해상도로 맞춰서 내보냄
+    - realtime=True면 fps에 맞춰 grab()이 대기 (실제 카메라처럼 동작)
+    """
+    kind = ""
+
+    def __init__(self, width=None, height=None, fps=None, realtime=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.realtime = realtime
+        self._pacer = FramePacer(fps if realtime else None)
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        """다음 프레임으로 이동 (성공여부)"""
+        raise NotImplementedError
+
+    def retrieve(self, image=None):
+        """마지막으로 grab한 프레임 -> (성공여부, 프레임), image를 주면 크기가 맞을 때 그 배열에 채워서 반환"""
+        raise NotImplementedError
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        pass
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps or 0.0)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width or 0)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height or 0)
+        return 0.0
+
+    def _output(self, frame, image=None):
+        """해상도 맞추기 + 대상 배열에 복사"""
+        if self.width and self.height and (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        if image is not None and image is not frame and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            frame = image
+        return True, frame
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.describe()}>"
+
+    def describe(self):
+        return self.kind
+
+
+class DeviceSource(FrameSource):
+    """실제 카메라 장치 (cv2.VideoCapture, 대기는 장치가 담당)"""
+    kind = "device"
+
+    def __init__(self, index, width=None, height=None, fps=None):
+        super().__init__(width, height, fps, realtime=False)
+        self.index = index
+        self.cap = cv2.VideoCapture(index, CAMERA_API)
+        if self.cap.isOpened():
+            if width and height:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def grab(self):
+        return self.cap.grab()
+
+    def retrieve(self, image=None):
+        return self.cap.retrieve(image) if image is not None else self.cap.retrieve()
+
+    def read(self, image=None):
+        return self.cap.read(image) if image is not None else self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def describe(self):
+        return f"device:{self.index}"
+
+
+class VideoFileSource(FrameSource):
+    """영상 파일 (끝나면 처음부터 반복, fps를 안 주면 영상 fps 사용)"""
+    kind = "file"
+
+    def __init__(self, path, width=None, height=None, fps=None, loop=True, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        fps = fps or (self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0) or DEFAULT_VIRTUAL_FPS
+        super().__init__(width, height, fps, realtime)
+        native = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self._resize = bool(width and height) and native != (width, height)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def grab(self):
+        ok = self.cap.grab()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok = self.cap.grab()
+        if ok:
+            self._pacer.wait()
+        return ok
+
+    def retrieve(self, image=None):
+        # 크기를 바꿀 필요가 없으면 주어진 배열에 바로 디코딩
+        target = image if image is not None and not self._resize else None
+        ret, frame = self.cap.retrieve(target) if target is not None else self.cap.retrieve()
+        if not ret:
+            return False, None
+        return self._output(frame, image)
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        return f"file:{self.path}"
+
+
+class ImageDirSource(FrameSource):
+    """이미지 폴더 (파일 이름 순서, 처음 읽을 때 디코딩해서 메모리에 보관)"""
+    kind = "images"
+
+    def __init__(self, path, width=None, height=None, fps=None, loop=True, realtime=True):
+        super().__init__(width, height, fps or DEFAULT_VIRTUAL_FPS, realtime)
+        self.path = path
+        self.loop = loop
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        self._frames = {}
+        self._index = 0
+        self._current = None
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def grab(self):
+        if self._index >= len(self.paths):
+            if not (self.loop and self.paths):
+                return False
+            self._index = 0
+        self._current = self.paths[self._index]
+        self._index += 1
+        self._pacer.wait()
+        return True
+
+    def retrieve(self, image=None):
+        while self._current is not None:
+            path = self._current
+            frame = self._frames.get(path)
+            if frame is None:
+                frame = cv2.imread(path)
+                if frame is None:
+                    # 읽을 수 없는 이미지는 목록에서 빼고 다음 이미지 사용
+                    logger.warning(f"이미지를 읽을 수 없습니다: {path}")
+                    self.paths.remove(path)
+                    self._index -= 1
+                    self._current = None
+                    if not self.grab():
+                        break
+                    continue
+                self._frames[path] = frame
+            return self._output(frame, image)
+        return False, None
+
+    def describe(self):
+        return f"images:{self.path}"
+
+
+class SyntheticSource(FrameSource):
+    """
+    합성 영상 (카메라 없는 서버에서 부하 테스트 / 재현 가능한 벤치마크용)
+    - moving: 그라데이션 배경 위로 원이 움직이고 프레임 번호 표시 (프레임 번호만으로 결정되는 영상)
+    - noise: 매 프레임 무작위 잡음 (JPEG 인코딩 최악의 경우)
+    """
+    kind = "synthetic"
+    PATTERNS = ("moving", "noise")
+
+    def __init__(self, width=640, height=480, fps=None, pattern="moving", realtime=True):
+        if pattern not in self.PATTERNS:
+            raise ValueError(f"알 수 없는 합성 패턴입니다: {pattern} (사용 가능: {', '.join(self.PATTERNS)})")
+        super().__init__(width or 640, height or 480, fps or DEFAULT_VIRTUAL_FPS, realtime)
+        self.pattern = pattern
+        self.count = -1  # 마지막으로 grab한 프레임 번호
+        x = np.linspace(0, 255, self.width, dtype=np.float32)
+        y = np.linspace(0, 255, self.height, dtype=np.float32)[:, None]
+        self._background = np.dstack([
+            np.broadcast_to(x, (self.height, self.width)),
+            np.broadcast_to(y, (self.height, self.width)),
+            np.full((self.height, self.width), 96, dtype=np.float32),
+        ]).astype(np.uint8)
+
+    def grab(self):
+        self.count += 1
+        self._pacer.wait()
+        return True
+
+    def retrieve(self, image=None):
+        if self.count < 0:
+            return False, None
+        shape = (self.height, self.width, 3)
+        frame = image if image is not None and image.shape == shape and image.dtype == np.uint8 else None
+        if self.pattern == "noise":
+            # 프레임 번호를 시드로 써서 같은 번호면 같은 잡음 (재현 가능)
+            noise = np.random.default_rng(self.count).integers(0, 256, shape, dtype=np.uint8)
+            if frame is None:
+                frame = noise
+            else:
+                np.copyto(frame, noise)
+        else:
+            if frame is None:
+                frame = self._background.copy()
+            else:
+                np.copyto(frame, self._background)
+            radius = max(8, self.height // 10)
+            phase = self.count / (self.fps or DEFAULT_VIRTUAL_FPS)
+            cx = int((np.sin(phase) * 0.4 + 0.5) * self.width)
+            cy = int((np.cos(phase * 0.7) * 0.3 + 0.5) * self.height)
+            cv2.circle(frame, (cx, cy), radius, (255, 255, 255), -1)
+            cv2.putText(frame, f"#{self.count}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+        return True, frame
+
+    def describe(self):
+        return f"synthetic:{self.pattern}"
+
+
+def open_source(spec, width=None, height=None, fps=None, loop=True, realtime=True):
+    """
+    소스 지정 문자열 -> FrameSource
+    - 0, "0", "device:0"             : 카메라 장치
+    - "file:drive.mp4", "drive.mp4"  : 영상 파일 (loop=True면 반복)
+    - "images:frames/", "frames/"    : 이미지 폴더
+    - "synthetic", "synthetic:noise" : 합성 영상
+    """
+    if isinstance(spec, int):
+        return DeviceSource(spec, width, height, fps)
+
+    kind, _, value = str(spec).partition(":")
+    if kind == "device":
+        return DeviceSource(int(value or 0), width, height, fps)
+    if kind == "file":
+        return VideoFileSource(value, width, height, fps, loop, realtime)
+    if kind == "images":
+        return ImageDirSource(value, width, height, fps, loop, realtime)
+    if kind == "synthetic":
+        return SyntheticSource(width, height, fps, value or "moving", realtime)
+
+    # 접두사 없이 지정한 경우 (윈도우 경로의 "C:" 포함)
+    spec = str(spec)
+    if spec.isdigit():
+        return DeviceSource(int(spec), width, height, fps)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, width, height, fps, loop, realtime)
+    return VideoFileSource(spec, width, height, fps, loop, realtime)
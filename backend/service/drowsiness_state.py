@@ -0,0 +1,190 @@
+from service.rolling_window import DrowsinessWindows
+
+
+class DrowsinessStateMachine:
+    """
+    졸음 판단 상태 머신 (프레임레이트와 무관)
+    - 프레임마다 (timestamp, ear, mar, head_pose) 샘플을 받아 상태 갱신
+    - 눈 감김 / 하품 / 경고 유지 시간을 모두 실제 경과 시간(샘플 timestamp 차이)으로 계산하므로
+      10fps로 처리하거나 부하 때문에 프레임을 건너뛰어도 같은 시간 기준으로 경고가 발생
+    - head_pose: (yaw, pitch, roll) 각도(도), 고개를 크게 돌린 동안은 EAR을 믿을 수 없으므로
+      눈 감김 시간을 누적하지 않음 (None이면 사용하지 않음)
+    - 눈 깜빡임 / 하품 횟수와 PERCLOS는 슬라이딩 윈도우로 계산 (1분마다 0으로 초기화하지 않으므로
+      윈도우 경계 직전에 시작된 졸음도 바로 반영됨), 윈도우 크기를 바꾸면 다음 샘플부터 새 크기의
+      윈도우로 다시 계산 (이전 기록은 버림)
+    """
+    # 세션 임계값으로 바꿀 수 있는 속성과 허용 범위 (이름: (최소, 최대))
+    THRESHOLDS = {
+        "EYE_AR_THRESH": (0.05, 0.5),
+        "MOUTH_AR_THRESH": (0.1, 2.0),
+        "YAWN_TIME_THRESH": (0.1, 10),
+        "YAWN_INTERVAL": (0, 600),
+        "DROWSY_EYE_TIME": (0.1, 60),
+        "SLEEPY_EYE_TIME": (0.1, 60),
+        "DROWSY_DISPLAY_TIME": (0, 3600),
+        "WARNING_DISPLAY_TIME": (0, 3600),
+        "BLINK_WINDOW": (1, 3600),
+        "YAWN_WINDOW": (1, 3600),
+        "PERCLOS_WINDOW": (1, 3600),
+        "PERCLOS_DROWSY": (0, 1),
+        "PERCLOS_SLEEPY": (0, 1),
+        "MAX_SAMPLE_GAP": (0.01, 5),
+        "HEAD_YAW_LIMIT": (1, 90),
+    }
+
+    def __init__(self):
+        # 졸음 감지 기준 변수
+        self.EYE_AR_THRESH = 0.20  # 눈 감은 상태 기준
+        self.MOUTH_AR_THRESH = 0.75  # 하품 기준
+        self.YAWN_TIME_THRESH = 1.0  # 입을 이 시간(초) 이상 벌리고 있으면 하품 (기존 30프레임 @30FPS)
+        self.YAWN_INTERVAL = 1  # 하품 사이 최소 간격 (초)
+        self.DROWSY_EYE_TIME = 1  # 졸음 주의 눈 감김 시간 (초)
+        self.SLEEPY_EYE_TIME = 2  # 졸음 경고 눈 감김 시간 (초)
+        self.DROWSY_DISPLAY_TIME = 10  # 주의 상태 표시 시간
+        self.WARNING_DISPLAY_TIME = 60  # 경고 상태 표시 시간 (1분간 유지)
+        self.BLINK_WINDOW = 60  # 눈 깜빡임 횟수 / 평균 지속 시간 윈도우 (초)
+        self.YAWN_WINDOW = 60  # 하품 횟수 윈도우 (초)
+        self.PERCLOS_WINDOW = 60  # PERCLOS(눈 감은 시간 비율) 윈도우 (초)
+        self.PERCLOS_DROWSY = 0.15  # 이 비율 이상이면 졸음 주의 조건
+        self.PERCLOS_SLEEPY = 0.25  # 이 비율 이상이면 졸음 경고 조건
+        self.MAX_SAMPLE_GAP = 0.5  # 샘플 간격 상한 (초) - 얼굴을 놓쳤던 구간이 눈 감김 시간에 더해지지 않도록
+        self.HEAD_YAW_LIMIT = 30  # 이 각도 이상 고개를 돌리면 눈 감김 판단 보류
+
+        # 상태 변수
+        self.EYE_CLOSED_TIME = 0  # 눈 감고 있는 누적 시간 (초)
+        self.DROWSY_WARNING_ACTIVE = False  # 졸음 주의 상태 여부
+        self.SLEEPY_WARNING_ACTIVE = False  # 졸음 경고 상태 여부
+        self.LAST_DROWSY_TIME = None  # 마지막 졸음 상태 기록
+        self.LAST_WARNING_TIME = None  # 마지막 경고 상태 기록
+
+        # 카운트 변수
+        self.EYE_CLOSED = False  # 직전 샘플에서 눈을 감고 있었는지
+        self.MOUTH_OPEN_SINCE = None  # 입을 벌리기 시작한 시각
+        self.EYE_CLOSED_SINCE = None  # 눈을 감기 시작한 시각 (깜빡임 지속 시간 계산용)
+        self.BLINK_COUNTER = 0  # 눈 깜빡임 횟수 (최근 BLINK_WINDOW초)
+        self.YAWN_COUNTER = 0  # 하품 횟수 (최근 YAWN_WINDOW초)
+        self.PERCLOS = 0.0  # 눈 감은 시간 비율 (최근 PERCLOS_WINDOW초)
+        self.LAST_YAWN_TIME = 0  # 마지막 하품 감지 시간 초기화
+        self.last_timestamp = None  # 직전 샘플 시각
+        self.windows = None  # 슬라이딩 윈도우 (첫 샘플에서 생성, 윈도우 크기가 바뀌면 다시 생성)
+
+    def update(self, timestamp, ear, mar, head_pose=None):
+        """샘플 하나로 상태 갱신"""
+        current_time = timestamp
+        if self.last_timestamp is None:
+            elapsed = 0.0
+        else:
+            elapsed = min(max(current_time - self.last_timestamp, 0.0), self.MAX_SAMPLE_GAP)
+        self.last_timestamp = current_time
+
+        self._ensure_windows()
+
+        # 고개를 크게 돌린 상태면 눈 감김 판단 보류 (이전 상태 유지)
+        eyes_reliable = head_pose is None or abs(head_pose[0]) < self.HEAD_YAW_LIMIT
+        eye_closed = ear < self.EYE_AR_THRESH if eyes_reliable else self.EYE_CLOSED
+
+        # 직전 샘플 이후 눈을 감고 있던 시간 (직전 샘플과 상태가 같으면 전체,
+        # 감거나 뜬 순간이면 그 사이 어딘가에서 바뀌었으므로 절반 -> fps에 따라 치우치지 않음)
+        if eye_closed and self.EYE_CLOSED:
+            closed_elapsed = elapsed
+        elif eye_closed or self.EYE_CLOSED:
+            closed_elapsed = elapsed / 2.0
+        else:
+            closed_elapsed = 0.0
+
+        # ===== 슬라이딩 윈도우 갱신 (오래된 칸은 빠지고 최근 값만 남음) =====
+        if eyes_reliable:
+            self.windows.add_sample(current_time, elapsed, closed_elapsed)
+        if self.EYE_CLOSED and not eye_closed:
+            # 눈 깜빡임 (감았다 뜨면 1회)
+            duration = current_time - self.EYE_CLOSED_SINCE if self.EYE_CLOSED_SINCE is not None else 0.0
+            self.windows.add_blink(current_time, duration)
+        self.BLINK_COUNTER = self.windows.blink_count(current_time)
+        self.YAWN_COUNTER = self.windows.yawn_count(current_time)
+        self.PERCLOS = self.windows.perclos(current_time)
+
+        # ===== 눈 감김 상태 처리 =====
+        if eye_closed:
+            # 눈 감은 시간 누적 (실제 경과 시간)
+            if eyes_reliable:
+                self.EYE_CLOSED_TIME += closed_elapsed
+
+            # 1단계: 졸음 주의 (참조 코드와 동일한 조건 사용)
+            if (self.BLINK_COUNTER <= 12 or self.BLINK_COUNTER >= 22 or self.YAWN_COUNTER >= 2
+                or self.PERCLOS >= self.PERCLOS_DROWSY) \
+            and self.EYE_CLOSED_TIME >= self.DROWSY_EYE_TIME \
+            and not self.SLEEPY_WARNING_ACTIVE:  # 경고 상태가 아닐 때만
+                if not self.DROWSY_WARNING_ACTIVE:
+                    self.DROWSY_WARNING_ACTIVE = True
+                    self.LAST_DROWSY_TIME = current_time
+                    print("⚠️ 졸음 주의!")
+
+            # 2단계: 졸음 경고 (참조 코드와 동일한 조건 사용)
+            if (self.BLINK_COUNTER <= 10 or self.BLINK_COUNTER >= 24 or self.YAWN_COUNTER >= 3
+                or self.PERCLOS >= self.PERCLOS_SLEEPY) \
+            and self.EYE_CLOSED_TIME >= self.SLEEPY_EYE_TIME:
+                if not self.SLEEPY_WARNING_ACTIVE:
+                    self.SLEEPY_WARNING_ACTIVE = True
+                    self.LAST_WARNING_TIME = current_time
+                    print("🚨 졸음 경고! 운전 중지!")
+
+        else:
+            # 졸음 주의 유지 (DROWSY_DISPLAY_TIME)
+            if self.DROWSY_WARNING_ACTIVE:
+                if current_time - self.LAST_DROWSY_TIME >= self.DROWSY_DISPLAY_TIME:
+                    self.DROWSY_WARNING_ACTIVE = False
+                    self.LAST_DROWSY_TIME = None
+
+            # 졸음 경고 유지 (WARNING_DISPLAY_TIME)
+            if self.SLEEPY_WARNING_ACTIVE:
+                if current_time - self.LAST_WARNING_TIME >= self.WARNING_DISPLAY_TIME:
+                    self.SLEEPY_WARNING_ACTIVE = False
+                    self.LAST_WARNING_TIME = None
+                    self.EYE_CLOSED_TIME = 0
+
+            # 경고 상태가 아닐 때만 EYE_CLOSED_TIME 초기화
+            if not self.SLEEPY_WARNING_ACTIVE:
+                self.EYE_CLOSED_TIME = 0
+
+        # ===== 하품 감지 (입을 벌린 시간 기준) =====
+        if mar > self.MOUTH_AR_THRESH:
+            if self.MOUTH_OPEN_SINCE is None:
+                self.MOUTH_OPEN_SINCE = current_time
+            if current_time - self.MOUTH_OPEN_SINCE >= self.YAWN_TIME_THRESH \
+            and current_time - self.LAST_YAWN_TIME > self.YAWN_INTERVAL:
+                self.windows.add_yawn(current_time)
+                self.YAWN_COUNTER = self.windows.yawn_count(current_time)
+                print(f"😴 하품 감지됨! (총 {self.YAWN_COUNTER}회)")
+                self.LAST_YAWN_TIME = current_time
+                self.MOUTH_OPEN_SINCE = None
+        else:
+            self.MOUTH_OPEN_SINCE = None
+
+        if eye_closed and not self.EYE_CLOSED:
+            self.EYE_CLOSED_SINCE = current_time
+        elif not eye_closed:
+            self.EYE_CLOSED_SINCE = None
+        self.EYE_CLOSED = eye_closed
+
+    def _ensure_windows(self):
+        """슬라이딩 윈도우 생성 (세션 임계값으로 윈도우 크기가 바뀌었으면 새 크기로 다시 생성)"""
+        sizes = (float(self.PERCLOS_WINDOW), float(self.BLINK_WINDOW), float(self.YAWN_WINDOW))
+        if self.windows is not None and self.windows.sizes() == sizes:
+            return
+        if self.windows is not None:
+            print(f"🔄 윈도우 크기 변경 (PERCLOS/깜빡임/하품 {sizes[0]:.0f}/{sizes[1]:.0f}/{sizes[2]:.0f}초) - 지표를 다시 계산합니다")
+        self.windows = DrowsinessWindows(*sizes)
+
+    def metrics(self, now=None):
+        """슬라이딩 윈도우 졸음 지표 (PERCLOS, 분당 깜빡임/하품, 평균 깜빡임 시간) - 대시보드용"""
+        self._ensure_windows()
+        return self.windows.snapshot(now)
+
+    def status(self):
+        """졸음 상태 ("normal" / "warn" / "danger")"""
+        if self.DROWSY_WARNING_ACTIVE:
+            return "danger"
+        elif self.SLEEPY_WARNING_ACTIVE:
+            return "warn"
+        else:
+            return "normal"
@@ -0,0 +1,159 @@
+import cv2
+import time
+import numpy as np
+
+from config.metrics import PIPELINE_STAGE_SECONDS
+from service.face_geometry import FaceGeometry, LandmarkBuffer
+from service.head_pose import HeadPoseEstimator
+
+
+class FaceAnalysis:
+    """
+    한 프레임의 얼굴 분석 결과
+    - 그레이 변환, 얼굴 탐지, 68개 랜드마크 추출을 프레임당 한 번만 수행하고
+      모든 분석기(시선, 졸음 등)가 이 객체를 공유해서 사용
+    """
+    def __init__(self, frame, gray, timestamp, rects, landmarks, detected=True, head_poses=None):
+        self.frame = frame  # 원본 BGR 프레임
+        self.gray = gray  # 그레이스케일 프레임
+        self.timestamp = timestamp  # 프레임 캡처 시각 (초)
+        self.rects = rects  # dlib.rectangle 목록
+        self.landmarks = landmarks  # (얼굴 수, 68, 2) 랜드마크 배열 (rects와 같은 순서)
+        self.shapes = list(landmarks)  # 얼굴별 (68, 2) 랜드마크 배열 (landmarks의 view)
+        self.detected = detected  # HOG 탐지 결과인지 (False면 추적기 결과)
+        # 얼굴별 머리 자세 (yaw, pitch, roll) 각도(도), 풀이에 실패한 얼굴은 None
+        self.head_poses = head_poses if head_poses is not None else [None] * len(rects)
+        self.timings = {}  # 단계별 처리 시간 (초) - gray / detect / landmarks / pose / metrics
+        self._geometry = None
+
+    @property
+    def geometry(self):
+        """모든 얼굴의 EAR / MAR (처음 사용할 때 한 번에 계산, FaceGeometry)"""
+        if self._geometry is None:
+            self._geometry = FaceGeometry(self.landmarks)
+        return self._geometry
+
+    @property
+    def face_detected(self):
+        return len(self.rects) > 0
+
+    def faces(self):
+        """(rect, shape) 쌍으로 순회"""
+        return zip(self.rects, self.shapes)
+
+
+class FaceAnalyzer:
+    """
+    분석기 기본 클래스
+    - analyze(): FaceAnalysis를 보고 내부 상태 갱신
+    - draw(): 상태를 프레임에 표시하고 프레임 반환
+    - reset(): 모니터링 종료 시 초기화
+    """
+    def analyze(self, analysis):
+        pass
+
+    def draw(self, frame, analysis):
+        return frame
+
+    def reset(self):
+        pass
+
+
+class FaceAnalysisStage:
+    """
+    프레임당 한 번 얼굴을 분석하고 결과를 등록된 분석기들에 전달
+    - face_detector(RoiFaceDetector)는 마지막 얼굴 주변만 축소해서 탐지
+    - tracker(FaceTracker)가 있으면 HOG 탐지는 일정 주기로만 하고 사이 프레임은 추적
+    - pose_estimator(HeadPoseEstimator)로 얼굴별 머리 자세를 프레임당 한 번 계산 (직전 자세로 warm start)
+    - 비전 워커 풀을 쓰면 프레임마다 워커 작업 하나로 탐지 + 랜드마크를 구함
+      (탐지한 프레임은 탐지 작업에서 같이, 추적한 프레임은 모든 얼굴의 랜드마크를 한 번에)
+    """
+    def __init__(self, face_detector, predictor, analyzers=None, tracker=None):
+        self.face_detector = face_detector
+        self.predictor = predictor
+        self.analyzers = list(analyzers or [])
+        self._gray = None  # 재사용하는 그레이 변환 버퍼
+        self._landmarks = LandmarkBuffer()  # 재사용하는 (얼굴 수, 68, 2) 랜드마크 버퍼
+        self.pose_estimator = HeadPoseEstimator()
+        self.tracker = tracker
+
+    def add_analyzer(self, analyzer):
+        """분석기 추가 (추가 비용 없이 같은 탐지 결과를 공유)"""
+        self.analyzers.append(analyzer)
+        return analyzer
+
+    def detect(self, gray):
+        """얼굴 위치 반환 -> (rects, HOG 탐지 실행 여부, 탐지 작업에서 같이 구한 랜드마크 또는 None)"""
+        if self.tracker is not None:
+            rects = self.tracker.update(gray)
+            return rects, self.tracker.last_detected, self.tracker.last_landmarks
+
+        rects, landmarks = self.face_detector.locate(gray)
+        return rects, True, landmarks
+
+    def landmarks(self, gray, rects):
+        """얼굴별 68 랜드마크 -> (N, 68, 2) 배열 (워커 풀이 있으면 모든 얼굴을 작업 하나로)"""
+        pool = self.face_detector.pool
+        if pool is not None and rects:
+            boxes = [(r.left(), r.top(), r.right(), r.bottom()) for r in rects]
+            return pool.faces(gray, boxes=boxes)[1]
+        return self._landmarks.convert([self.predictor(gray, rect) for rect in rects])
+
+    def process(self, frame, timestamp=None):
+        """그레이 변환 / 얼굴 탐지 / 랜드마크 추출 후 모든 분석기 실행"""
+        if timestamp is None:
+            timestamp = time.time()
+
+        started = time.perf_counter()
+        # 그레이 이미지는 매 프레임 같은 버퍼에 변환 (분석 결과는 다음 프레임 전까지만 유효)
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        gray_done = time.perf_counter()
+        rects, detected, landmarks = self.detect(gray)
+        detect_done = time.perf_counter()
+
+        if self.predictor is None:
+            rects, landmarks = [], None  # 랜드마크 모델이 없으면 분석 불가
+        if landmarks is None:
+            landmarks = self.landmarks(gray, rects)
+        landmarks_done = time.perf_counter()
+
+        head_poses = self.pose_estimator.estimate_all(landmarks, gray.shape)
+        analysis = FaceAnalysis(frame, gray, timestamp, rects, landmarks, detected, head_poses)
+        pose_done = time.perf_counter()
+
+        for analyzer in self.analyzers:
+            try:
+                analyzer.analyze(analysis)
+            except Exception as e:
+                print(f"❌ {type(analyzer).__name__} 분석 중 오류 발생: {e}")
+
+        analysis.timings = {
+            "gray": gray_done - started,
+            "detect": detect_done - gray_done,
+            "landmarks": landmarks_done - detect_done,
+            "pose": pose_done - landmarks_done,
+            "metrics": time.perf_counter() - pose_done,
+        }
+        for stage, elapsed in analysis.timings.items():
+            PIPELINE_STAGE_SECONDS.labels(stage).observe(elapsed)
+        return analysis
+
+    def draw(self, frame, analysis):
+        """분석기 순서대로 결과를 프레임에 표시"""
+        with PIPELINE_STAGE_SECONDS.labels("overlay").time():
+            for analyzer in self.analyzers:
+                try:
+                    frame = analyzer.draw(frame, analysis)
+                except Exception as e:
+                    print(f"❌ {type(analyzer).__name__} 표시 중 오류 발생: {e}")
+        return frame
+
+    def reset(self):
+        self.face_detector.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+        self.pose_estimator.reset()
+        for analyzer in self.analyzers:
+            analyzer.reset()
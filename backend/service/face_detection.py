@@ -0,0 +1,185 @@
+import threading
+
+import cv2
+import dlib
+import numpy as np
+
+
+def to_rectangle(drect):
+    """dlib.drectangle(실수 좌표) -> dlib.rectangle(정수 좌표) 변환"""
+    return dlib.rectangle(int(round(drect.left())), int(round(drect.top())),
+                          int(round(drect.right())), int(round(drect.bottom())))
+
+
+def scan_region(detector, image, region, threshold=0):
+    """
+    region = (x0, y0, x1, y1, scale, upsample) 영역을 scale 비율로 축소(upsample번 확대)해서 탐지
+    -> 원본 좌표의 (left, top, right, bottom) 목록 (워커 프로세스에서도 같은 함수 사용)
+    """
+    x0, y0, x1, y1, scale, upsample = region
+    crop = image[y0:y1, x0:x1]
+    if scale < 1.0:
+        small = cv2.resize(crop, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    else:
+        small = np.ascontiguousarray(crop)
+
+    if small.shape[0] == 0 or small.shape[1] == 0:
+        return []
+
+    found, _, _ = detector.run(small, upsample, threshold)
+
+    fx = crop.shape[1] / small.shape[1]
+    fy = crop.shape[0] / small.shape[0]
+    return [(int(r.left() * fx) + x0, int(r.top() * fy) + y0, int(r.right() * fx) + x0, int(r.bottom() * fy) + y0)
+            for r in found]
+
+
+def scan_regions(detector, image, regions, threshold=0):
+    """영역을 순서대로 탐색해서 처음으로 얼굴이 나온 영역의 결과 반환 (ROI -> 전체 프레임)"""
+    for region in regions:
+        boxes = scan_region(detector, image, region, threshold)
+        if boxes:
+            return boxes
+    return []
+
+
+class RoiFaceDetector:
+    """
+    관심 영역(ROI) + 축소 기반 HOG 얼굴 탐지기
+    - HOG 비용은 픽셀 수에 비례하고 운전자 얼굴은 프레임 사이에 거의 움직이지 않으므로
+      마지막 얼굴 주변(padding 비율만큼 확장)만 축소해서 탐색
+    - ROI에서 못 찾으면 전체 프레임을 fallback_scale 비율로 (기본은 축소하지 않고) upsample 횟수만큼 확대해서 탐색
+      (축소하면 작은 얼굴(HOG 창 80px / scale 미만)을 다시 찾지 못하므로 기존 탐지와 같은 조건으로 탐색,
+       원래 축소해서 탐지하던 곳은 같은 비율을 넘겨서 비용을 유지)
+    - 결과는 항상 원본 해상도 좌표로 변환해서 반환 (랜드마크 모델에 바로 사용)
+    - 마지막 얼굴 위치(상태)와 HOG 탐지기를 락으로 보호 (여러 요청 스레드에서 같은 인스턴스를 써도 안전)
+    - detector가 워커 풀 탐지기(PooledHogDetector)면 ROI / 전체 프레임 탐색을 워커 작업 하나로 실행
+      (locate()는 같은 작업에서 랜드마크까지 구함 -> 프레임을 공유 메모리에 한 번만 복사)
+    """
+    def __init__(self, detector, scale=0.5, padding=0.5, target_face_size=100, threshold=0, upsample=0,
+                 fallback_scale=1.0):
+        self.detector = detector  # dlib.get_frontal_face_detector()
+        self.pool = getattr(detector, "pool", None)  # 비전 워커 풀 (없으면 None)
+        self.scale = scale  # ROI 탐색 시 최소 축소 비율
+        self.padding = padding  # ROI 확장 비율 (얼굴 크기 대비)
+        self.target_face_size = target_face_size  # ROI 탐색 시 축소 후 얼굴 크기 목표 (HOG 창 80px 이상)
+        self.threshold = threshold  # 탐지 임계값 (0 => 비정상 탐지 방지)
+        self.upsample = upsample  # 전체 프레임 탐색 시 확대 횟수 (dlib upsample_num_times)
+        self.fallback_scale = fallback_scale  # 전체 프레임 탐색 시 축소 비율 (1.0이면 원본 해상도)
+        self.last_rect = None  # 마지막으로 찾은 얼굴 (원본 좌표)
+        self._lock = threading.Lock()
+
+    def regions(self, width, height, hint=None):
+        """탐색할 영역 목록 [(x0, y0, x1, y1, scale, upsample)] - ROI(있으면), 전체 프레임 순서"""
+        regions = []
+        if hint is not None:
+            # 마지막 얼굴 주변만 탐색
+            pad_x = int(hint.width() * self.padding)
+            pad_y = int(hint.height() * self.padding)
+            x0, y0 = max(0, hint.left() - pad_x), max(0, hint.top() - pad_y)
+            x1, y1 = min(width, hint.right() + pad_x), min(height, hint.bottom() + pad_y)
+            if x1 - x0 > 0 and y1 - y0 > 0:
+                roi_scale = min(1.0, max(self.scale, self.target_face_size / max(hint.width(), 1)))
+                regions.append((x0, y0, x1, y1, roi_scale, 0))
+        # ROI에서 못 찾으면 전체 프레임 탐색
+        regions.append((0, 0, width, height, self.fallback_scale, self.upsample))
+        return regions
+
+    def detect(self, image, hint=None):
+        """얼굴 탐지 후 원본 해상도 좌표의 dlib.rectangle 목록 반환 (hint: 예상 얼굴 위치)"""
+        return self._locate(image, hint, False)[0]
+
+    def locate(self, image, hint=None):
+        """
+        얼굴 탐지 -> (rects, 랜드마크)
+        - 워커 풀이 있으면 탐지와 랜드마크를 같은 작업에서 구해 (N, 68, 2) 배열로 반환
+        - 풀이 없으면 랜드마크는 None (호출한 쪽에서 랜드마크 모델 실행)
+        """
+        return self._locate(image, hint, self.pool is not None)
+
+    def _locate(self, image, hint, with_landmarks):
+        height, width = image.shape[:2]
+        with self._lock:
+            hint = hint if hint is not None else self.last_rect
+            regions = self.regions(width, height, hint)
+            landmarks = None
+            if self.pool is not None:
+                boxes, landmarks = self.pool.faces(image, regions=regions, threshold=self.threshold,
+                                                   landmarks=with_landmarks)
+            else:
+                boxes = scan_regions(self.detector, image, regions, self.threshold)
+            rects = [dlib.rectangle(*box) for box in boxes]
+
+            # 다음 탐색을 위해 가장 큰 얼굴 저장
+            self.last_rect = max(rects, key=lambda r: r.area()) if rects else None
+            return rects, landmarks
+
+    def reset(self):
+        with self._lock:
+            self.last_rect = None
+
+
+class FaceTracker:
+    """
+    탐지 후 추적(detect-then-track) 방식의 얼굴 추적기
+    - HOG 탐지는 detect_interval 프레임마다 한 번만 실행
+    - 그 사이 프레임은 dlib.correlation_tracker로 얼굴 위치를 따라감
+    - 추적 신뢰도(PSR)가 min_confidence 아래로 떨어지면 즉시 다시 탐지
+    - 다시 탐지할 때는 추적 중이던 위치 주변부터 탐색 (RoiFaceDetector)
+    - 워커 풀로 다시 탐지한 프레임은 랜드마크도 같이 받아서 last_landmarks에 보관 (추적한 프레임은 None)
+    """
+    def __init__(self, face_detector, detect_interval=10, min_confidence=7.0):
+        self.face_detector = face_detector  # RoiFaceDetector
+        self.detect_interval = detect_interval  # HOG 탐지 주기 (프레임)
+        self.min_confidence = min_confidence  # 추적 신뢰도 기준 (PSR)
+
+        self.trackers = []
+        self.last_rects = []  # 마지막으로 추적한 얼굴 위치
+        self.frames_since_detect = 0
+        self.last_detected = False  # 이번 프레임에서 HOG 탐지를 실행했는지 여부
+        self.last_landmarks = None  # 이번 프레임 탐지 작업에서 같이 구한 랜드마크 (없으면 None)
+
+    def update(self, gray):
+        """현재 프레임의 얼굴 위치 반환 (필요할 때만 HOG 탐지)"""
+        if self.trackers and self.frames_since_detect < self.detect_interval:
+            rects = self._track(gray)
+            if rects is not None:
+                self.last_rects = rects
+                self.frames_since_detect += 1
+                self.last_detected = False
+                self.last_landmarks = None
+                return rects
+
+        return self._redetect(gray)
+
+    def _track(self, gray):
+        """추적기로 위치 갱신 (하나라도 신뢰도가 낮으면 None)"""
+        rects = []
+        for tracker in self.trackers:
+            confidence = tracker.update(gray)
+            if confidence < self.min_confidence:
+                return None
+            rects.append(to_rectangle(tracker.get_position()))
+        return rects
+
+    def _redetect(self, gray):
+        # 추적하던 얼굴(가장 큰 것) 주변부터 탐색
+        hint = max(self.last_rects, key=lambda r: r.area()) if self.last_rects else None
+        rects, self.last_landmarks = self.face_detector.locate(gray, hint)
+        self.last_rects = rects
+        self.trackers = []
+        for rect in rects:
+            tracker = dlib.correlation_tracker()
+            tracker.start_track(gray, rect)
+            self.trackers.append(tracker)
+        self.frames_since_detect = 0
+        self.last_detected = True
+        return rects
+
+    def reset(self):
+        self.face_detector.reset()
+        self.trackers = []
+        self.last_rects = []
+        self.frames_since_detect = 0
+        self.last_detected = False
+        self.last_landmarks = None
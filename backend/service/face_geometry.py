@@ -0,0 +1,87 @@
+"""
+68 랜드마크 기하 계산 (EAR / MAR)
+- 모든 함수는 (68, 2) 배열 하나 또는 (N, 68, 2) 배열 묶음(여러 얼굴 / 여러 프레임)을 그대로 받음
+- 점 쌍 거리를 인덱스 배열로 한 번에 계산 (scipy euclidean / np.mean을 여러 번 호출하지 않음)
+"""
+import numpy as np
+
+NUM_LANDMARKS = 68
+
+# 거리를 계산할 점 쌍 (EAR/MAR 공식의 A, B, C 순서)
+_PAIRS = np.array([
+    # 오른쪽 눈 36~41 (화면 기준 왼쪽): |p1-p5|, |p2-p4|, |p0-p3|
+    (37, 41), (38, 40), (36, 39),
+    # 왼쪽 눈 42~47: |p1-p5|, |p2-p4|, |p0-p3|
+    (43, 47), (44, 46), (42, 45),
+    # 입 48~67: |m2-m10|, |m4-m8|, |m0-m6|
+    (50, 58), (52, 56), (48, 54),
+])
+_PAIR_A, _PAIR_B = _PAIRS[:, 0], _PAIRS[:, 1]
+
+
+class LandmarkBuffer:
+    """
+    dlib full_object_detection -> (68, 2) 배열 변환용 미리 할당한 버퍼
+    - 얼굴 수만큼 (max_faces, 68, 2) 배열을 재사용 (프레임마다 새 배열을 만들지 않음)
+    - 반환한 배열은 다음 프레임 변환 전까지만 유효 (보관하려면 copy())
+    """
+    def __init__(self, max_faces=4, dtype=np.int32):
+        self.dtype = dtype
+        self._buffer = np.empty((max_faces, NUM_LANDMARKS, 2), dtype=dtype)
+
+    def convert(self, shapes):
+        """full_object_detection 목록 -> (N, 68, 2) 배열 (버퍼의 앞부분 view)"""
+        count = len(shapes)
+        if count > len(self._buffer):
+            self._buffer = np.empty((count, NUM_LANDMARKS, 2), dtype=self.dtype)
+        out = self._buffer[:count]
+        for i, shape in enumerate(shapes):
+            shape_to_array(shape, out[i])
+        return out
+
+
+def shape_to_array(shape, out=None, dtype=np.int32):
+    """
+    dlib full_object_detection -> (68, 2) 배열 (out을 주면 그 배열에 복사)
+    - dlib 점은 파이썬에서 하나씩 읽을 수밖에 없으므로 fromiter로 중간 리스트 없이 배열을 만듦
+      (out에 점마다 대입하거나 리스트를 거치는 것보다 빠름)
+    """
+    count = shape.num_parts
+    flat = np.fromiter((c for p in shape.parts() for c in (p.x, p.y)), dtype=dtype, count=count * 2)
+    if out is None:
+        return flat.reshape(count, 2)
+    out.reshape(-1)[:] = flat
+    return out
+
+
+def pair_distances(landmarks):
+    """(..., 68, 2) -> (..., 9) EAR/MAR 공식에 쓰는 점 쌍 거리"""
+    landmarks = np.asarray(landmarks)
+    diff = landmarks[..., _PAIR_A, :] - landmarks[..., _PAIR_B, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+
+def aspect_ratios(landmarks):
+    """(..., 68, 2) -> (오른쪽 눈 EAR, 왼쪽 눈 EAR, MAR) 각각 (...) 배열"""
+    d = pair_distances(landmarks)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        right_ear = (d[..., 0] + d[..., 1]) / (2.0 * d[..., 2])
+        left_ear = (d[..., 3] + d[..., 4]) / (2.0 * d[..., 5])
+        mar = (d[..., 6] + d[..., 7]) / (2.0 * d[..., 8])
+    return right_ear, left_ear, mar
+
+
+class FaceGeometry:
+    """
+    여러 얼굴(또는 여러 프레임)의 기하 특징을 한 번에 계산한 결과
+    - ear: 두 눈 EAR 평균, mar: 입 MAR (모두 (N,) 배열)
+    - 머리 방향은 head_pose (solvePnP 각도)로 계산
+    """
+    def __init__(self, landmarks):
+        right_ear, left_ear, self.mar = aspect_ratios(landmarks)
+        self.right_ear = right_ear
+        self.left_ear = left_ear
+        self.ear = (right_ear + left_ear) / 2.0
+
+    def __len__(self):
+        return len(self.ear)
@@ -1,8 +1,11 @@
 from pymilvus import connections, Collection
 from dao.face_reset_dao import FaceResetDAO
+from service.camera_service import get_camera_bus
+from service.model_registry import get_model_registry
+from service.vision_pool import create_face_detector
+from service.face_detection import RoiFaceDetector
 import numpy as np
 import cv2
-import dlib
 import os
 import time
 import glob
@@ -18,33 +21,32 @@ class FaceResetService:
         self.user_id = 0
         self.face_vectors = {}  # 여러 얼굴 벡터 저장을 위한 딕셔너리
         
-        # dlib 모델 로드 (웹캠 캡처 추가)
-        LANDMARK_MODEL_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../models/shape_predictor_68_face_landmarks.dat"))
-        RECOGNITION_MODEL_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../models/dlib_face_recognition_resnet_model_v1.dat"))
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor(LANDMARK_MODEL_PATH)
-        self.face_rec_model = dlib.face_recognition_model_v1(RECOGNITION_MODEL_PATH)
+        # dlib 모델 (레지스트리에서 공유, 처음 사용할 때 로드)
+        self.detector = create_face_detector()
+        self.face_detector = RoiFaceDetector(self.detector)  # 마지막 얼굴 주변만 축소해서 탐지
+        self.predictor = get_model_registry().lazy("landmark_68")
+        self.face_rec_model = get_model_registry().lazy("face_recognition")
 
 
     # 웹캠을 실행하여 얼굴을 감지하고 벡터값을 추출하는 함수
     def capture_face(self):
-        # cap = cv2.VideoCapture(0)
-        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)  # DirectShow 강제 사용
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480) 
+        # 공유 카메라 버스에서 프레임 한 장만 받아옴 (장치를 매번 다시 열지 않음)
+        cap = get_camera_bus().subscribe()
 
-        if not cap.isOpened():
+        if cap is None:
             print("❌ 웹캠을 열 수 없습니다.")
             return None
 
         ret, frame = cap.read()
+        if ret:
+            frame = frame.copy()  # 구독을 해제하면 프레임 버퍼가 재사용되므로 복사해서 사용
         cap.release()
         if not ret:
             print("❌ 웹캠에서 프레임을 가져올 수 없습니다.")
             return None
 
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.detector(gray)
+        faces = self.face_detector.detect(gray)
 
         if len(faces) == 0:
             print("❌ 얼굴을 찾을 수 없습니다.")
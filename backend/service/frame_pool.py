@@ -0,0 +1,83 @@
+import threading
+
+import numpy as np
+
+from config.metrics import FRAME_POOL_ALLOCATIONS
+
+
+class PooledFrame:
+    """
+    풀에서 빌린 프레임 버퍼 (참조 카운트)
+    - retain()으로 사용자를 추가하고, 모든 사용자가 release()하면 버퍼가 풀로 돌아감
+    - 풀로 돌아간 버퍼는 다음 프레임에 덮어써지므로 release() 후에는 array를 사용하면 안 됨
+    - 이미 풀로 돌아간 프레임을 다시 retain() / release()하면 RuntimeError
+      (다른 소비자가 쓰는 버퍼를 덮어쓰기 전에 잘못된 참조 카운트를 바로 드러냄)
+    """
+    __slots__ = ("array", "pool", "_refs")
+
+    def __init__(self, array, pool):
+        self.array = array
+        self.pool = pool
+        self._refs = 1
+
+    def retain(self):
+        with self.pool._lock:
+            if self._refs <= 0:
+                raise RuntimeError("이미 풀로 돌아간 프레임은 retain할 수 없습니다")
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self.pool._lock:
+            if self._refs <= 0:
+                raise RuntimeError("이미 풀로 돌아간 프레임을 다시 release했습니다")
+            self._refs -= 1
+            if self._refs != 0:
+                return
+        self.pool._recycle(self.array)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+
+class FramePool:
+    """
+    재사용 가능한 프레임 버퍼 풀
+    - 30fps로 매 프레임 640x480x3 배열을 새로 만들지 않도록 다 쓴 버퍼를 다시 빌려줌
+    - 모양(shape, dtype)별로 빈 버퍼 목록을 따로 관리 (해상도가 바뀌어도 동작)
+    - 빈 버퍼가 없으면 새로 할당하고 기다리지 않음 (할당 횟수는 메트릭으로 확인)
+    - max_free: 모양별로 보관할 빈 버퍼 최대 개수 (넘는 버퍼는 버림)
+    """
+    def __init__(self, name="frames", max_free=8):
+        self.name = name
+        self.max_free = max_free
+        self._free = {}
+        self._lock = threading.Lock()
+        self._allocations = FRAME_POOL_ALLOCATIONS.labels(name)
+
+    def acquire(self, shape, dtype=np.uint8):
+        """버퍼 빌리기 -> PooledFrame (내용은 이전 프레임이 남아 있을 수 있음)"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            array = free.pop() if free else None
+        if array is None:
+            array = np.empty(shape, dtype=dtype)
+            self._allocations.inc()
+        return PooledFrame(array, self)
+
+    def adopt(self, array):
+        """밖에서 만든 배열을 풀 버퍼로 등록 (release되면 같은 모양의 다음 요청에 재사용)"""
+        return PooledFrame(array, self)
+
+    def _recycle(self, array):
+        key = (array.shape, array.dtype.str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_free:
+                free.append(array)
+
+    def free_count(self):
+        with self._lock:
+            return sum(len(free) for free in self._free.values())
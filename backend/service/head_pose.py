@@ -0,0 +1,92 @@
+import math
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# 3D 얼굴 모델 (mm, 정면을 볼 때 카메라 좌표계와 같은 방향: x 오른쪽, y 아래, z 카메라에서 멀어지는 방향)
+# 68 랜드마크 번호: 코끝 30, 턱 8, 눈 바깥쪽 끝 36 / 45, 입꼬리 48 / 54
+POSE_LANDMARKS = np.array([30, 8, 36, 45, 48, 54])
+MODEL_POINTS = np.array([
+    (0.0, 0.0, 0.0),  # 코끝
+    (0.0, 330.0, 65.0),  # 턱
+    (-225.0, -170.0, 135.0),  # 눈 바깥쪽 끝 (화면 왼쪽)
+    (225.0, -170.0, 135.0),  # 눈 바깥쪽 끝 (화면 오른쪽)
+    (-150.0, 150.0, 125.0),  # 입꼬리 (화면 왼쪽)
+    (150.0, 150.0, 125.0),  # 입꼬리 (화면 오른쪽)
+], dtype=np.float64)
+
+
+@lru_cache(maxsize=8)
+def camera_model(width, height):
+    """
+    해상도별 카메라 행렬 / 왜곡 계수 (해상도마다 한 번만 만들어서 캐시, 읽기 전용)
+    - 보정값이 없으므로 초점 거리 = 가로 크기, 주점 = 화면 중앙, 왜곡 없음으로 근사
+    """
+    focal = float(width)
+    matrix = np.array([
+        [focal, 0.0, width / 2.0],
+        [0.0, focal, height / 2.0],
+        [0.0, 0.0, 1.0],
+    ], dtype=np.float64)
+    distortion = np.zeros((4, 1), dtype=np.float64)
+    matrix.setflags(write=False)
+    distortion.setflags(write=False)
+    return matrix, distortion
+
+
+def rotation_to_euler(rvec):
+    """회전 벡터 -> (yaw, pitch, roll) 각도(도)
+    - yaw: 좌우로 고개를 돌린 각도 (화면 기준 오른쪽이 +)
+    - pitch: 고개를 숙이거나 든 각도 (숙이면 +)
+    - roll: 고개를 옆으로 기울인 각도 (화면 기준 시계 방향이 +)
+    """
+    rotation, _ = cv2.Rodrigues(rvec)
+    sy = math.hypot(rotation[0, 0], rotation[1, 0])
+    pitch = math.atan2(rotation[2, 1], rotation[2, 2])
+    yaw = math.atan2(-rotation[2, 0], sy)
+    roll = math.atan2(rotation[1, 0], rotation[0, 0])
+    return -math.degrees(yaw), math.degrees(pitch), math.degrees(roll)
+
+
+class HeadPoseEstimator:
+    """
+    solvePnP 기반 머리 자세(yaw / pitch / roll) 추정
+    - 고정된 3D 얼굴 모델 6점과 랜드마크 6점으로 회전을 구함 (얼굴 크기 / 위치와 무관한 각도)
+    - 카메라 행렬은 해상도별로 캐시 (camera_model)
+    - 직전 프레임의 자세를 초기값으로 반복 풀이 (useExtrinsicGuess) -> 적은 반복으로 수렴
+    - 얼굴을 놓치거나 결과가 이상하면(얼굴이 카메라 뒤) 초기값을 버리고 처음부터 다시 풀이
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._guesses = {}  # 얼굴 순서별 직전 (rvec, tvec)
+
+    def estimate(self, landmarks, frame_size, index=0):
+        """(68, 2) 랜드마크, (높이, 너비) -> (yaw, pitch, roll) 또는 None (풀이 실패)"""
+        height, width = frame_size[:2]
+        matrix, distortion = camera_model(int(width), int(height))
+        image_points = np.ascontiguousarray(landmarks[POSE_LANDMARKS], dtype=np.float64)
+
+        guess = self._guesses.get(index)
+        if guess is not None:
+            rvec, tvec = guess[0].copy(), guess[1].copy()
+            ok, rvec, tvec = cv2.solvePnP(MODEL_POINTS, image_points, matrix, distortion,
+                                          rvec, tvec, useExtrinsicGuess=True, flags=cv2.SOLVEPNP_ITERATIVE)
+        else:
+            ok, rvec, tvec = cv2.solvePnP(MODEL_POINTS, image_points, matrix, distortion,
+                                          flags=cv2.SOLVEPNP_ITERATIVE)
+
+        if not ok or tvec[2, 0] <= 0:
+            self._guesses.pop(index, None)
+            return None
+        self._guesses[index] = (rvec, tvec)
+        return rotation_to_euler(rvec)
+
+    def estimate_all(self, landmarks, frame_size):
+        """(N, 68, 2) -> 얼굴별 (yaw, pitch, roll) 또는 None 목록 (얼굴 수가 줄면 남은 초기값 정리)"""
+        poses = [self.estimate(face, frame_size, i) for i, face in enumerate(landmarks)]
+        for index in [i for i in self._guesses if i >= len(poses)]:
+            del self._guesses[index]
+        return poses
@@ -1,13 +1,17 @@
 from pymilvus import connections, Collection
 from dao.login_dao import LoginDAO
+from config.websocket import FACE_STATUS_TOPIC
+from service.camera_service import get_camera_bus
+from service.model_registry import get_model_registry
+from service.vision_pool import create_face_detector
+from service.face_detection import RoiFaceDetector
+from service.stream_service import StreamQuality, adaptive_stream
 import numpy as np
 import cv2
-import dlib
 import os
 import time
 import glob
 import asyncio
-import json
 import logging
 from typing import List, Dict, Optional, Generator, AsyncGenerator
 
@@ -48,17 +52,17 @@ class LoginService:
         # 등록 상태 플래그 (얼굴 등록 중에만 캡처 허용)
         self.registration_in_progress = False
         
-        # dlib 모델 로드
-        LANDMARK_MODEL_PATH = "models/shape_predictor_68_face_landmarks.dat"
-        RECOGNITION_MODEL_PATH = "models/dlib_face_recognition_resnet_model_v1.dat"
-        
-        if not os.path.exists(LANDMARK_MODEL_PATH) or not os.path.exists(RECOGNITION_MODEL_PATH):
+        # dlib 모델 (레지스트리에서 공유, 처음 사용할 때 로드)
+        models = get_model_registry()
+        if not models.available("landmark_68") or not models.available("face_recognition"):
             logger.error("dlib 모델 파일이 존재하지 않습니다")
             raise FileNotFoundError("dlib 모델 파일을 확인해주세요")
         
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor(LANDMARK_MODEL_PATH)
-        self.face_rec_model = dlib.face_recognition_model_v1(RECOGNITION_MODEL_PATH)
+        self.detector = create_face_detector()
+        # 마지막 얼굴 주변만 축소해서 탐지 (캡처 요청끼리 공유, 상태는 탐지기 안에서 락으로 보호)
+        self.face_detector = RoiFaceDetector(self.detector)
+        self.predictor = models.lazy("landmark_68")
+        self.face_rec_model = models.lazy("face_recognition")
         
         # 카메라 초기화
         self._initialize_camera()
@@ -69,48 +73,30 @@ class LoginService:
         self.frame_interval = 1/15  # 15fps
     
     def _initialize_camera(self) -> bool:
-        """최소한의 카메라 초기화 함수"""
+        """공유 카메라 버스 구독 (장치는 버스가 한 번만 열어서 관리)"""
         try:
-            # 이미 열려있고 작동 중이면 다시 초기화하지 않음
+            # 이미 구독 중이고 장치가 작동 중이면 다시 초기화하지 않음
             if self.cap and self.cap.isOpened():
-                ret, test_frame = self.cap.read()
-                if ret and test_frame is not None:
-                    logger.info("카메라가 이미 작동 중입니다")
-                    return True
+                logger.info("카메라가 이미 작동 중입니다")
+                return True
                     
-            # 기존 카메라 해제
+            # 기존 구독 해제
             self.release_camera()
             
-            # 카메라 연결 시도 (여러 번 시도)
-            for attempt in range(3):  # 최대 3번 시도
-                logger.info(f"카메라 연결 시도 {attempt+1}/3")
-                self.cap = cv2.VideoCapture(0)
-                
-                if self.cap and self.cap.isOpened():
-                    ret, test_frame = self.cap.read()
-                    if ret and test_frame is not None:
-                        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                        logger.info("카메라 연결 성공")
-                        return True
-                    else:
-                        self.cap.release()
-                        self.cap = None
-                        logger.warning(f"카메라 열렸으나 프레임 읽기 실패 ({attempt+1}/3)")
-                        time.sleep(0.5)
-                else:
-                    logger.warning(f"카메라 열기 실패 ({attempt+1}/3)")
-                    time.sleep(0.5)
-                    
-            logger.error("모든 카메라 연결 시도 실패")
-            return False
+            self.cap = get_camera_bus().subscribe()
+            if self.cap is None:
+                logger.error("카메라 구독 실패")
+                return False
+
+            logger.info("카메라 연결 성공")
+            return True
         except Exception as e:
             logger.error(f"카메라 초기화 오류: {e}")
             return False
     
     def release_camera(self):
-        """카메라 리소스를 명시적으로 해제"""
-        if self.cap is not None and self.cap.isOpened():
+        """카메라 구독을 명시적으로 해제 (장치는 버스가 idle 이후 해제)"""
+        if self.cap is not None:
             try:
                 self.cap.release()
                 self.cap = None
@@ -127,8 +113,7 @@ class LoginService:
             self._face_detected = detected
             self._last_detection_time = time.time()
             if manager:
-                message = json.dumps({"face_detected": detected})
-                await manager.broadcast(message)
+                await manager.broadcast(FACE_STATUS_TOPIC, {"face_detected": detected})
         return self._face_detected
 
     async def broadcast_face_status(self):
@@ -137,8 +122,7 @@ class LoginService:
             logger.warning("WebSocket 매니저가 설정되지 않았습니다")
             return
         try:
-            message = json.dumps({"face_detected": self._face_detected})
-            await manager.broadcast(message)
+            await manager.broadcast(FACE_STATUS_TOPIC, {"face_detected": self._face_detected})
             logger.debug(f"얼굴 감지 상태 브로드캐스트: {self._face_detected}")
         except Exception as e:
             logger.error(f"브로드캐스트 오류: {e}")
@@ -147,8 +131,14 @@ class LoginService:
         """현재 얼굴 감지 상태 반환"""
         return self.face_detected
 
-    def generate_frames_with_face_vectors(self) -> Generator[bytes, None, None]:
-        """얼굴 벡터 추출 및 프레임 생성"""
+    def generate_frames_with_face_vectors(self, quality: Optional[StreamQuality] = None) -> Generator[bytes, None, None]:
+        """얼굴 벡터 추출 및 프레임 생성 (클라이언트 전송 속도에 맞춰 해상도/품질/fps 조절)"""
+        # 기존 로그인 스트림 JPEG 품질(85)을 기본 상한으로 사용
+        quality = quality or StreamQuality(max_quality=85)
+        yield from adaptive_stream(self._face_frames(), quality)
+
+    def _face_frames(self) -> Generator[np.ndarray, None, None]:
+        """얼굴 감지 표시까지 끝난 프레임 생성"""
         try:
             # 카메라 초기화
             if not self._initialize_camera():
@@ -157,13 +147,12 @@ class LoginService:
                 empty_img = np.zeros((240, 320, 3), dtype=np.uint8)
                 cv2.putText(empty_img, "Camera Error", (50, 120), 
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 90]
-                _, buffer = cv2.imencode('.jpg', empty_img, encode_param)
-                frame_bytes = buffer.tobytes()
-                yield (b'--frame\r\n'
-                      b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                yield empty_img
                 return
             
+            # 스트림마다 탐지기를 따로 사용 (마지막 얼굴 위치를 다른 요청과 공유하지 않음)
+            # 얼굴이 없는 프레임은 기존 스트림 탐지처럼 0.5배로 축소해서 전체 탐색
+            face_detector = RoiFaceDetector(create_face_detector(), fallback_scale=0.5)
             while True:
                 current_time = time.time()
                 if current_time - self.last_frame_time < self.frame_interval:
@@ -176,17 +165,11 @@ class LoginService:
                     time.sleep(1)
                     continue
                 
-                processed_frame, self.face_detected = self.process_frame(frame)
+                # 공유 프레임이므로 그리기 전에 복사
+                processed_frame, self.face_detected = self.process_frame(frame.copy(), face_detector)
                 
-                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 85]
-                success, buffer = cv2.imencode('.jpg', processed_frame, encode_param)
-                if not success:
-                    logger.error("JPEG 인코딩 실패")
-                    continue
-                
-                frame_bytes = buffer.tobytes()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                # JPEG 인코딩은 adaptive_stream에서 클라이언트 품질에 맞춰 수행
+                yield processed_frame
                 self.last_frame_time = time.time()
         
         except Exception as e:
@@ -194,12 +177,12 @@ class LoginService:
         finally:
             self.release_camera()
 
-    def process_frame(self, frame):
-        """프레임 처리 및 얼굴 감지"""
+    def process_frame(self, frame, face_detector=None):
+        """프레임 처리 및 얼굴 감지 (face_detector: 스트림별 탐지기, 없으면 공유 탐지기)"""
         try:
-            small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
             start_time = time.time()
-            faces = self.detector(small_frame, 0)
+            # 축소/ROI 탐지 (좌표는 원본 해상도로 변환되어 반환)
+            faces = (face_detector or self.face_detector).detect(frame)
             
             if time.time() - start_time > 0.5:
                 logger.warning("얼굴 감지 타임아웃")
@@ -207,7 +190,7 @@ class LoginService:
             
             face_detected = len(faces) > 0
             for face in faces:
-                x, y, w, h = face.left()*2, face.top()*2, face.width()*2, face.height()*2
+                x, y, w, h = face.left(), face.top(), face.width(), face.height()
                 cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
             
             self._face_detected = face_detected
@@ -246,11 +229,12 @@ class LoginService:
                 return None
         
         face_vector = None
+        consumer = object()  # 스트림과 같은 구독을 읽으므로 이 캡처가 들고 있는 프레임을 따로 관리
         try:
             # 여러 번 시도
             max_attempts = 10
             for attempt in range(max_attempts):
-                success, frame = self.cap.read()
+                success, frame = self.cap.read(consumer=consumer)
                 if not success:
                     logger.warning(f"프레임 읽기 실패 ({attempt+1}/{max_attempts})")
                     time.sleep(0.3)
@@ -258,7 +242,7 @@ class LoginService:
                 
                 # 얼굴 감지
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.detector(gray, 0)
+                faces = self.face_detector.detect(gray)
                 
                 if len(faces) > 0:
                     try:
@@ -283,6 +267,8 @@ class LoginService:
             return None
         
         finally:
+            if self.cap is not None:
+                self.cap.release_frame(consumer)  # 읽은 프레임을 풀로 반환
             # 등록 과정 중에는 카메라 해제하지 않음
             if release_camera and not self.registration_in_progress:
                 logger.info("카메라 리소스 해제")
@@ -397,18 +383,19 @@ class LoginService:
                 return False
         
         # 단순화된 캡처 로직
+        consumer = object()  # 스트림과 같은 구독을 읽으므로 이 캡처가 들고 있는 프레임을 따로 관리
         try:
             face_vector = None
             # 최대 3회 시도
             for i in range(3):
-                ret, frame = self.cap.read()
+                ret, frame = self.cap.read(consumer=consumer)
                 if not ret:
                     time.sleep(0.5)
                     continue
                     
                 # 얼굴 감지
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.detector(gray, 0)
+                faces = self.face_detector.detect(gray)
                 
                 if len(faces) > 0:
                     shape = self.predictor(gray, faces[0])
@@ -433,6 +420,9 @@ class LoginService:
         except Exception as e:
             logger.error(f"좌측 얼굴 등록 오류: {e}")
             return False
+        finally:
+            if self.cap is not None:
+                self.cap.release_frame(consumer)  # 읽은 프레임을 풀로 반환
 
     # 우측 얼굴 등록 함수 간소화
     def register_face_right(self):
@@ -449,18 +439,19 @@ class LoginService:
                 return False
         
         # 단순화된 캡처 로직
+        consumer = object()  # 스트림과 같은 구독을 읽으므로 이 캡처가 들고 있는 프레임을 따로 관리
         try:
             face_vector = None
             # 최대 3회 시도
             for i in range(3):
-                ret, frame = self.cap.read()
+                ret, frame = self.cap.read(consumer=consumer)
                 if not ret:
                     time.sleep(0.5)
                     continue
                     
                 # 얼굴 감지
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.detector(gray, 0)
+                faces = self.face_detector.detect(gray)
                 
                 if len(faces) > 0:
                     shape = self.predictor(gray, faces[0])
@@ -493,6 +484,9 @@ class LoginService:
             logger.error(f"우측 얼굴 등록 오류: {e}")
             self.registration_in_progress = False
             return False
+        finally:
+            if self.cap is not None:
+                self.cap.release_frame(consumer)  # 읽은 프레임을 풀로 반환
 
     
     def register_user(self, user_id):
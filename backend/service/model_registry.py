@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+
+from config.metrics import MDE_INFERENCE_SECONDS, MODEL_LOADED, MODEL_MEMORY_BYTES
+from service.vision_pool import (
+    LANDMARK_MODEL_PATH, RECOGNITION_MODEL_PATH, PooledFaceRecognizer,
+    create_face_recognizer, create_shape_predictor,
+)
+
+
+class ModelEntry:
+    """등록된 모델 하나 (로더, 모델 파일, 로드된 인스턴스, 로드 시간)"""
+    def __init__(self, name, loader, path=None, description="", thread_safety="", memory=None):
+        self.name = name
+        self.loader = loader
+        self.path = path
+        self.description = description
+        self.thread_safety = thread_safety
+        self.memory = memory  # 인스턴스 -> 바이트 수 (None이면 모델 파일 크기)
+        self.instance = None
+        self.load_seconds = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def available(self):
+        """모델 파일이 있는지 (파일 없이 로드하는 모델은 항상 True)"""
+        return self.path is None or os.path.exists(self.path)
+
+    def memory_bytes(self):
+        if self.instance is None:
+            return 0
+        if self.memory is not None:
+            try:
+                return int(self.memory(self.instance))
+            except Exception:
+                pass
+        return os.path.getsize(self.path) if self.path and os.path.exists(self.path) else 0
+
+
+class LazyModel:
+    """
+    처음 속성에 접근하거나 호출할 때 레지스트리에서 모델을 가져오는 프록시
+    - 서비스를 import 시점에 만들어도 모델은 실제로 쓰일 때 로드됨
+    - 로드 후에는 모든 서비스가 같은 인스턴스를 사용
+    """
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+        self._instance = None
+
+    def resolve(self):
+        if self._instance is None:
+            self._instance = self._registry.get(self._name)
+        return self._instance
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyModel {self._name}>"
+
+
+class LockedFaceRecognizer:
+    """dlib.face_recognition_model_v1 공유용 래퍼 (dlib DNN은 동시에 호출하면 안전하지 않아 락으로 직렬화)"""
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+
+    def compute_face_descriptor(self, *args, **kwargs):
+        with self._lock:
+            return self.model.compute_face_descriptor(*args, **kwargs)
+
+
+class ModelRegistry:
+    """
+    모델 레지스트리
+    - 모델마다 한 번만 로드해서 모든 서비스가 공유 (처음 get() 할 때 로드)
+    - 모델마다 락이 있어서 여러 스레드가 동시에 요청해도 한 번만 로드
+    - describe()로 모델별 로드 여부 / 로드 시간 / 메모리 사용량 확인
+    - warm_up()으로 백그라운드 스레드에서 미리 로드 (첫 요청 지연 방지)
+
+    스레드 안전성
+    - landmark_68 (dlib.shape_predictor): 읽기 전용이라 여러 스레드에서 그대로 공유
+    - face_recognition (dlib ResNet): 동시 호출이 안전하지 않아 락으로 감싸서 공유
+      (VISION_WORKERS > 0이면 워커 프로세스에서 실행되므로 락 없이 공유)
+    - depth_validator (Orbbec 파이프라인 + Depth-Anything): 센서가 하나라 인스턴스 하나를 공유,
+      start()/stop()은 사용하는 서비스가 순서대로 호출
+    - HOG 얼굴 탐지기는 내부 버퍼가 있어 공유하면 안 되므로 등록하지 않음
+      (create_face_detector()로 서비스마다 따로 생성, 모델 파일이 없어 가벼움)
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, path=None, description="", thread_safety="", memory=None):
+        """모델 등록 (로드는 하지 않음)"""
+        with self._lock:
+            self._entries[name] = ModelEntry(name, loader, path, description, thread_safety, memory)
+
+    def _entry(self, name):
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+        return entry
+
+    def available(self, name):
+        return self._entry(name).available()
+
+    def is_loaded(self, name):
+        return self._entry(name).instance is not None
+
+    def get(self, name):
+        """모델 인스턴스 반환 (처음 호출 시 로드)"""
+        entry = self._entry(name)
+        if entry.instance is not None:
+            return entry.instance
+        with entry.lock:
+            if entry.instance is None:
+                if not entry.available():
+                    raise FileNotFoundError(f"모델 파일이 없습니다: {entry.path}")
+                started = time.perf_counter()
+                try:
+                    instance = entry.loader()
+                except Exception as e:
+                    entry.error = str(e)
+                    raise
+                entry.load_seconds = time.perf_counter() - started
+                entry.error = None
+                entry.instance = instance
+                print(f"✅ [Model] {name} 로드 완료 ({entry.load_seconds:.2f}초)")
+            return entry.instance
+
+    def lazy(self, name):
+        """처음 사용할 때 로드되는 프록시 반환 (서비스 생성 시점에는 로드하지 않음)"""
+        self._entry(name)
+        return LazyModel(self, name)
+
+    def warm_up(self, names=None, background=True):
+        """모델 미리 로드 (background=True면 스레드에서 로드하고 바로 반환)"""
+        names = list(names) if names is not None else list(self._entries)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"⚠️ [Model] {name} 미리 로드 실패: {e}")
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def memory_usage(self):
+        """모델별 메모리 사용량 (바이트, 메트릭용)"""
+        return {entry.name: entry.memory_bytes() for entry in list(self._entries.values())}
+
+    def loaded_states(self):
+        """모델별 로드 여부 (메트릭용)"""
+        return {entry.name: int(entry.instance is not None) for entry in list(self._entries.values())}
+
+    def describe(self):
+        """모델별 상태 요약"""
+        return [{
+            "name": entry.name,
+            "description": entry.description,
+            "path": entry.path,
+            "available": entry.available(),
+            "loaded": entry.instance is not None,
+            "load_seconds": entry.load_seconds,
+            "memory_bytes": entry.memory_bytes(),
+            "thread_safety": entry.thread_safety,
+            "error": entry.error,
+        } for entry in list(self._entries.values())]
+
+
+# ===== 모델 로더 =====
+def _load_face_recognizer():
+    model = create_face_recognizer(RECOGNITION_MODEL_PATH)
+    if isinstance(model, PooledFaceRecognizer):
+        return model  # 워커 프로세스에서 실행 (호출마다 별도 작업)
+    return LockedFaceRecognizer(model)
+
+def _load_depth_validator():
+    # torch / Orbbec SDK는 실제로 필요할 때만 import
+    from moca.moca_validation import DepthValidator
+    validator = DepthValidator()
+    validator.on_inference = MDE_INFERENCE_SECONDS.observe  # MDE 추론 시간 메트릭
+    return validator
+
+def _depth_validator_memory(validator):
+    """Depth-Anything 가중치 크기 (파라미터 + 버퍼)"""
+    model = validator.depth_predictor.model
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+# 싱글톤 인스턴스 생성
+model_registry = ModelRegistry()
+model_registry.register(
+    "landmark_68", lambda: create_shape_predictor(LANDMARK_MODEL_PATH), LANDMARK_MODEL_PATH,
+    description="dlib 68 얼굴 랜드마크", thread_safety="shared")
+model_registry.register(
+    "face_recognition", _load_face_recognizer, RECOGNITION_MODEL_PATH,
+    description="dlib ResNet 얼굴 임베딩", thread_safety="shared (lock)")
+model_registry.register(
+    "depth_validator", _load_depth_validator,
+    description="Orbbec 깊이 센서 + Depth-Anything V2 깊이 추정", thread_safety="shared (single sensor)",
+    memory=_depth_validator_memory)
+MODEL_MEMORY_BYTES.set_function(model_registry.memory_usage)
+MODEL_LOADED.set_function(model_registry.loaded_states)
+
+def get_model_registry():
+    """모델 레지스트리 인스턴스 반환"""
+    return model_registry
@@ -0,0 +1,180 @@
+import cv2
+from imutils import face_utils
+
+from service.drowsiness_state import DrowsinessStateMachine
+from service.face_analysis_service import FaceAnalyzer, FaceAnalysisStage
+from service.face_detection import RoiFaceDetector, FaceTracker
+
+
+class GazeAnalyzer(FaceAnalyzer):
+    """
+    시선 이탈(주의 분산) 감지 - 머리 자세(yaw / pitch 각도)가 기준 각도에서 벗어난 시간을 측정
+    - 각도는 solvePnP로 구한 값이라 얼굴 크기 / 카메라와의 거리와 무관 (첫 프레임으로 기준을 다시 잡지 않음)
+    - 카메라가 운전자 정면에 있지 않으면 BASE_YAW / BASE_PITCH를 세션 임계값으로 지정
+    """
+    # 세션 임계값으로 바꿀 수 있는 속성과 허용 범위 (이름: (최소, 최대))
+    THRESHOLDS = {
+        "GAZE_TIME_THRESH": (0.1, 60),
+        "HEAD_YAW_THRESH": (1, 90),
+        "HEAD_PITCH_THRESH": (1, 90),
+        "RESET_TIME_THRESH": (1, 3600),
+        "BASE_YAW": (-90, 90),
+        "BASE_PITCH": (-90, 90),
+    }
+
+    def __init__(self, put_text):
+        self.put_text = put_text  # 한글 텍스트 출력 함수 (img, text, pos, color) -> img
+
+        # ✅ 시선 이탈 감지 변수
+        self.GAZE_COUNT = 0
+        self.LAST_GAZE_TIME = None
+        self.NORMAL_GAZE_TIME = 0 # 현재시간에서 값이 추가되는 것 같아서 0으로 수정
+        self.GAZE_TIME_THRESH = 2
+        # 시선 이탈 각도 기준 (도) - 녹화 데이터로 보정한 값이 아닌 초기값
+        # (정면 주시 중 고개 움직임보다 크게 잡은 값, 설치 환경마다 다르므로 정상 주행 영상을
+        #  replay.py로 돌려 yaw / pitch p95보다 조금 크게 세션 임계값으로 조정)
+        self.HEAD_YAW_THRESH = 25  # 좌우로 이 각도(도) 이상 돌리면 시선 이탈
+        self.HEAD_PITCH_THRESH = 20  # 위아래로 이 각도(도) 이상 숙이거나 들면 시선 이탈
+        self.RESET_TIME_THRESH = 60  # 1분 동안 정상 시선 유지 시 초기화
+        self.IS_NORMAL_GAZE = False
+
+        self.BASE_YAW = 0.0  # 정면을 볼 때의 각도 (카메라 설치 위치 보정)
+        self.BASE_PITCH = 0.0
+
+    def reset(self):
+        # 꺼지면 초기화 되야하는 것들
+        self.LAST_GAZE_TIME = None
+        self.NORMAL_GAZE_TIME = 0
+
+    def analyze(self, analysis):
+        current_time = analysis.timestamp
+
+        if not analysis.face_detected:
+            self.IS_NORMAL_GAZE = False
+            self.NORMAL_GAZE_TIME = current_time  # 정상 시선 타이머 리셋
+
+        for head_pose in analysis.head_poses:
+            if head_pose is None:
+                continue  # 자세를 구하지 못한 프레임은 판단 보류 (이전 상태 유지)
+
+            # ✅ 시선 이탈 감지 (기준 각도와의 차이)
+            yaw, pitch, _ = head_pose
+            delta_yaw = abs(yaw - self.BASE_YAW)
+            delta_pitch = abs(pitch - self.BASE_PITCH)
+
+            # 🚀 **(수정) 시선 이탈이 2초 지속되었을 때만 카운트 증가**
+            if delta_yaw > self.HEAD_YAW_THRESH or delta_pitch > self.HEAD_PITCH_THRESH:
+                if self.LAST_GAZE_TIME is None:  # 시선 이탈 시작 시간 기록
+                    self.LAST_GAZE_TIME = current_time
+
+                elapsed_time = current_time - self.LAST_GAZE_TIME
+
+                if elapsed_time >= self.GAZE_TIME_THRESH:  # 🚨 **이탈이 2초 지속되었을 때만 증가**
+                    self.GAZE_COUNT += 1  # 🚨 시선 이탈 횟수 증가
+                    self.LAST_GAZE_TIME = None  # 초기화하여 중복 감지 방지
+                    self.NORMAL_GAZE_TIME = current_time  # ✅ **이탈 후 정상 시선 유지 시간 초기화**
+            else:
+                self.LAST_GAZE_TIME = None  # 기준 이하로 돌아오면 리셋
+
+        # 🚀 **(추가) 전방 주시 1분간 유지 시 초기화**
+        if (current_time - self.NORMAL_GAZE_TIME) >= self.RESET_TIME_THRESH:
+            print("🕒 1분간 정상 시선 유지: 시선 이탈 횟수 초기화")
+            self.GAZE_COUNT = 0
+            self.NORMAL_GAZE_TIME = current_time  # 타이머 리셋
+
+    def draw(self, frame, analysis):
+        if not analysis.face_detected:
+            return self.put_text(frame, "⚠️ 얼굴 감지 안됨", (10, 110), (0, 0, 255))
+
+        # ✅ 정상 시선 유지 시간 표시
+        normal_time = int(analysis.timestamp - self.NORMAL_GAZE_TIME)
+        normal_text = f"정상 시선 유지: {normal_time}초/{self.RESET_TIME_THRESH}초"
+        frame = self.put_text(frame, normal_text, (10, 70), (0, 255, 0))
+
+        # ✅ 주의 단계 & 경고 단계 표시
+        if self.GAZE_COUNT >= 5:
+            frame = self.put_text(frame, "🚨 운전 집중 경고!", (10, 120), (0, 0, 255))
+        elif self.GAZE_COUNT >= 2:
+            frame = self.put_text(frame, "⚠️ 전방 주시 주의!", (10, 120), (0, 255, 255))
+
+        # ✅ 시선 이탈 횟수 화면 표시 (흰색)
+        gaze_text = f"시선 이탈 횟수: {self.GAZE_COUNT}회"
+        return self.put_text(frame, gaze_text, (10, 30), (255, 120, 0))
+
+    def status(self):
+        """시선 이탈 상태 ("normal" / "warn" / "danger")"""
+        if self.GAZE_COUNT >= 5:
+            return "danger"
+        elif self.GAZE_COUNT >= 2:
+            return "warn"
+        else:
+            return "normal"
+
+
+class DrowsinessAnalyzer(FaceAnalyzer):
+    """졸음 감지 - 눈 감김(EAR), 하품(MAR), 눈 깜빡임 횟수를 기반으로 판단"""
+    def __init__(self, put_text):
+        self.put_text = put_text  # 한글 텍스트 출력 함수 (img, text, pos, color) -> img
+
+        # 졸음 판단은 프레임 timestamp 기반 상태 머신이 담당 (프레임레이트와 무관)
+        self.state = DrowsinessStateMachine()
+
+    def analyze(self, analysis):
+        if not analysis.face_detected:
+            return
+        # EAR(눈 감김 비율, 두 눈 평균) & MAR(입 벌림 비율) - 모든 얼굴을 한 번에 계산
+        # 머리 자세를 같이 넘겨서 고개를 크게 돌린 동안은 눈 감김 판단 보류
+        geometry = analysis.geometry
+        for i, head_pose in enumerate(analysis.head_poses):
+            try:
+                self.state.update(analysis.timestamp, float(geometry.ear[i]), float(geometry.mar[i]), head_pose)
+
+            except Exception as e:
+                print(f"❌ 눈/입 측정 중 오류 발생: {e}")
+                continue
+
+    def draw(self, frame, analysis):
+        # ✅ 얼굴 바운딩 박스 및 랜드마크 표시
+        for rect, shape in analysis.faces():
+            (x, y, w, h) = face_utils.rect_to_bb(rect)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            for (px, py) in shape:
+                cv2.circle(frame, (px, py), 1, (0, 255, 255), -1)
+
+        # 얼굴 인식이 불안정해도 상태 변수에 따라 텍스트가 깜빡이지 않게 표시
+        if analysis.face_detected:
+            # 졸음 경고 텍스트 (상태에 따라 표시)
+            if self.state.SLEEPY_WARNING_ACTIVE:
+                frame = self.put_text(frame, "🚨 졸음 경고! 운전 중지!", (10, 220), (0, 0, 255))
+            elif self.state.DROWSY_WARNING_ACTIVE:
+                frame = self.put_text(frame, "⚠️ 졸음 주의!", (10, 200), (0, 255, 255))
+
+            # 하품 표시는 시간 기반으로 표시 (최근 3초간만 표시)
+            if analysis.timestamp - self.state.LAST_YAWN_TIME < 3:
+                frame = self.put_text(frame, f"하품 감지됨! (총 {self.state.YAWN_COUNTER}회)", (10, 260), (0, 0, 255))
+
+            # 항상 표시할 정보 (깜빡임 없이 표시)
+            display_text = f"눈 깜빡임: {self.state.BLINK_COUNTER}회 | 하품: {self.state.YAWN_COUNTER}회"
+            frame = self.put_text(frame, display_text, (10, 160), (255, 120, 0))
+
+        return frame
+
+    def status(self):
+        """졸음 상태 ("normal" / "warn" / "danger")"""
+        return self.state.status()
+
+
+def create_monitoring_stage(detector, predictor, put_text, detect_interval=10, min_confidence=7.0):
+    """
+    모니터링 분석 단계 구성 (서비스와 오프라인 재생 도구가 같은 구성을 사용)
+    -> (FaceAnalysisStage, GazeAnalyzer, DrowsinessAnalyzer)
+    """
+    gaze_analyzer = GazeAnalyzer(put_text)
+    drowsiness_analyzer = DrowsinessAnalyzer(put_text)
+    face_detector = RoiFaceDetector(detector)  # 마지막 얼굴 주변만 축소해서 탐지
+    stage = FaceAnalysisStage(
+        face_detector, predictor,
+        analyzers=[gaze_analyzer, drowsiness_analyzer],
+        tracker=FaceTracker(face_detector, detect_interval, min_confidence),
+    )
+    return stage, gaze_analyzer, drowsiness_analyzer
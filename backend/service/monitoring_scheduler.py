@@ -0,0 +1,167 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config.metrics import (
+    MONITORING_ALERT_LATENCY_SECONDS, MONITORING_ANALYZED_FRAMES, MONITORING_IDLE, MONITORING_SHED_STAGES,
+)
+
+# 얼굴이 이 시간(초) 동안 보이지 않으면 저주기(idle) 모드로 전환
+IDLE_AFTER_SECONDS = float(os.getenv("MONITORING_IDLE_AFTER", "3.0"))
+# idle 모드에서 얼굴 탐지를 시도하는 주기 (fps)
+IDLE_DETECT_FPS = float(os.getenv("MONITORING_IDLE_FPS", "2.0"))
+# idle 중 매 프레임 확인하는 움직임 기준 (축소 흑백 영상의 평균 밝기 차이, 0~255), 0이면 확인하지 않음
+PRESENCE_THRESHOLD = float(os.getenv("MONITORING_PRESENCE_THRESHOLD", "6") or 0)
+# 프레임 처리 기한 (초, 캡처 ~ 분석 완료), 0이면 카메라 프레임 간격 사용
+FRAME_BUDGET_SECONDS = float(os.getenv("MONITORING_FRAME_BUDGET", "0") or 0)
+# 기한을 넘겨도 스트림 미리보기는 이 fps 이상으로 유지
+MIN_PREVIEW_FPS = float(os.getenv("MONITORING_MIN_PREVIEW_FPS", "5") or 0)
+DEFAULT_CAMERA_FPS = 30.0
+
+# 기한을 넘기면 건너뛰는 단계 (우선순위가 낮은 순, 알림 경로인 분석/상태 발행은 건너뛰지 않음)
+BEST_EFFORT_STAGES = ("overlay", "encode")
+
+
+class MotionPresence:
+    """
+    idle 중 매 프레임 실행하는 저비용 존재 확인
+    - 프레임을 32x24 흑백으로 줄여서 직전 프레임과의 평균 밝기 차이만 계산 (HOG 탐지의 수백분의 1 비용)
+    - 차이가 threshold 이상이면 누군가 움직였다고 보고 바로 전체 탐지를 요청
+    """
+    def __init__(self, threshold=PRESENCE_THRESHOLD, size=(32, 24)):
+        self.threshold = threshold
+        self.size = size
+        self.previous = None
+
+    def reset(self):
+        self.previous = None
+
+    def changed(self, frame):
+        """직전 프레임보다 threshold 이상 바뀌었는지 (첫 프레임은 기준으로만 저장)"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        previous, self.previous = self.previous, small
+        if previous is None:
+            return False
+        return float(cv2.absdiff(small, previous).mean()) >= self.threshold
+
+
+class MonitoringScheduler:
+    """
+    모니터링 루프의 분석 주기 결정 (얼굴 유무 / 스트림 시청자 수 기준)
+    - active: 얼굴이 보이는 동안은 카메라 fps 그대로 매 프레임 분석
+    - idle: idle_after초 동안 얼굴이 없으면 idle_fps로만 탐지 (주차 중 CPU / 발열 절약)
+    - idle 중에도 매 프레임 저비용 움직임 확인(MotionPresence)을 해서 움직임이 있으면 그 프레임을 바로 탐지
+      (idle 주기를 기다리지 않음), 얼굴이 탐지되면 바로 다음 프레임부터 다시 active
+    - 시청자가 없으면 오버레이 그리기 / JPEG 인코딩을 하지 않음 (분석과 알림은 그대로)
+
+    우선순위와 프레임 기한
+    - 분석(EAR/MAR/시선)과 상태 발행은 항상 가장 최근 프레임에서 먼저 실행
+    - 오버레이 / 인코딩은 best-effort: 캡처 ~ 분석 완료가 frame_budget을 넘으면 그 프레임은 건너뜀
+      (과부하에서도 다음 프레임 분석이 밀리지 않도록)
+    - 단, 미리보기가 min_preview_fps 아래로 떨어지지 않도록 그 간격이 지나면 기한을 넘겨도 표시
+    """
+    ACTIVE = "active"
+    IDLE = "idle"
+
+    def __init__(self, name="default", idle_after=IDLE_AFTER_SECONDS, idle_fps=IDLE_DETECT_FPS,
+                 frame_budget=FRAME_BUDGET_SECONDS, min_preview_fps=MIN_PREVIEW_FPS,
+                 presence_threshold=PRESENCE_THRESHOLD):
+        self.name = name
+        self.presence = MotionPresence(presence_threshold) if presence_threshold > 0 else None
+        self.idle_after = idle_after
+        self.idle_interval = 1.0 / idle_fps if idle_fps else 0.0
+        self.fixed_budget = frame_budget or None  # None이면 카메라 fps에서 계산
+        self.frame_budget = frame_budget or 1.0 / DEFAULT_CAMERA_FPS
+        self.preview_interval = 1.0 / min_preview_fps if min_preview_fps else None
+        self.last_preview = 0.0
+        self._last_decision = None  # 마지막으로 표시 여부를 정한 시각 (루프 주기 추정용)
+        self._idle_gauge = MONITORING_IDLE.labels(name)
+        self._alert_latency = MONITORING_ALERT_LATENCY_SECONDS.labels(name)
+        self.reset()
+
+    def set_frame_rate(self, fps):
+        """카메라 fps로 프레임 기한 설정 (MONITORING_FRAME_BUDGET을 지정했으면 그 값 유지)"""
+        if self.fixed_budget is None:
+            self.frame_budget = 1.0 / (fps if fps and fps > 0 else DEFAULT_CAMERA_FPS)
+
+    def reset(self):
+        """모니터링 시작 시 active로 시작 (처음 idle_after초 동안은 매 프레임 분석)"""
+        self.mode = self.ACTIVE
+        self.last_face_time = time.time()
+        self.last_analyzed = None
+        self._idle_gauge.set(0)
+        if self.presence is not None:
+            self.presence.reset()
+
+    @property
+    def checks_presence(self):
+        """idle 중에도 매 프레임을 읽어서 움직임을 확인하는지 (False면 idle 주기까지 읽지 않고 대기)"""
+        return self.presence is not None
+
+    def delay(self, now=None):
+        """다음 저주기 탐지까지 남은 시간 (초, active면 0)"""
+        if self.mode != self.IDLE or self.last_analyzed is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return max(0.0, self.last_analyzed + self.idle_interval - now)
+
+    def should_analyze(self, frame, now=None):
+        """
+        이번 프레임을 분석(얼굴 탐지)할지
+        - active면 항상, idle이면 저주기 탐지 시각이 됐거나 움직임이 확인됐을 때
+        """
+        if self.mode != self.IDLE:
+            return True
+        if self.presence is not None and self.presence.changed(frame):
+            return True
+        return self.delay(now) <= 0
+
+    def wants_overlay(self, viewers, captured=None, now=None):
+        """
+        오버레이를 그리고 스트림으로 보낼지
+        - 시청자가 없으면 False
+        - captured(프레임 캡처 시각)부터 지금까지 frame_budget을 넘었으면 건너뜀 (최소 미리보기 fps는 유지)
+        """
+        if viewers <= 0:
+            return False
+        now = time.time() if now is None else now
+        # 지금 건너뛰면 다음 표시는 빨라도 한 루프 뒤 -> 그때 최소 fps 간격을 넘을 것 같으면 지금 표시
+        period = now - self._last_decision if self._last_decision is not None else 0.0
+        self._last_decision = now
+        late = captured is not None and now - captured > self.frame_budget
+        if late and (self.preview_interval is None or now + period - self.last_preview <= self.preview_interval):
+            for stage in BEST_EFFORT_STAGES:
+                MONITORING_SHED_STAGES.labels(self.name, stage).inc()
+            return False
+        self.last_preview = now
+        return True
+
+    def record_alert(self, captured, now=None):
+        """알림 경로 지연 기록 (캡처 ~ 분석 / 상태 발행 완료)"""
+        if captured is not None:
+            now = time.time() if now is None else now
+            self._alert_latency.observe(now - captured)
+
+    def record(self, face_detected, now=None):
+        """분석 결과 반영 -> 현재 모드"""
+        now = time.time() if now is None else now
+        self.last_analyzed = now
+        MONITORING_ANALYZED_FRAMES.labels(self.name, self.mode).inc()
+
+        if face_detected:
+            self.last_face_time = now
+            if self.mode == self.IDLE:
+                self.mode = self.ACTIVE
+                self._idle_gauge.set(0)
+                print(f"👀 [Monitoring:{self.name}] 얼굴 감지 - 전체 프레임 분석으로 전환")
+        elif self.mode == self.ACTIVE and now - self.last_face_time >= self.idle_after:
+            self.mode = self.IDLE
+            self._idle_gauge.set(1)
+            if self.presence is not None:
+                self.presence.reset()
+            print(f"💤 [Monitoring:{self.name}] 얼굴 없음 {self.idle_after:.0f}초 - 저주기 탐지로 전환")
+        return self.mode
@@ -1,140 +1,149 @@
 import cv2
-import dlib
+import math
 import numpy as np
 import threading
-from imutils import face_utils
-from PIL import ImageFont, ImageDraw, Image
 from dao.monitoring_dao import MonitoringDAO
-from fastapi.responses import StreamingResponse
-from scipy.spatial import distance as dist
 
 import time
-import pygame
-import os
-import json
 
-from config.websocket import get_manager
+from config.websocket import get_manager, MONITORING_TOPIC
+from service.camera_service import get_camera_bus
+from service.model_registry import get_model_registry
+from service.vision_pool import LANDMARK_MODEL_PATH, create_face_detector
+from service.monitoring_analyzers import create_monitoring_stage
+from service.overlay_service import get_overlay_renderer
+from service.frame_pool import FramePool
+from service.stream_service import FrameBroadcaster, LatestFrame, StreamFrame
+from service.monitoring_scheduler import MonitoringScheduler
+from service.status_service import StatusPublisher
+
+
+
+_alert_sound_loaded = False
+_alert_sound_lock = threading.Lock()
+
+def load_alert_sound(path):
+    """경고음 로드 (pygame import / mixer 초기화는 프로세스에서 한 번만, 서버 시작을 막지 않도록 처음 필요할 때)"""
+    global _alert_sound_loaded
+    with _alert_sound_lock:
+        if _alert_sound_loaded:
+            return
+        _alert_sound_loaded = True
+        try:
+            import pygame
+            pygame.mixer.init()
+            pygame.mixer.music.load(path)
+        except Exception as e:
+            print(f"⚠️ 경고음 파일을 찾을 수 없습니다. ({e})")
+
 
+def session_topic(session_id):
+    """세션별 WebSocket 토픽 ("default" 세션은 기존 monitoring 토픽 그대로)"""
+    return MONITORING_TOPIC if session_id == "default" else f"{MONITORING_TOPIC}:{session_id}"
 
 
 class MonitoringService:
-    def __init__(self):
+    """
+    모니터링 세션 하나 (카메라 소스, 임계값, 분석 상태, 스트림 시청자를 세션마다 따로 가짐)
+    - session_id: 세션 이름 ("default"는 기존 /monitoring 라우트용)
+    - camera_source: 카메라 인덱스 또는 영상 경로 (None이면 자동 탐색한 기본 카메라)
+    - thresholds: 분석기 임계값 덮어쓰기 (예: {"EYE_AR_THRESH": 0.22, "GAZE_TIME_THRESH": 3})
+    - predictor: 랜드마크 모델 (None이면 모델 레지스트리에서 공유 모델 사용)
+    """
+    def __init__(self, session_id="default", camera_source=None, thresholds=None, predictor=None):
+        self.session_id = session_id
+        self.camera_source = camera_source
         self.running = False  # 모니터링 상태 (켜짐/꺼짐), 기본적으로 실행상태
-        self.detector = dlib.get_frontal_face_detector()  # 얼굴 검출기
+        self.detector = create_face_detector()  # 얼굴 검출기 (VISION_WORKERS > 0이면 워커 프로세스에서 실행)
         self.status = False # 기본값
         self.monitoring_dao = MonitoringDAO
-        self.cap = None  # OpenCV VideoCapture 객체
+        self.camera_bus = get_camera_bus()  # 모든 서비스가 공유하는 카메라 버스
+        self.cap = None  # 카메라 구독 객체 (cv2.VideoCapture와 같은 인터페이스)
         self.thread = None  # 실행 중인 모니터링 스레드
+        self.show_cv_window = False  # OpenCV 창 표시 (디버깅용)
+        self.last_analysis = None  # 마지막 프레임의 얼굴 분석 결과
 
-        # 최적화용 수치
-        self.frame_count = 0
-        self.current_rects = []
-        self.current_gray = None
-        
-        # self.predictor = dlib.shape_predictor("models/shape_predictor_68_face_landmarks.dat")  # 랜드마크 => 아래에서 호출 중 필요없음
-                
-        # ✅ 시선 이탈 감지 변수
-        self.GAZE_COUNT = 0  
-        self.LAST_GAZE_TIME = None  
-        self.NORMAL_GAZE_TIME = 0 # 현재시간에서 값이 추가되는 것 같아서 0으로 수정
-        self.GAZE_TIME_THRESH = 2  
-        self.HEAD_ANGLE_THRESH_X = 0.08  
-        self.HEAD_ANGLE_THRESH_Y = 0.1  
-        self.RESET_TIME_THRESH = 60  # 1분 동안 정상 시선 유지 시 초기화
-
-        self.BASE_HEAD_X = 0.0  # 기본값을 0으로 설정 
-        self.BASE_HEAD_Y = 0.0  
-        
-                # 졸음 감지 관련 변수 추가
-        self.EYE_CLOSED_TIME = 0  # 눈 감고 있는 누적 시간 (초)
-        self.DROWSY_WARNING_ACTIVE = False  # 졸음 주의 상태 여부
-        self.SLEEPY_WARNING_ACTIVE = False  # 졸음 경고 상태 여부
-        self.LAST_DROWSY_TIME = None  # 마지막 졸음 상태 기록
-        self.LAST_WARNING_TIME = None  # 마지막 경고 상태 기록
+        # ✅ 한글 텍스트 렌더러 (라벨 스프라이트 캐시 공유)
+        self.overlay = get_overlay_renderer()
         
-        # 졸음 감지 기준 변수 추가
-        self.EYE_AR_THRESH = 0.20  # 눈 감은 상태 기준
-        self.MOUTH_AR_THRESH = 0.75  # 하품 기준
-        self.DROWSY_DISPLAY_TIME = 10  # 주의 상태 표시 시간
-        self.WARNING_DISPLAY_TIME = 60  # 경고 상태 표시 시간 (1분간 유지)
-        
-        # 카운트 변수 추가
-        self.EYE_COUNTER = 0  # 눈 감은 시간 카운트
-        self.MOUTH_COUNTER = 0  # 하품 지속 카운트
-        self.BLINK_COUNTER = 0  # 눈 깜빡임 횟수 (1분 내)
-        self.YAWN_COUNTER = 0  # 하품 횟수 (1분 내)
-        self.RESET_TIME = time.time()  # 1분 기준 초기화 시간
-        self.LAST_YAWN_TIME = 0  # 마지막 하품 감지 시간 초기화
-
-        # 졸음 텍스트 유지용
-        self.text_display_state = None  # 'none', 'drowsy', 'sleepy' 중 하나의 상태만 유지
-        self.text_state_change_time = 0  # 상태 변경 시간
-        
-        # 졸음 감지 상태 관리 변수 추가
-        self.DROWSY_WARNING_ACTIVE = False
-        self.SLEEPY_WARNING_ACTIVE = False
-        self.LAST_DROWSY_TIME = None
-        self.LAST_WARNING_TIME = None
-        
-        # ✅ 한글 폰트 설정
-        font_path = "C:/Windows/Fonts/malgun.ttf"
-        self.font = ImageFont.truetype(font_path, 30)
-        
-        # ✅ 경고음 설정
-        pygame.mixer.init()
+        # ✅ 경고음 설정 (pygame은 처음 모니터링을 시작할 때 초기화)
         self.ALERT_SOUND = "alert.mp3"
-        try:
-            pygame.mixer.music.load(self.ALERT_SOUND)
-        except pygame.error:
-            print("⚠️ 경고음 파일을 찾을 수 없습니다.")
-            
-        # ✅ 모델 파일의 절대 경로 설정
-        base_dir = os.path.dirname(os.path.abspath(__file__))  # 현재 파일이 위치한 디렉토리
-        # 모델 파일 경로 설정
-        model_dir = os.path.join(base_dir, "..", "models")
-        # 현재 스크립트의 디렉토리 기준으로 절대 경로 설정
-        model_path = os.path.join(model_dir, "../models/shape_predictor_68_face_landmarks.dat")
-
-        try:
-            # 모델 파일의 절대 경로 확인 (디버깅용)
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            model_path = os.path.join(base_dir, "..", "models", "shape_predictor_68_face_landmarks.dat")
-            model_path = os.path.abspath(model_path)
-            
-            print(f"📂 모델 파일 절대 경로: {model_path}")
-            print(f"📂 모델 파일 존재 여부: {os.path.exists(model_path)}")
-            
-            if os.path.exists(model_path):
-                self.predictor = dlib.shape_predictor(model_path)
-                print(f"✅ dlib 모델 로드 성공")
-            else:
-                print(f"⚠️ 모델 파일이 없어 기능이 제한됩니다: {model_path}")
-                self.predictor = None  # 모델이 없어도 서버는 동작
-        except Exception as e:
-            print(f"⚠️ 모델 로드 중 오류 발생: {e}")
-            self.predictor = None
-                    
             
+        if predictor is not None:
+            self.predictor = predictor
+        else:
+            self.predictor = self._load_predictor()
+
+        # ✅ 얼굴 탐지 주기 설정 (사이 프레임은 correlation tracker로 추적)
+        self.DETECT_INTERVAL = 10  # HOG 탐지 주기 (프레임)
+        self.TRACK_CONFIDENCE_THRESH = 7.0  # 추적 신뢰도(PSR)가 이 값보다 낮으면 즉시 재탐지
+
+        # ✅ 프레임당 한 번 얼굴을 분석하고 결과를 시선/졸음 분석기가 공유
+        self.analysis_stage, self.gaze_analyzer, self.drowsiness_analyzer = create_monitoring_stage(
+            self.detector, self.predictor, self.put_text_korean,
+            self.DETECT_INTERVAL, self.TRACK_CONFIDENCE_THRESH,
+        )
+
+        # ✅ 표시용 프레임 버퍼 풀 (매 프레임 copy()로 새 배열을 만들지 않음)
+        self.frame_pool = FramePool(f"monitoring:{session_id}")
+
+        # ✅ 스트림 브로드캐스터 (시청자가 여러 명이어도 분석/인코딩은 프레임당 한 번)
+        # 분석은 모니터링 루프가 하고, 시청자가 있을 때만 표시한 프레임을 latest_frame에 넣음
+        self.latest_frame = LatestFrame()
+        self.broadcaster = FrameBroadcaster(self._produce_frames, name=f"monitoring:{session_id}")
+
+        # ✅ 분석 주기 조절 (시청자가 없으면 표시 생략, 얼굴이 없으면 저주기 탐지)
+        self.scheduler = MonitoringScheduler(session_id)
+
+        # ✅ 상태 이벤트 발행기 (상태가 바뀐 프레임에서만 WebSocket으로 전송, seq로 이어받기 지원)
+        self.topic = session_topic(session_id)
+        self.status_publisher = StatusPublisher(self.get_status_snapshot, get_manager(), self.topic)
+
+        # ✅ 세션별 임계값 덮어쓰기
+        if thresholds:
+            self.apply_thresholds(thresholds)
+
+    def _load_predictor(self):
+        """68 랜드마크 모델 (레지스트리에서 공유, 파일이 없으면 서버는 동작하도록 None 반환)"""
+        models = get_model_registry()
+        if not models.available("landmark_68"):
+            print(f"⚠️ 모델 파일이 없어 기능이 제한됩니다: {LANDMARK_MODEL_PATH}")
+            return None  # 모델이 없어도 서버는 동작
+        return models.lazy("landmark_68")  # 첫 프레임 분석 시 로드
+
+    def apply_thresholds(self, thresholds):
+        """
+        분석기 임계값 덮어쓰기 (시선 분석기 / 졸음 상태 머신의 THRESHOLDS에 있는 이름만 허용)
+        - 상태 변수(카운터, 타이머)나 내부 속성은 바꿀 수 없음
+        - 이름 / 타입 / 범위가 하나라도 잘못되면 ValueError (아무것도 바꾸지 않음)
+        """
+        targets = [self.gaze_analyzer, self.drowsiness_analyzer.state]
+        updates = []
+        for name, value in thresholds.items():
+            owners = [target for target in targets if name in target.THRESHOLDS]
+            if not owners:
+                raise ValueError(f"설정할 수 없는 임계값입니다: {name}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError(f"임계값은 숫자여야 합니다: {name}={value!r}")
+            low, high = owners[0].THRESHOLDS[name]
+            if not low <= value <= high:
+                raise ValueError(f"임계값 범위를 벗어났습니다: {name}={value} (허용 범위 {low}~{high})")
+            updates.extend((owner, name, value) for owner in owners)
+        for owner, name, value in updates:
+            setattr(owner, name, value)
 
     async def broadcast_status(self):
-        """현재 모니터링 상태를 WebSocket으로 브로드캐스트"""
+        """현재 모니터링 상태를 WebSocket으로 브로드캐스트 (seq 포함 스냅샷)"""
         try:
             manager = get_manager()
-            status_data = {
-                # 시선 이탈과 졸음 상태 분리
-                "distraction_state": self.get_distraction_status(),
-                "drowsiness_state": self.get_drowsiness_status(),
-            }
-            await manager.broadcast(json.dumps(status_data))
+            status_data = self.status_publisher.snapshot_message()
+            await manager.broadcast(self.topic, status_data)
         except Exception as e:
             print(f"상태 브로드캐스트 오류: {e}")
         
     def put_text_korean(self, img, text, pos, color=(0, 0, 255)):
-        """한글 텍스트를 화면에 출력하는 함수"""
-        img_pil = Image.fromarray(img)
-        draw = ImageDraw.Draw(img_pil)
-        draw.text(pos, text, font=self.font, fill=color)
-        return np.array(img_pil)
+        """한글 텍스트를 화면에 출력하는 함수 (캐시된 라벨을 해당 영역에만 블렌딩)"""
+        return self.overlay.put_text(img, text, pos, color)
         
     def get_monitoring_status(self):
         # return self.monitoring_dao.get_status # 현재 상태 반환
@@ -162,57 +171,32 @@ class MonitoringService:
             print(f"❌ 토글 처리 중 오류: {e}")
             return {"message": f"Error: {str(e)}", "status": self.status}
 
-    def find_camera(self):
-        """사용 가능한 카메라를 자동으로 찾는 함수"""
-        for index in range(10):  # 0부터 9까지 카메라 인덱스 확인
-            temp_cap = cv2.VideoCapture(index)
-            if temp_cap.isOpened():
-                temp_cap.release()  # 테스트 후 즉시 해제
-                print(f"✅ 사용 가능한 카메라 발견: 인덱스 {index}")
-                return index
-        
-        print("❌ 사용 가능한 카메라를 찾을 수 없습니다")
-        return None
-
     def start_monitoring(self):
         """모니터링 시작 (OpenCV 실행)"""
         if not self.running:
             self.running = True
+            load_alert_sound(self.ALERT_SOUND)
             
-            # 이전 카메라가 있으면 해제
+            # 이전 구독이 있으면 해제 (장치는 카메라 버스가 열어둔 상태로 유지)
             if self.cap is not None:
-                try:
-                    self.cap.release()
-                except:
-                    pass
+                self.cap.release()
                 self.cap = None
-                time.sleep(0.5)  # 잠시 대기
             
-            # 사용 가능한 카메라 찾기
-            camera_index = self.find_camera()
-            
-            if camera_index is not None:
-                try:
-                    self.cap = cv2.VideoCapture(camera_index)
-                    
-                    if not self.cap.isOpened():
-                        print(f"❌ 카메라 {camera_index}를 열 수 없습니다")
-                        self.running = False
-                        self.status = False
-                        return
-                    
-                    print(f"✅ 카메라 {camera_index} 시작됨")
-                except Exception as e:
-                    print(f"❌ 카메라 초기화 오류: {e}")
-                    self.running = False
-                    self.status = False
-                    return
-            else:
+            # 공유 카메라 구독 (장치 탐색/오픈은 버스에서 한 번만 수행)
+            try:
+                self.cap = self.camera_bus.subscribe(self.camera_source)
+            except Exception as e:
+                print(f"❌ 카메라 초기화 오류: {e}")
+                self.cap = None
+
+            if self.cap is None:
                 print("❌ 카메라를 찾을 수 없어 모니터링을 시작할 수 없습니다")
                 self.running = False
                 self.status = False
                 return
             
+            self.status = True  # /start로 시작해도 video_feed를 바로 사용할 수 있도록
+
             # 스레드 시작 부분은 기존과 동일
             if self.thread and self.thread.is_alive():
                 try:
@@ -229,6 +213,7 @@ class MonitoringService:
     def stop_monitoring(self):
         """ 모니터링 종료 - 카메라 자원 완전히 해제 """
         self.running = False
+        self.status = False
         
         # 스레드가 끝날 때까지 약간 대기 (블로킹 방지)
         if self.thread and self.thread.is_alive():
@@ -237,12 +222,12 @@ class MonitoringService:
             except:
                 pass
 
-        # 카메라 객체 정리
+        # 카메라 구독 정리
         if self.cap:
             print("📷 카메라 자원 해제 중...")
             # 윈도우 닫기
             cv2.destroyAllWindows()
-            # 비디오 캡처 해제 시도
+            # 구독 해제 (장치 해제는 카메라 버스가 담당)
             try:
                 self.cap.release()
             except Exception as e:
@@ -251,13 +236,10 @@ class MonitoringService:
                 self.cap = None
 
             # 추가 정리 (꺼지면 초기화 되야하는 것들)
-            self.LAST_GAZE_TIME = None
-            self.NORMAL_GAZE_TIME = 0
-            self.BASE_HEAD_X = 0.0
-            self.BASE_HEAD_Y = 0.0
-            self.frame_count = 0
-            self.current_gray = None
-            self.current_rects = []
+            self.analysis_stage.reset()
+            self.scheduler.reset()
+            self.latest_frame.clear()
+            self.status_publisher.check()  # 초기화된 상태 알림
             
                 
         print("✅ 모니터링이 완전히 종료되었습니다.")
@@ -276,28 +258,38 @@ class MonitoringService:
         # self.cap = cv2.VideoCapture(0) # start에서 호출 중이라 카메라가 중복호출로 에러 발생
         
         self.show_cv_window = False
+        self.scheduler.reset()
+        self.scheduler.set_frame_rate(self.cap.get(cv2.CAP_PROP_FPS) if self.cap is not None else None)
 
         while self.running:
             if self.cap is None:
                 break
 
+            # 얼굴이 없는 동안은 저주기로만 분석
+            # (움직임 확인을 끈 경우 기다리는 동안 카메라 버스는 디코딩하지 않음)
+            delay = self.scheduler.delay()
+            if delay > 0 and not self.scheduler.checks_presence:
+                time.sleep(min(delay, 0.1))  # 중지 요청을 빨리 확인하도록 나눠서 대기
+                continue
+
             ret, frame = self.cap.read()
             if not ret:
                 print("⚠️ [Monitoring] 웹캠에서 프레임을 가져오지 못했습니다!")
                 break
 
-            # ✅ Jupyter에서 만든 감지 함수 사용
-            # frame = self.detect_distraction(frame)  # detect_distraction 함수 호출
+            # idle 중에는 움직임 확인만 하고 저주기 탐지 시각 전이면 건너뜀 (움직임이 있으면 바로 탐지)
+            if not self.scheduler.should_analyze(frame):
+                continue
+
+            # ✅ 얼굴 분석 + 상태 발행 (시청자가 있을 때만 표시 / 스트림 전송)
+            output = self.process_frame(frame, self.cap.last_timestamp)
 
             # OpenCV 창 표시 (옵션)
             # 모니터링 실행 됐을 때 창 뜨는것 방지
             if self.show_cv_window:
-                cv2.imshow("Monitoring", frame)
+                cv2.imshow("Monitoring", output.image if output is not None else frame)
                 if cv2.waitKey(1) & 0xFF == ord('q'):  # 'q'를 누르면 종료
                     break
-            
-            else:
-                time.sleep(0)  # 30초 대기
 
         self.stop_monitoring()
         if self.show_cv_window:
@@ -305,58 +297,54 @@ class MonitoringService:
 
 
 
-    # 맨 위에 카메라 초기화 되지 않았을 경우 초기화 코드 추가
-    def generate_frames(self):
-        """웹캠 프레임을 지속적으로 생성하는 제너레이터"""
-
-        # 카메라가 초기화되지 않았거나 열려있지 않으면 초기화
-        if self.cap is None or not self.cap.isOpened():
-            try:
-                # 기존 카메라 객체 정리
-                if self.cap is not None:
-                    self.cap.release()
-                    self.cap = None
-                    time.sleep(0.5)  # 잠시 대기
-                    
-                # 새 카메라 객체 생성
-                self.cap = cv2.VideoCapture(0)
-                if not self.cap.isOpened():
-                    yield self._error_frame("카메라를 열 수 없습니다")
-                    return
-            except Exception as e:
-                yield self._error_frame(f"카메라 초기화 오류: {str(e)}")
-                return
-
-
-        # while문을 video탐지와 video오픈 및 모니터링 러닝까지 다 될경우 실행
-        while self.running and self.cap and self.cap.isOpened():
-            # try / except로 예외처리 추가
-            try:
-                success, frame = self.cap.read()
-                if not success:
-                    yield self._error_frame("프레임을 가져올 수 없습니다")
-                    continue
-                    
-                # 주의 분산 감지 로직 적용
-                detected_frame = self.detect_distraction(frame)
-                    
-                # 졸음 감지
-                detected_frame = self.detect_drowsiness(detected_frame)
+    def generate_frames(self, quality=None):
+        """웹캠 프레임을 지속적으로 생성하는 제너레이터 (시청자마다 하나)"""
+        # 분석/표시는 모니터링 루프가 프레임당 한 번만 수행하고, 시청자는 전송 속도에 맞는 품질로 받아감
+        return self.broadcaster.stream(quality)
 
-                if detected_frame is None:
-                    detected_frame = frame
+    def process_frame(self, frame, timestamp=None):
+        """
+        모니터링 루프에서 프레임 한 장 처리 -> 스트림으로 보낸 StreamFrame (표시하지 않았으면 None)
+        1) 알림 경로: 얼굴 분석(EAR/MAR/시선) + 상태 발행을 가장 먼저, 항상 수행
+        2) best-effort: 시청자가 있고 프레임 기한 안이면 풀 버퍼에 복사해서 결과를 그리고 스트림으로 보냄
+           (기한을 넘기면 건너뛰어서 다음 프레임 분석이 밀리지 않음, 스케줄러 참고)
+        """
+        try:
+            self._analyze(frame, timestamp)
+        except Exception as e:
+            print(f"❌ 얼굴 분석 중 심각한 오류 발생: {e}")
+        analysis = self.last_analysis
+        self.scheduler.record_alert(timestamp)
+        self.scheduler.record(analysis is not None and analysis.face_detected)
+
+        viewers = self.broadcaster.subscriber_count()
+        if not self.scheduler.wants_overlay(viewers, timestamp) and not self.show_cv_window:
+            return None
+
+        # 공유 프레임이므로 그리기 전에 풀 버퍼로 복사 (시청자가 모두 놓으면 재사용)
+        output = self.frame_pool.acquire(frame.shape)
+        np.copyto(output.array, frame)
+        if analysis is not None:
+            drawn = self.analysis_stage.draw(output.array, analysis)
+        else:
+            drawn = self._draw_error(output.array, "얼굴 분석 오류")
 
-                # 프레임을 JPG로 변환
-                _, buffer = cv2.imencode(".jpg", detected_frame)
-                frame_bytes = buffer.tobytes()
-                
-                yield (b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
-                    
-                    
-            except Exception as e:
-                print(f"❌ [Streaming] 프레임 처리 중 오류 발생: {e}")
-                yield self._error_frame(f"오류: {str(e)}")
+        # JPEG 인코딩은 시청자 품질별로 한 번씩만 수행 (StreamFrame)
+        if drawn is output.array:
+            stream_frame = StreamFrame(output)
+        else:
+            output.release()
+            stream_frame = StreamFrame(drawn)
+        self.latest_frame.put(stream_frame)
+        return stream_frame
+
+    def _produce_frames(self):
+        """모니터링 루프가 표시한 최신 프레임을 꺼내는 제너레이터 (브로드캐스터 전용)"""
+        last_seq = 0
+        while self.running:
+            last_seq, frame = self.latest_frame.get(last_seq, timeout=1.0)
+            if frame is not None:
+                yield frame
 
     # 오류 메시지 표시용 헬퍼 함수 추가
     def _error_frame(self, error_message):
@@ -365,286 +353,59 @@ class MonitoringService:
         print("에러 메세지:", error_message)
         cv2.putText(frame, error_message, (50, 240), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        _, buffer = cv2.imencode(".jpg", frame)
-        frame_bytes = buffer.tobytes()
-        return (b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
+        return frame
         
-    def eye_aspect_ratio(self, eye):
-        """눈의 EAR(눈 감김 비율) 계산"""
-        A = dist.euclidean(eye[1], eye[5])
-        B = dist.euclidean(eye[2], eye[4])
-        C = dist.euclidean(eye[0], eye[3])
-        return (A + B) / (2.0 * C)
-
-    def mouth_aspect_ratio(self, mouth):
-        """입의 MAR(입 벌림 비율) 계산"""
-        A = dist.euclidean(mouth[2], mouth[10])
-        B = dist.euclidean(mouth[4], mouth[8])
-        C = dist.euclidean(mouth[0], mouth[6])
-        return (A + B) / (2.0 * C)
-
-    def detect_drowsiness(self, frame):
-            """
-            졸음 감지 메서드 - 눈 감김과 하품을 기반으로 졸음 상태를 감지
-            """
-            # 전체 함수를 try-except로 감싸서 어떤 예외가 발생해도 프레임 반환
-            try:
-                
-                # 상태 변수가 없는 경우 초기화
-                if not hasattr(self, 'DROWSY_WARNING_ACTIVE'):
-                    self.DROWSY_WARNING_ACTIVE = False
-                if not hasattr(self, 'SLEEPY_WARNING_ACTIVE'):
-                    self.SLEEPY_WARNING_ACTIVE = False
-                
-                # 현재 시간 기록 (여러 타이머에 사용)
-                current_time = time.time()
-                
-                # 그레이스케일로 변환 (얼굴 탐지에 필요)
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                # 얼굴 탐지 실행
-                rects, _, _ = self.detector.run(gray, 0, 0)
-                
-                # 얼굴 처리 로직
-                if len(rects) > 0:  # 얼굴이 감지된 경우에만 처리
-                    for rect in rects:
-                        try:
-                            # 얼굴 랜드마크 추출
-                            shape = self.predictor(gray, rect)
-                            shape = face_utils.shape_to_np(shape)
-
-                            # ✅ 얼굴 바운딩 박스 및 랜드마크 표시
-                            (x, y, w, h) = face_utils.rect_to_bb(rect)  
-                            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                            for (px, py) in shape:
-                                cv2.circle(frame, (px, py), 1, (0, 255, 255), -1)
-                                    
-                            # 눈 및 입 영역 설정
-                            leftEye = shape[42:48]  # 오른쪽 눈
-                            rightEye = shape[36:42]  # 왼쪽 눈
-                            mouth = shape[48:68]  # 입 영역
-
-                            # EAR(눈 감김 비율) & MAR(입 벌림 비율) 계산
-                            leftEAR = self.eye_aspect_ratio(leftEye)
-                            rightEAR = self.eye_aspect_ratio(rightEye)
-                            ear = (leftEAR + rightEAR) / 2.0
-                            mar = self.mouth_aspect_ratio(mouth)
-
-                            # 1분마다 눈 깜빡임과 하품 카운트 초기화
-                            if current_time - self.RESET_TIME >= 60:
-                                self.BLINK_COUNTER = 0
-                                self.YAWN_COUNTER = 0
-                                self.RESET_TIME = current_time
-                                print("✅ 1분 경과: 눈 깜빡임/하품 카운트 초기화")
-
-                            # ===== 눈 감김 상태 처리 =====
-                            if ear < self.EYE_AR_THRESH:
-                                # 눈 감은 시간 누적
-                                self.EYE_CLOSED_TIME += 1/30  # 30FPS 가정
-                                
-                                # 1단계: 졸음 주의 (참조 코드와 동일한 조건 사용)
-                                if (self.BLINK_COUNTER <= 12 or self.BLINK_COUNTER >= 22 or self.YAWN_COUNTER >= 2) \
-                                and self.EYE_CLOSED_TIME >= 1 \
-                                and not self.SLEEPY_WARNING_ACTIVE:  # 경고 상태가 아닐 때만
-                                    if not self.DROWSY_WARNING_ACTIVE:
-                                        self.DROWSY_WARNING_ACTIVE = True
-                                        self.LAST_DROWSY_TIME = current_time
-                                        print("⚠️ 졸음 주의!")
-                                
-                                # 2단계: 졸음 경고 (참조 코드와 동일한 조건 사용)
-                                if (self.BLINK_COUNTER <= 10 or self.BLINK_COUNTER >= 24 or self.YAWN_COUNTER >= 3) \
-                                and self.EYE_CLOSED_TIME >= 2:
-                                    if not self.SLEEPY_WARNING_ACTIVE:
-                                        self.SLEEPY_WARNING_ACTIVE = True
-                                        self.LAST_WARNING_TIME = current_time
-                                        # pygame.mixer.music.play()
-                                        print("🚨 졸음 경고! 운전 중지!")
-                            
-                            else:
-                                # 눈을 뜬 상태에서 상태 유지 시간 확인 (참조 코드와 유사하게 구현)
-                                
-                                # 졸음 주의 유지 (3초)
-                                if self.DROWSY_WARNING_ACTIVE:
-                                    elapsed_drowsy = current_time - self.LAST_DROWSY_TIME
-                                    if elapsed_drowsy >= self.DROWSY_DISPLAY_TIME:
-                                        self.DROWSY_WARNING_ACTIVE = False
-                                        self.LAST_DROWSY_TIME = None
-                                
-                                # 졸음 경고 유지 (60초)
-                                if self.SLEEPY_WARNING_ACTIVE:
-                                    elapsed_warning = current_time - self.LAST_WARNING_TIME
-                                    if elapsed_warning >= self.WARNING_DISPLAY_TIME:
-                                        self.SLEEPY_WARNING_ACTIVE = False
-                                        self.LAST_WARNING_TIME = None
-                                        self.EYE_CLOSED_TIME = 0
-                                
-                                # 경고 상태가 아닐 때만 EYE_CLOSED_TIME 초기화
-                                if not self.SLEEPY_WARNING_ACTIVE:
-                                    self.EYE_CLOSED_TIME = 0
-                            
-                            # ===== 하품 감지 =====
-                            if mar > self.MOUTH_AR_THRESH:
-                                self.MOUTH_COUNTER += 1
-                                if self.MOUTH_COUNTER >= 30 and (current_time - self.LAST_YAWN_TIME > 1):
-                                    self.YAWN_COUNTER += 1
-                                    # 하품 감지 시 알림 (하지만 화면 출력은 루프 밖에서 처리)
-                                    print(f"😴 하품 감지됨! (총 {self.YAWN_COUNTER}회)")
-                                    self.LAST_YAWN_TIME = current_time
-                                    self.MOUTH_COUNTER = 0
-                            else:
-                                self.MOUTH_COUNTER = 0
-
-                            # ===== 눈 깜빡임 감지 =====
-                            if ear < self.EYE_AR_THRESH:
-                                self.EYE_COUNTER += 1
-                            else:
-                                if self.EYE_COUNTER > 0:
-                                    self.BLINK_COUNTER += 1
-                                self.EYE_COUNTER = 0
-
-                        except Exception as e:
-                            print(f"❌ 눈/입 측정 중 오류 발생: {e}")
-                            continue
-            
-                # ===== 텍스트 표시 부분 (for 루프 바깥) =====
-                # 중요: 얼굴 인식 여부와 상관없이 상태 변수에 따라 텍스트 표시
-                # 이렇게 하면 얼굴 인식이 불안정해도 텍스트가 깜빡이지 않음
-
-                if len(rects) > 0 :
-                    # 졸음 경고 텍스트 (상태에 따라 표시)
-                    if self.SLEEPY_WARNING_ACTIVE:
-                        frame = self.put_text_korean(frame, "🚨 졸음 경고! 운전 중지!", (10, 220), (0, 0, 255))
-                    elif self.DROWSY_WARNING_ACTIVE:
-                        frame = self.put_text_korean(frame, "⚠️ 졸음 주의!", (10, 200), (0, 255, 255))
-                        
-                    # 하품 표시는 시간 기반으로 표시 (최근 3초간만 표시)
-                    if current_time - self.LAST_YAWN_TIME < 3:
-                        frame = self.put_text_korean(frame, f"하품 감지됨! (총 {self.YAWN_COUNTER}회)", (10, 260), (0, 0, 255))
-                        
-                    # 항상 표시할 정보 (깜빡임 없이 표시)
-                    display_text = f"눈 깜빡임: {self.BLINK_COUNTER}회 | 하품: {self.YAWN_COUNTER}회"
-                    frame = self.put_text_korean(frame, display_text, (10, 160), (255, 120, 0))
-                        
-                # 항상 프레임 반환
-                return frame
-
-            except Exception as e:
-                print(f"❌ 졸음 감지 메서드 전체 오류: {e}")
-                return frame  # 어떤 경우에도 원본 프레임 반환
-            
-    # try / except 넣어서 버그등 예외상황 탐지하게 수정정        
-    def detect_distraction(self, frame):
-        """주의 분산 감지"""
+    def _analyze(self, frame, timestamp=None):
+        """얼굴 분석 단계 실행 (표시 없음) -> FaceAnalysis"""
+        self.last_analysis = None
+        analysis = self.analysis_stage.process(frame, timestamp)
+        self.last_analysis = analysis
+
+        # 상태가 바뀌었으면 바로 이벤트 발행 (알림 지연 = 1프레임)
+        self.status_publisher.check()
+        return analysis
+
+    def analyze_frame(self, frame, timestamp=None):
+        """얼굴 분석 단계 실행 후 분석 결과를 프레임에 표시"""
         try:
-            self.frame_count += 1
-
-            # 실시간 탐지가 안되서 15프레임당 탐지되게끔 설정 => 조금 버벅임
-            if self.frame_count % 15 == 0:
-                self.current_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                # run(img, 업샘플링 => 얼굴 여러개 탐지 1로 갈수록 더많이 탐지, 민감도 -1로 갈수록 유연 1로 갈수록 탐지가 잘 안됨)
-                rects, _, _  = self.detector.run(self.current_gray, 0, 0) # 임계값(0) 수정 => 비정상 탐지 너무 많음
-                self.current_rects = rects
-            
-
-            if len(self.current_rects) == 0:
-                self.IS_NORMAL_GAZE = False
-                self.NORMAL_GAZE_TIME = time.time()  # 정상 시선 타이머 리셋
-                frame = self.put_text_korean(frame, "⚠️ 얼굴 감지 안됨", (10, 110), (0, 0, 255))
-
-            # 이곳도 try except문 추가해서 버그 탐지 및 서버 리셋 막기 
-            for (i, rect) in enumerate(self.current_rects):
-                try:
-                    (x, y, w, h) = face_utils.rect_to_bb(rect)  
-
-                    shape = self.predictor(self.current_gray, rect)
-                    shape = face_utils.shape_to_np(shape)
-
-                    # ✅ 머리 기울기 계산 (정규화된 값)
-                    head_x = (np.mean(shape[36:42][:, 0]) - np.mean(shape[42:48][:, 0])) / w  
-                    head_y = (np.mean(shape[19:27][:, 1]) - np.mean(shape[0:17][:, 1])) / h  
-
-                    # ✅ 기준값 설정 (한 번만 저장)
-                    if self.BASE_HEAD_X == 0.0 or self.BASE_HEAD_Y == 0.0:
-                        self.BASE_HEAD_X = head_x
-                        self.BASE_HEAD_Y = head_y
-
-                    # ✅ 시선 이탈 감지
-                    delta_x = abs(head_x - self.BASE_HEAD_X)
-                    delta_y = abs(head_y - self.BASE_HEAD_Y)
-                    
-                    # 🚀 **(수정) 시선 이탈이 2초 지속되었을 때만 카운트 증가**
-                    if delta_x > self.HEAD_ANGLE_THRESH_X or delta_y > self.HEAD_ANGLE_THRESH_Y:
-                        if self.LAST_GAZE_TIME is None:  # 시선 이탈 시작 시간 기록
-                            self.LAST_GAZE_TIME = time.time()
-
-                        elapsed_time = time.time() - self.LAST_GAZE_TIME
-
-                        if elapsed_time >= self.GAZE_TIME_THRESH:  # 🚨 **이탈이 2초 지속되었을 때만 증가**
-                            self.GAZE_COUNT += 1  # 🚨 시선 이탈 횟수 증가
-                            self.LAST_GAZE_TIME = None  # 초기화하여 중복 감지 방지
-                            self.NORMAL_GAZE_TIME = time.time()  # ✅ **이탈 후 정상 시선 유지 시간 초기화**
-                    else:
-                        self.LAST_GAZE_TIME = None  # 기준 이하로 돌아오면 리셋
-
-                    # ✅ 정상 시선 유지 시간 표시
-                    normal_time = int(time.time() - self.NORMAL_GAZE_TIME)
-                    normal_text = f"정상 시선 유지: {normal_time}초/{self.RESET_TIME_THRESH}초"
-                    frame = self.put_text_korean(frame, normal_text, (10, 70), (0, 255, 0))
-
-                    # ✅ 주의 단계 & 경고 단계 표시
-                    if self.GAZE_COUNT >= 5:
-                        frame = self.put_text_korean(frame, "🚨 운전 집중 경고!", (10, 120), (0, 0, 255))
-                        # pygame.mixer.music.play()
-                    elif self.GAZE_COUNT >= 2:
-                        frame = self.put_text_korean(frame, "⚠️ 전방 주시 주의!", (10, 120), (0, 255, 255))
-                        # pygame.mixer.music.play()
-
-                    # ✅ 시선 이탈 횟수 화면 표시 (흰색)
-                    gaze_text = f"시선 이탈 횟수: {self.GAZE_COUNT}회"
-                    frame = self.put_text_korean(frame, gaze_text, (10, 30), (255, 120, 0))
-
-                except Exception as e:
-                    print(f"⚠️ 얼굴 랜드마크 처리 중 오류: {e}")
-                    continue  # 이 얼굴 건너뛰고 다음 얼굴 처리
-
-            # 🚀 **(추가) 전방 주시 1분간 유지 시 초기화**
-            if (time.time() - self.NORMAL_GAZE_TIME) >= self.RESET_TIME_THRESH:
-                print("🕒 1분간 정상 시선 유지: 시선 이탈 횟수 초기화")
-                self.GAZE_COUNT = 0
-                self.NORMAL_GAZE_TIME = time.time()  # 타이머 리셋
-
-            return frame
+            analysis = self._analyze(frame, timestamp)
+            return self.analysis_stage.draw(frame, analysis)
 
         except Exception as e:
-            print(f"❌ 주의 분산 감지 중 심각한 오류 발생: {e}")
-            # 오류 발생 시 기본 프레임에 오류 메시지 표시 후 반환
-            try:
-                height, width = frame.shape[:2]
-                cv2.putText(frame, f"Error: {str(e)}", (10, height//2), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            except:
-                # 프레임 처리도 안 되는 경우 빈 프레임 생성
-                frame = np.zeros((480, 640, 3), dtype=np.uint8)
-                
-            return frame
+            print(f"❌ 얼굴 분석 중 심각한 오류 발생: {e}")
+            return self._draw_error(frame, str(e))
+
+    def _draw_error(self, frame, message):
+        """오류 발생 시 기본 프레임에 오류 메시지 표시 후 반환"""
+        try:
+            height, width = frame.shape[:2]
+            cv2.putText(frame, f"Error: {message}", (10, height//2), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        except:
+            # 프레임 처리도 안 되는 경우 빈 프레임 생성
+            frame = np.zeros((480, 640, 3), dtype=np.uint8)
+            
+        return frame
         
     # 시선 이탈 상태만 확인
     def get_distraction_status(self):
-        if self.GAZE_COUNT >= 5:
-            return "danger"
-        elif self.GAZE_COUNT >= 2:
-            return "warn"
-        else:
-            return "normal"
+        return self.gaze_analyzer.status()
 
     # 졸음 상태만 확인
     def get_drowsiness_status(self):
-        if self.DROWSY_WARNING_ACTIVE:
-            return "danger"
-        elif self.SLEEPY_WARNING_ACTIVE:
-            return "warn"
-        else:
-            return "normal"
+        return self.drowsiness_analyzer.status()
+
+    # 졸음 지표 (슬라이딩 윈도우 PERCLOS / 깜빡임 / 하품) - 대시보드용
+    def get_drowsiness_metrics(self):
+        return self.drowsiness_analyzer.state.metrics()
+
+    def get_status_snapshot(self):
+        """WebSocket으로 보내는 상태 (시선 이탈과 졸음 상태 분리)"""
+        return {
+            "distraction_state": self.get_distraction_status(),
+            "drowsiness_state": self.get_drowsiness_status(),
+        }
+
 # def detect_distraction(self, frame):
 #     print("🧐 [DEBUG] 주의 분산 감지 함수 실행됨")  # ✅ 디버깅 로그 추가
 #     ...
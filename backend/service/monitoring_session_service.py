@@ -0,0 +1,131 @@
+import os
+import threading
+
+from service.camera_service import CAMERA_SOURCE
+from service.monitoring_service import MonitoringService
+
+DEFAULT_SESSION_ID = "default"
+# 기본 세션을 제외하고 동시에 만들 수 있는 세션 수 (세션마다 캡처 스레드 + 분석 파이프라인)
+MAX_SESSIONS = int(os.environ.get("MONITORING_MAX_SESSIONS", "4") or 0)
+# 세션에 지정할 수 있는 카메라 장치 인덱스 범위 (카메라 버스가 탐색하는 범위와 같음)
+MAX_CAMERA_INDEX = 9
+# 장치 인덱스 외에 세션에 지정할 수 있는 카메라 소스 이름 (쉼표 구분, CAMERA_SOURCE는 항상 허용)
+# 요청으로 받은 문자열을 그대로 열면 서버의 아무 파일 / 폴더나 열 수 있으므로 서버 설정에 있는 이름만 허용
+ALLOWED_CAMERA_SOURCES = {name.strip() for name in os.environ.get("MONITORING_CAMERA_SOURCES", "").split(",")
+                          if name.strip()}
+if CAMERA_SOURCE is not None:
+    ALLOWED_CAMERA_SOURCES.add(CAMERA_SOURCE)
+
+
+class SessionLimitError(Exception):
+    """세션 수 제한 초과 (429 응답)"""
+
+
+def validate_camera_source(camera_source):
+    """
+    요청으로 받은 카메라 소스 확인 -> 카메라 버스에 넘길 값 (허용하지 않는 값이면 ValueError)
+    - None: 기본 카메라, 정수 (또는 숫자 문자열): 0 ~ MAX_CAMERA_INDEX 장치 인덱스
+    - 문자열: ALLOWED_CAMERA_SOURCES에 있는 이름만
+    """
+    if camera_source is None:
+        return None
+    if isinstance(camera_source, str) and camera_source in ALLOWED_CAMERA_SOURCES:
+        return int(camera_source) if camera_source.isdigit() else camera_source
+    if isinstance(camera_source, str) and camera_source.isdigit():
+        camera_source = int(camera_source)
+    if isinstance(camera_source, int) and not isinstance(camera_source, bool):
+        if 0 <= camera_source <= MAX_CAMERA_INDEX:
+            return camera_source
+        raise ValueError(f"카메라 장치 인덱스는 0 ~ {MAX_CAMERA_INDEX} 사이여야 합니다: {camera_source}")
+    raise ValueError(f"허용되지 않은 카메라 소스입니다: {camera_source}")
+
+
+class MonitoringSessionManager:
+    """
+    모니터링 세션 관리자
+    - 세션 ID(좌석/차량/운전자)마다 독립된 MonitoringService를 만들어 관리
+      (카메라 소스, 임계값, 분석 상태, 스트림 시청자, WebSocket 토픽이 세션마다 분리됨)
+    - 랜드마크 모델은 모델 레지스트리에서 한 번만 로드하고 모든 세션이 공유
+    - "default" 세션은 기존 /monitoring 라우트가 사용
+    - 카메라 소스는 장치 인덱스와 서버 설정의 이름만 허용, 기본 세션 외 세션 수는 max_sessions개까지
+    """
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def attach_loop(self, loop):
+        """상태 이벤트를 보낼 이벤트 루프 등록 (기존/이후 세션 모두에 적용)"""
+        with self._lock:
+            self._loop = loop
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.status_publisher.attach_loop(loop)
+
+    def create(self, session_id, camera_source=None, thresholds=None):
+        """새 세션 생성 (이미 있거나 카메라 소스를 허용하지 않으면 ValueError, 세션 수 초과면 SessionLimitError)"""
+        camera_source = validate_camera_source(camera_source)
+        with self._lock:
+            if session_id in self._sessions:
+                raise ValueError(f"이미 존재하는 세션입니다: {session_id}")
+            if session_id != DEFAULT_SESSION_ID:
+                count = sum(1 for name in self._sessions if name != DEFAULT_SESSION_ID)
+                if count >= self.max_sessions:
+                    raise SessionLimitError(f"세션은 최대 {self.max_sessions}개까지 만들 수 있습니다")
+            session = MonitoringService(session_id, camera_source, thresholds)
+            if self._loop is not None:
+                session.status_publisher.attach_loop(self._loop)
+            self._sessions[session_id] = session
+            print(f"✅ [Monitoring] 세션 생성: {session_id} (카메라: {camera_source})")
+            return session
+
+    def get(self, session_id):
+        """세션 반환 (없으면 None)"""
+        return self._sessions.get(session_id)
+
+    def default(self):
+        """기존 라우트용 기본 세션 (없으면 생성)"""
+        session = self.get(DEFAULT_SESSION_ID)
+        if session is None:
+            try:
+                session = self.create(DEFAULT_SESSION_ID)
+            except ValueError:
+                # 다른 스레드가 먼저 만든 경우
+                session = self.get(DEFAULT_SESSION_ID)
+        return session
+
+    def remove(self, session_id):
+        """세션 중지 후 삭제 (기본 세션은 삭제하지 않고 중지만)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            if session_id != DEFAULT_SESSION_ID:
+                del self._sessions[session_id]
+        session.stop_monitoring()
+        print(f"⛔ [Monitoring] 세션 삭제: {session_id}")
+        return True
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def describe(self, session):
+        """세션 상태 요약 (status 라우트 응답)"""
+        return {
+            "session_id": session.session_id,
+            "camera_source": session.camera_source,
+            "status": session.status,
+            "viewers": session.broadcaster.subscriber_count(),
+            "distraction_state": session.get_distraction_status(),
+            "drowsiness_state": session.get_drowsiness_status(),
+        }
+
+
+# 싱글톤 인스턴스 생성
+session_manager = MonitoringSessionManager()
+
+def get_session_manager():
+    """모니터링 세션 관리자 인스턴스 반환"""
+    return session_manager
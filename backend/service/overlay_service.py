@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import ImageFont, ImageDraw, Image
+
+# ✅ 한글 폰트 설정
+FONT_PATH = "C:/Windows/Fonts/malgun.ttf"
+
+
+class OverlayRenderer:
+    """
+    프레임 위에 한글 텍스트를 그리는 렌더러
+    - 전체 프레임을 PIL 이미지로 변환하지 않고, 라벨마다 알파 마스크를 한 번만 래스터화
+    - (텍스트, 폰트 크기, 색상) 키로 LRU 캐시에 저장해서 재사용
+    - 라벨이 차지하는 영역(ROI)만 프레임에 직접 알파 블렌딩 (in-place)
+    """
+    def __init__(self, font_path=FONT_PATH, cache_size=256):
+        self.font_path = font_path
+        self.cache_size = cache_size
+        self._fonts = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            try:
+                font = ImageFont.truetype(self.font_path, size)
+            except OSError:
+                # 폰트가 없는 환경(리눅스 서버 등)에서도 서버는 동작하도록 기본 폰트 사용
+                print(f"⚠️ 폰트 파일을 찾을 수 없어 기본 폰트를 사용합니다: {self.font_path}")
+                try:
+                    font = ImageFont.load_default(size)
+                except TypeError:
+                    font = ImageFont.load_default()
+            self._fonts[size] = font
+        return font
+
+    def _sprite(self, text, size, color):
+        """라벨 스프라이트 반환 -> (x 오프셋, y 오프셋, 알파, 1-알파, 색상*알파)"""
+        key = (text, size, color)
+        with self._lock:
+            sprite = self._cache.get(key)
+            if sprite is not None:
+                self._cache.move_to_end(key)
+                return sprite
+
+        font = self._font(size)
+        left, top, right, bottom = font.getbbox(text)
+        width, height = max(right - left, 1), max(bottom - top, 1)
+
+        # 텍스트 모양만 8비트 마스크로 래스터화 (PIL draw.text와 같은 위치 기준)
+        mask = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+
+        alpha = np.asarray(mask, dtype=np.float32)[:, :, None] / 255.0
+        colored = alpha * np.array(color, dtype=np.float32)
+        sprite = (left, top, alpha, 1.0 - alpha, colored)
+
+        with self._lock:
+            self._cache[key] = sprite
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return sprite
+
+    def put_text(self, frame, text, pos, color=(0, 0, 255), size=30):
+        """frame에 텍스트를 직접 그리고 같은 frame 반환 (color는 프레임 채널 순서)"""
+        left, top, alpha, inv_alpha, colored = self._sprite(text, size, tuple(color))
+
+        frame_h, frame_w = frame.shape[:2]
+        x, y = pos[0] + left, pos[1] + top
+        h, w = alpha.shape[:2]
+
+        # 프레임 밖으로 나가는 부분 잘라내기
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return frame
+
+        sx, sy = x0 - x, y0 - y
+        sprite_slice = (slice(sy, sy + y1 - y0), slice(sx, sx + x1 - x0))
+
+        roi = frame[y0:y1, x0:x1]
+        blended = roi * inv_alpha[sprite_slice] + colored[sprite_slice]
+        np.copyto(roi, blended, casting="unsafe")
+        return frame
+
+
+# 싱글톤 인스턴스 생성 (라벨 캐시를 모든 서비스가 공유)
+overlay_renderer = OverlayRenderer()
+
+def get_overlay_renderer():
+    """오버레이 렌더러 인스턴스 반환"""
+    return overlay_renderer
@@ -0,0 +1,168 @@
+import math
+import threading
+
+
+class RollingWindow:
+    """
+    최근 window초 동안의 합계를 유지하는 시간 링 버퍼
+    - 시간을 resolution초 크기의 칸으로 나누고, 칸 배열을 링으로 재사용
+    - add(): 현재 칸에 더하기만 함 (O(1))
+    - 시간이 지나 칸이 넘어갈 때 밀려나는 칸 값만 합계에서 빼므로 매 프레임 전체를 다시 더하지 않음
+      (창 경계 오차는 최대 한 칸)
+    - 시간이 조금 거꾸로 가면 (창 안) 그대로 두고, 창보다 크게 거꾸로 가면 (시계 재설정, 영상 다시 재생)
+      이전 기록을 모두 비우고 새 시각부터 다시 시작
+    """
+    def __init__(self, window=60.0, resolution=1.0):
+        self.window = float(window)
+        self.resolution = float(resolution)
+        self.size = max(1, int(math.ceil(self.window / self.resolution)))
+        self.reset()
+
+    def reset(self):
+        self._bins = [0.0] * self.size
+        self._total = 0.0
+        self._head = None  # 가장 최근 칸 번호 (timestamp // resolution)
+
+    def _slot(self, timestamp):
+        return int(math.floor(timestamp / self.resolution))
+
+    def advance(self, timestamp):
+        """timestamp까지 시간을 진행 (창에서 벗어난 칸을 비우고 합계에서 뺌)"""
+        slot = self._slot(timestamp)
+        if self._head is None:
+            self._head = slot
+            return
+        steps = slot - self._head
+        if steps <= -self.size:
+            # 창보다 크게 거꾸로 감 -> 이후 샘플이 모두 무시되지 않도록 새 시각부터 다시 시작
+            self.reset()
+            self._head = slot
+            return
+        if steps <= 0:
+            return
+        if steps >= self.size:
+            # 창 전체가 지나감 -> 전부 비움
+            self._bins = [0.0] * self.size
+            self._total = 0.0
+        else:
+            for offset in range(1, steps + 1):
+                index = (self._head + offset) % self.size
+                self._total -= self._bins[index]
+                self._bins[index] = 0.0
+            self._total = max(self._total, 0.0)  # 부동소수 오차로 음수가 되지 않도록
+        self._head = slot
+
+    def add(self, timestamp, value=1.0):
+        """timestamp 시각에 value 추가 (창 안의 과거 시각이면 그 칸에 더함)"""
+        self.advance(timestamp)
+        self._bins[self._slot(timestamp) % self.size] += value
+        self._total += value
+
+    def total(self, now=None):
+        """창 안의 합계 (now를 주면 그 시각 기준으로 만료 반영)"""
+        if now is not None:
+            self.advance(now)
+        return self._total
+
+
+class DrowsinessWindows:
+    """
+    졸음 지표용 슬라이딩 윈도우 묶음 (프레임당 O(1) 갱신)
+    - PERCLOS: 최근 perclos_window초 중 눈을 감고 있던 시간 비율
+    - 눈 깜빡임: 최근 blink_window초의 횟수 / 분당 횟수 / 평균 지속 시간
+    - 하품: 최근 yawn_window초의 횟수 / 분당 횟수
+    - 모니터링 스레드에서 갱신하고 API에서 읽으므로 락으로 보호
+    """
+    def __init__(self, perclos_window=60.0, blink_window=60.0, yawn_window=60.0, resolution=1.0):
+        self.closed_time = RollingWindow(perclos_window, resolution)
+        self.observed_time = RollingWindow(perclos_window, resolution)
+        self.blinks = RollingWindow(blink_window, resolution)
+        self.blink_time = RollingWindow(blink_window, resolution)
+        self.yawns = RollingWindow(yawn_window, resolution)
+        self.started = None  # 첫 샘플 시각 (창이 다 차기 전 분당 횟수 보정용)
+        self.last_timestamp = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            for window in self._windows():
+                window.reset()
+            self.started = None
+            self.last_timestamp = None
+
+    def _windows(self):
+        return (self.closed_time, self.observed_time, self.blinks, self.blink_time, self.yawns)
+
+    def add_sample(self, timestamp, elapsed, closed_elapsed):
+        """
+        프레임 샘플 하나 (눈 감김 여부를 판단할 수 있을 때만)
+        - elapsed: 직전 샘플부터 경과 시간, closed_elapsed: 그중 눈을 감고 있던 시간
+        """
+        with self._lock:
+            if self.started is None:
+                self.started = timestamp
+            self.last_timestamp = timestamp
+            self.observed_time.add(timestamp, elapsed)
+            if closed_elapsed > 0:
+                self.closed_time.add(timestamp, closed_elapsed)
+
+    def add_blink(self, timestamp, duration):
+        with self._lock:
+            self.blinks.add(timestamp)
+            self.blink_time.add(timestamp, duration)
+
+    def add_yawn(self, timestamp):
+        with self._lock:
+            self.yawns.add(timestamp)
+
+    def _per_minute(self, window, now):
+        # 창이 다 차기 전에는 실제로 관찰한 시간 기준으로 환산
+        span = min(window.window, max(now - self.started, window.resolution))
+        return window.total(now) * 60.0 / span
+
+    def blink_count(self, now=None):
+        with self._lock:
+            return int(round(self.blinks.total(now)))
+
+    def yawn_count(self, now=None):
+        with self._lock:
+            return int(round(self.yawns.total(now)))
+
+    def perclos(self, now=None):
+        with self._lock:
+            observed = self.observed_time.total(now)
+            return self.closed_time.total(now) / observed if observed > 0 else 0.0
+
+    def snapshot(self, now=None):
+        """대시보드용 지표 (now가 없으면 마지막 샘플 시각 기준)"""
+        with self._lock:
+            now = self.last_timestamp if now is None else now
+            if now is None or self.started is None:
+                return {
+                    "perclos": 0.0, "blink_count": 0, "blinks_per_minute": 0.0,
+                    "mean_blink_duration": None, "yawn_count": 0, "yawns_per_minute": 0.0,
+                    "windows": self._window_sizes(),
+                }
+            observed = self.observed_time.total(now)
+            blinks = self.blinks.total(now)
+            blink_time = self.blink_time.total(now)
+            return {
+                "perclos": self.closed_time.total(now) / observed if observed > 0 else 0.0,
+                "blink_count": int(round(blinks)),
+                "blinks_per_minute": self._per_minute(self.blinks, now),
+                "mean_blink_duration": blink_time / blinks if blinks >= 1 else None,
+                "yawn_count": int(round(self.yawns.total(now))),
+                "yawns_per_minute": self._per_minute(self.yawns, now),
+                "windows": self._window_sizes(),
+            }
+
+    def sizes(self):
+        """(PERCLOS, 눈 깜빡임, 하품) 윈도우 크기 (초)"""
+        return (self.closed_time.window, self.blinks.window, self.yawns.window)
+
+    def _window_sizes(self):
+        return {
+            "perclos": self.closed_time.window,
+            "blink": self.blinks.window,
+            "yawn": self.yawns.window,
+        }
@@ -0,0 +1,331 @@
+import asyncio
+import importlib
+import json
+import os
+import threading
+import time
+
+# 서버가 요청을 받기 시작한 뒤 백그라운드에서 import할 라우터 (모듈, URL 접두사)
+# (dlib / torch / pygame / MySQL / Milvus를 쓰는 컨트롤러라 import가 느림)
+DEFERRED_ROUTERS = [
+    ("controller.face_reset_controller", "/face-reset"),
+    ("controller.monitoring_controller", "/monitoring"),
+    ("controller.profile_controller", "/profile"),
+    ("controller.seat_controller", "/seat-set"),
+    ("controller.login_contoller", "/login"),
+]
+
+# false면 기존처럼 서버 시작 전에 모든 라우터를 import
+FAST_STARTUP = os.environ.get("FAST_STARTUP", "true").lower() not in ("0", "false", "no")
+
+MILVUS_HOST = os.environ.get("MILVUS_HOST", "localhost")
+MILVUS_PORT = os.environ.get("MILVUS_PORT", "19530")
+CHECK_RETRY_INTERVAL = 10  # 외부 서비스 연결 / 라우터 로드 실패 시 재시도 간격 (초)
+CHECK_RETRY_MAX_INTERVAL = 300  # 외부 서비스 연결 재시도 간격 상한 (실패할 때마다 2배씩 늘림)
+ROUTER_RETRIES = int(os.environ.get("ROUTER_RETRIES", "3") or 0)  # 라우터 import 실패 시 재시도 횟수
+# 비전 워커 프로세스 수 (service.vision_pool과 같은 환경 변수, 0이면 워커 풀을 띄우지 않음)
+VISION_WORKERS = int(os.environ.get("VISION_WORKERS", "0") or 0)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class StartupComponent:
+    """초기화 단계 하나 (라우터 import, 모델 로드, DB 연결 등)의 상태"""
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.state = PENDING
+        self.seconds = None
+        self.error = None
+        self.attempts = 0  # 시도 횟수 (재시도 포함)
+        self.retry_at = None  # 다음 재시도 시각 (재시도 대기 중일 때만)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "state": self.state,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+            "attempts": self.attempts,
+            "retry_in": round(max(self.retry_at - time.time(), 0.0), 1) if self.retry_at is not None else None,
+        }
+
+
+def check_mysql():
+    """MySQL 접속 확인"""
+    import pymysql
+    from config.mysql import mysql_config
+    conn = pymysql.connect(connect_timeout=3, **mysql_config)
+    try:
+        conn.ping(reconnect=False)
+    finally:
+        conn.close()
+
+def check_milvus():
+    """Milvus 접속 확인 (DAO가 쓰는 "default" 연결과 별도 alias 사용 - 컬렉션 생성 로직에 영향 없음)"""
+    from pymilvus import connections, utility
+    if not connections.has_connection("readyz"):
+        connections.connect("readyz", host=MILVUS_HOST, port=MILVUS_PORT, timeout=3)
+    utility.get_server_version(using="readyz")
+
+
+class StartupManager:
+    """
+    서버 시작 관리
+    - 서버는 가벼운 라우트(/healthz, /readyz, /metrics)만 가지고 바로 요청을 받음
+    - 무거운 라우터는 시작 후 백그라운드에서 하나씩 import해서 앱에 추가
+      (추가되기 전의 경로는 503 + Retry-After 응답)
+    - import에 실패한 라우터는 failed로 표시하고 그 경로는 500 + 오류 응답,
+      CHECK_RETRY_INTERVAL초마다 ROUTER_RETRIES번까지 다시 import
+      (WebSocket 경로도 같은 기준으로 거절, RouterGateMiddleware)
+    - 이어서 모델 미리 로드, MySQL / Milvus 연결 확인 (실패하면 간격을 늘려가며 재시도)
+    - VISION_WORKERS > 0이면 비전 워커 프로세스도 라우터 import와 동시에 백그라운드에서 띄움
+      (첫 탐지 요청이 워커 모델 로드를 기다리지 않도록)
+    - 단계별 상태와 소요 시간(import 시간 포함)은 /readyz에서 확인
+    """
+    def __init__(self, routers=DEFERRED_ROUTERS, checks=None):
+        self.routers = list(routers)
+        self.checks = checks if checks is not None else {"mysql": check_mysql, "milvus": check_milvus}
+        self.started = time.time()
+        self.serving_seconds = None  # 프로세스 시작 ~ 요청을 받을 수 있을 때까지
+        self.components = {}
+        self._lock = threading.Lock()
+        self._task = None
+        self._included = set()  # 앱에 추가한 라우터 모듈 (재시도 시 중복 추가 방지)
+        for module, _ in self.routers:
+            self._component(module, "router")
+
+    def _component(self, name, kind):
+        with self._lock:
+            component = self.components.get(name)
+            if component is None:
+                component = self.components[name] = StartupComponent(name, kind)
+            return component
+
+    def _run_step(self, component, function, finish=True):
+        """단계 실행 후 상태 / 소요 시간 기록 (예외는 기록만 하고 다시 던짐, finish=False면 상태는 그대로)"""
+        started = time.perf_counter()
+        component.attempts += 1
+        try:
+            result = function()
+        except Exception as e:
+            component.state = FAILED
+            component.error = str(e)
+            component.seconds = time.perf_counter() - started
+            raise
+        component.seconds = time.perf_counter() - started
+        component.error = None
+        if finish:
+            component.state = READY
+        return result
+
+    # ===== 라우터 =====
+    def _router_component(self, path):
+        """path가 속한 지연 로드 라우터의 상태 (접두사 자체이거나 접두사 + "/"로 시작할 때만)"""
+        for module, prefix in self.routers:
+            if path == prefix or path.startswith(prefix + "/"):
+                return self.components[module]
+        return None
+
+    def pending_router(self, path):
+        """아직 추가되지 않은 라우터 경로면 모듈 이름 반환 (503 응답용)"""
+        component = self._router_component(path)
+        return component.name if component is not None and component.state == PENDING else None
+
+    def failed_router(self, path):
+        """로드에 실패한 라우터 경로면 StartupComponent 반환 (500 응답용)"""
+        component = self._router_component(path)
+        return component if component is not None and component.state == FAILED else None
+
+    def rejection(self, path):
+        """지연 로드 라우터 경로 요청에 대신 보낼 응답 -> (상태 코드, 본문 dict, 추가 헤더) 또는 None"""
+        module = self.pending_router(path)
+        if module:
+            return 503, {"detail": "서버 초기화 중입니다", "pending": module}, [(b"retry-after", b"1")]
+        failed = self.failed_router(path)
+        if failed:
+            return 500, {"detail": "서버 초기화 실패", "failed": failed.name, "error": failed.error}, []
+        return None
+
+    def load_routers(self, app):
+        """모든 라우터를 지금 바로 import해서 추가 (FAST_STARTUP=false)"""
+        for module, _ in self.routers:
+            component = self.components[module]
+            router = self._run_step(component, lambda: importlib.import_module(module).router)
+            app.include_router(router)
+            self._included.add(module)
+
+    async def _load_router(self, app, module):
+        """라우터 import 후 앱에 추가 -> 성공 여부 (실패하면 failed 상태와 오류 기록)"""
+        component = self.components[module]
+        loop = asyncio.get_running_loop()
+        try:
+            # import는 스레드에서 (이벤트 루프는 계속 요청 처리)
+            # 라우트를 추가하기 전까지는 pending (503) 유지
+            router = await loop.run_in_executor(
+                None, self._run_step, component, lambda: importlib.import_module(module).router, False)
+        except Exception as e:
+            print(f"❌ [Startup] {module} 로드 실패: {e}")
+            return False
+        if module not in self._included:
+            app.include_router(router)
+            self._included.add(module)
+            app.openapi_schema = None  # /docs에 새 라우트 반영
+        try:
+            # 서버 시작 후에 추가된 라우터라 startup 이벤트를 직접 실행
+            for handler in router.on_startup:
+                result = handler()
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception as e:
+            component.state = FAILED
+            component.error = f"startup: {e}"
+            print(f"❌ [Startup] {module} startup 이벤트 실패: {e}")
+            return False
+        component.state = READY
+        component.error = None
+        print(f"✅ [Startup] {module} 준비 완료 ({component.seconds:.2f}초)")
+        return True
+
+    async def _retry_routers(self, app, modules):
+        """실패한 라우터를 CHECK_RETRY_INTERVAL초마다 ROUTER_RETRIES번까지 다시 로드"""
+        for attempt in range(1, ROUTER_RETRIES + 1):
+            if not modules:
+                return
+            await asyncio.sleep(CHECK_RETRY_INTERVAL)
+            print(f"🔁 [Startup] 라우터 다시 로드 ({attempt}/{ROUTER_RETRIES}): {', '.join(modules)}")
+            modules = [module for module in modules if not await self._load_router(app, module)]
+        for module in modules:
+            print(f"❌ [Startup] {module} 로드 재시도 포기: {self.components[module].error}")
+
+    # ===== 모델 / 외부 서비스 =====
+    def _load_models(self, names):
+        for name in names:
+            component = self._component(f"model:{name}", "model")
+            try:
+                self._run_step(component, lambda: self._registry().get(name))
+            except Exception as e:
+                print(f"⚠️ [Startup] 모델 {name} 로드 실패: {e}")
+
+    def _warm_up_vision_pool(self):
+        component = self._component("vision_pool", "model")
+        try:
+            from service.vision_pool import warm_up_vision_pool  # dlib import는 백그라운드에서
+            self._run_step(component, warm_up_vision_pool)
+        except Exception as e:
+            print(f"⚠️ [Startup] 비전 워커 시작 실패: {e}")
+
+    def _registry(self):
+        from service.model_registry import get_model_registry  # dlib import는 백그라운드에서
+        return get_model_registry()
+
+    def _check(self, name, function, sleep=time.sleep):
+        """연결될 때까지 재시도 (간격은 실패할 때마다 2배, CHECK_RETRY_MAX_INTERVAL까지)"""
+        component = self._component(name, "service")
+        interval = CHECK_RETRY_INTERVAL
+        while True:
+            try:
+                self._run_step(component, function)
+                component.retry_at = None
+                print(f"✅ [Startup] {name} 연결 확인 ({component.seconds:.2f}초)")
+                return
+            except Exception as e:
+                print(f"⚠️ [Startup] {name} 연결 실패 ({interval}초 후 재시도): {e}")
+            component.retry_at = time.time() + interval  # /readyz에 다음 재시도까지 남은 시간 표시
+            sleep(interval)
+            interval = min(interval * 2, CHECK_RETRY_MAX_INTERVAL)
+
+    async def _run(self, app, model_names):
+        # 외부 서비스 연결 확인은 라우터 / 모델과 관계없이 바로 시작
+        for name, function in self.checks.items():
+            threading.Thread(target=self._check, args=(name, function),
+                             name=f"startup-check-{name}", daemon=True).start()
+        if VISION_WORKERS > 0:
+            threading.Thread(target=self._warm_up_vision_pool, name="startup-vision-pool", daemon=True).start()
+
+        failed = []
+        for module, _ in self.routers:
+            if self.components[module].state != READY and not await self._load_router(app, module):
+                failed.append(module)
+
+        if model_names:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._load_models, model_names)
+
+        await self._retry_routers(app, failed)
+
+    def start(self, app, model_names=(), started=None):
+        """백그라운드 초기화 시작 (startup 이벤트에서 호출, 바로 반환)"""
+        if started is not None:
+            self.started = started  # main.py import 시작 시각
+        self.serving_seconds = time.time() - self.started
+        for name in model_names:
+            self._component(f"model:{name}", "model")
+        for name in self.checks:
+            self._component(name, "service")
+        if VISION_WORKERS > 0:
+            self._component("vision_pool", "model")
+        self._task = asyncio.ensure_future(self._run(app, model_names))
+        return self._task
+
+    # ===== 상태 =====
+    def is_ready(self):
+        with self._lock:
+            components = list(self.components.values())
+        return all(component.state == READY for component in components)
+
+    def status(self):
+        """/readyz 응답"""
+        with self._lock:
+            components = list(self.components.values())
+        return {
+            "ready": all(component.state == READY for component in components),
+            "failed": [component.name for component in components if component.state == FAILED],
+            "uptime": round(time.time() - self.started, 3),
+            "serving_seconds": round(self.serving_seconds, 3) if self.serving_seconds is not None else None,
+            "components": [component.to_dict() for component in components],
+        }
+
+
+class RouterGateMiddleware:
+    """
+    아직 로드되지 않았거나 로드에 실패한 라우터 경로의 요청을 앱에 넘기지 않고 바로 응답 (ASGI 미들웨어)
+    - HTTP: 로드 중이면 503 + Retry-After, 실패했으면 500 + 오류
+    - WebSocket: 연결을 수락하기 전에 같은 HTTP 응답으로 거절
+      (서버가 websocket.http.response 확장을 지원하지 않으면 1013 (로드 중) / 1011 (실패)로 종료)
+    """
+    def __init__(self, app, manager=None):
+        self.app = app
+        self.manager = manager if manager is not None else get_startup_manager()
+
+    async def __call__(self, scope, receive, send):
+        rejection = self.manager.rejection(scope["path"]) if scope["type"] in ("http", "websocket") else None
+        if rejection is None:
+            await self.app(scope, receive, send)
+            return
+
+        status, body, headers = rejection
+        headers = [(b"content-type", b"application/json")] + headers
+        body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        if scope["type"] == "http":
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await receive()  # websocket.connect
+        if "websocket.http.response" in scope.get("extensions", {}):
+            await send({"type": "websocket.http.response.start", "status": status, "headers": headers})
+            await send({"type": "websocket.http.response.body", "body": body})
+        else:
+            await send({"type": "websocket.close", "code": 1013 if status == 503 else 1011})
+
+
+# 싱글톤 인스턴스 생성
+startup_manager = StartupManager()
+
+def get_startup_manager():
+    """서버 시작 관리자 인스턴스 반환"""
+    return startup_manager
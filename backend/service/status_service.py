@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import deque
+
+
+class StatusPublisher:
+    """
+    모니터링 상태 변경 이벤트 발행기
+    - 프레임마다 check()를 호출하면 상태가 바뀐 경우에만 이벤트를 WebSocket으로 전송
+    - 모든 이벤트에 단조 증가하는 시퀀스 번호(seq)를 붙이고 최근 이벤트를 보관해서
+      재연결한 클라이언트가 마지막으로 받은 seq 이후 이벤트를 이어받을 수 있음
+    - heartbeat 메시지는 seq를 증가시키지 않고 현재 seq만 알려줌 (누락 확인용)
+    """
+    def __init__(self, snapshot, manager, topic, history_size=100):
+        self.snapshot = snapshot  # 현재 상태 dict를 반환하는 함수
+        self.manager = manager  # WebSocket 연결 관리자
+        self.topic = topic  # 이벤트를 보낼 토픽
+        self.history = deque(maxlen=history_size)
+        self.seq = 0
+        self.last_state = None
+        self.loop = None
+        self._lock = threading.Lock()
+
+    def attach_loop(self, loop):
+        """이벤트를 전송할 asyncio 이벤트 루프 등록 (서버 시작 시 한 번)"""
+        self.loop = loop
+
+    def check(self):
+        """현재 상태를 확인하고 바뀌었으면 이벤트 발행 (분석 스레드에서 호출)"""
+        state = self.snapshot()
+        with self._lock:
+            if state == self.last_state:
+                return None
+            self.last_state = state
+            self.seq += 1
+            message = self._message("status", self.seq, state)
+            self.history.append(message)
+        self._send(message)
+        return message
+
+    def _message(self, message_type, seq, state):
+        message = {"type": message_type, "seq": seq, "timestamp": time.time()}
+        message.update(state)
+        return message
+
+    def snapshot_message(self):
+        """현재 상태 전체 (새로 연결한 클라이언트용)"""
+        with self._lock:
+            return self._message("snapshot", self.seq, self.snapshot())
+
+    def heartbeat_message(self):
+        """저빈도 heartbeat (seq 증가 없음)"""
+        with self._lock:
+            return self._message("heartbeat", self.seq, self.snapshot())
+
+    def events_since(self, last_seq):
+        """
+        last_seq 이후 이벤트 목록
+        - 보관 범위를 벗어났거나 last_seq가 현재 seq보다 크면 None => snapshot으로 대체
+          (서버 재시작 전 seq로 재연결한 클라이언트)
+        """
+        with self._lock:
+            if last_seq == self.seq:
+                return []
+            if last_seq > self.seq:
+                return None
+            if not self.history or self.history[0]["seq"] > last_seq + 1:
+                return None
+            return [message for message in self.history if message["seq"] > last_seq]
+
+    def _send(self, message):
+        """분석 스레드에서 이벤트 루프로 전송 예약 (구독자 송신 큐에 넣기만 하므로 바로 끝남)"""
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.manager.publish, self.topic, message)
+        except RuntimeError as e:
+            print(f"상태 이벤트 전송 예약 실패: {e}")
@@ -0,0 +1,308 @@
+import cv2
+import threading
+import time
+import weakref
+from collections import deque
+
+from config.metrics import STREAM_ENCODE_SECONDS, DROPPED_FRAMES
+from service.frame_pool import PooledFrame
+
+
+def multipart_chunk(frame_bytes):
+    """JPEG 바이트를 multipart/x-mixed-replace 스트림 조각으로 변환"""
+    return (b"--frame\r\n"
+            b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
+
+
+class StreamFrame:
+    """
+    스트림으로 보낼 프레임 한 장
+    - (가로 크기, JPEG 품질) 조합마다 한 번만 인코딩해서 캐시
+    - 같은 설정의 시청자들은 인코딩 결과를 공유
+    - image가 PooledFrame이면 이 객체를 참조하는 시청자가 모두 사라질 때 버퍼를 풀로 반환
+    """
+    def __init__(self, image):
+        if isinstance(image, PooledFrame):
+            weakref.finalize(self, image.release)
+            image = image.array
+        self.image = image
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    @property
+    def width(self):
+        return self.image.shape[1]
+
+    def jpeg(self, width=None, quality=90):
+        width = min(width or self.width, self.width)
+        key = (width, quality)
+        with self._lock:
+            frame_bytes = self._encoded.get(key)
+            if frame_bytes is None:
+                image = self.image
+                with STREAM_ENCODE_SECONDS.time():
+                    if width < self.width:
+                        height = int(round(image.shape[0] * width / self.width))
+                        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+                    _, buffer = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+                frame_bytes = buffer.tobytes()
+                self._encoded[key] = frame_bytes
+            return frame_bytes
+
+
+class StreamQuality:
+    """
+    클라이언트 한 명의 스트림 품질 조절기
+    - 프레임 전송에 걸린 시간(전송 밀림)과 버려진 프레임 수를 보고
+      해상도 / JPEG 품질 / 프레임레이트 단계를 실시간으로 조절
+    - max_width, max_quality, max_fps로 상한을 고정할 수 있음 (쿼리 파라미터)
+    """
+    # (해상도 비율, JPEG 품질, 최대 fps) - 0단계가 최고 품질
+    LEVELS = [
+        (1.0, 90, 30),
+        (1.0, 75, 20),
+        (0.75, 65, 15),
+        (0.5, 55, 10),
+        (0.5, 40, 5),
+    ]
+    DEGRADE_AFTER = 3  # 연속으로 이만큼 늦으면 한 단계 낮춤
+    UPGRADE_AFTER = 2.0  # 이 시간(초) 동안 여유가 있으면 한 단계 올림
+    COOLDOWN = 1.0  # 단계 변경 후 최소 대기 시간 (초)
+
+    def __init__(self, max_width=None, max_quality=None, max_fps=None):
+        self.max_width = max_width
+        self.max_quality = max_quality
+        self.max_fps = max_fps
+
+        self.level = 0
+        self._slow_count = 0
+        self._fast_since = None
+        self._last_change = 0
+        self._last_dropped = 0
+
+    def frame_interval(self):
+        """현재 단계의 최소 프레임 간격 (초)"""
+        fps = self.LEVELS[self.level][2]
+        if self.max_fps:
+            fps = min(fps, self.max_fps)
+        return 1.0 / fps
+
+    def settings(self, source_width):
+        """현재 단계의 (가로 크기, JPEG 품질)"""
+        scale, quality, _ = self.LEVELS[self.level]
+        width = int(source_width * scale)
+        if self.max_width:
+            width = min(width, self.max_width)
+        if self.max_quality:
+            quality = min(quality, self.max_quality)
+        return width, quality
+
+    def record_send(self, elapsed, dropped=0):
+        """프레임 한 장을 보내는 데 걸린 시간과 누적 버림 수로 단계 조절"""
+        now = time.time()
+        budget = self.frame_interval()
+        new_drops = dropped - self._last_dropped
+        self._last_dropped = dropped
+
+        if new_drops > 0 or elapsed > budget:
+            self._slow_count += 1
+            self._fast_since = None
+        else:
+            self._slow_count = 0
+            if elapsed < budget * 0.5:
+                if self._fast_since is None:
+                    self._fast_since = now
+            else:
+                self._fast_since = None
+
+        if now - self._last_change < self.COOLDOWN:
+            return
+
+        if self._slow_count >= self.DEGRADE_AFTER and self.level < len(self.LEVELS) - 1:
+            self.level += 1
+            self._slow_count = 0
+            self._last_change = now
+        elif self._fast_since is not None and now - self._fast_since >= self.UPGRADE_AFTER and self.level > 0:
+            self.level -= 1
+            self._fast_since = now
+            self._last_change = now
+
+
+def adaptive_stream(frames, quality=None, dropped=None):
+    """
+    프레임(ndarray 또는 StreamFrame) 이터레이터를 multipart 스트림으로 변환
+    - 클라이언트가 프레임을 받아가는 속도를 측정해서 StreamQuality로 품질 조절
+    - dropped: 누적 버림 프레임 수를 반환하는 함수 (브로드캐스터 큐)
+    """
+    quality = quality or StreamQuality()
+    last_sent = 0
+    try:
+        for frame in frames:
+            if frame is None:
+                continue
+
+            # 현재 단계의 프레임레이트보다 빠르면 건너뜀
+            now = time.time()
+            if now - last_sent < quality.frame_interval():
+                continue
+            last_sent = now
+
+            if not isinstance(frame, StreamFrame):
+                frame = StreamFrame(frame)
+            width, jpeg_quality = quality.settings(frame.width)
+            chunk = multipart_chunk(frame.jpeg(width, jpeg_quality))
+
+            # yield가 돌아오는 시간 = 클라이언트로 전송이 끝난 시간
+            started = time.time()
+            yield chunk
+            quality.record_send(time.time() - started, dropped() if dropped else 0)
+    finally:
+        # 클라이언트 연결이 끊기면 프레임 소스도 바로 정리 (카메라 구독 해제 등)
+        if hasattr(frames, "close"):
+            frames.close()
+
+
+class StreamSubscriber:
+    """
+    스트림 시청자 한 명의 프레임 큐
+    - 크기가 제한된 큐로, 느린 시청자는 가장 오래된 프레임부터 버림
+    """
+    def __init__(self, queue_size=2):
+        self._queue = deque(maxlen=queue_size)
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0  # 느려서 버려진 프레임 수
+
+    def put(self, item):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+                DROPPED_FRAMES.labels("stream").inc()
+            self._queue.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=1.0):
+        """다음 프레임 반환 (타임아웃이면 None)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self.closed, timeout)
+            if self._queue:
+                return self._queue.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class LatestFrame:
+    """
+    가장 최근 프레임 하나만 보관하는 슬롯
+    - 분석 루프는 기다리지 않고 덮어쓰고 (가져가지 않은 이전 프레임은 버림)
+    - 브로드캐스터 생산 스레드가 새 프레임이 올 때까지 기다렸다가 꺼내감
+    """
+    def __init__(self):
+        self._frame = None
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def put(self, frame):
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, last_seq=0, timeout=1.0):
+        """last_seq 이후 프레임 -> (seq, 프레임), 타임아웃이면 (last_seq, None)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._frame
+
+    def clear(self):
+        with self._cond:
+            self._frame = None
+
+
+class FrameBroadcaster:
+    """
+    프레임을 한 번만 만들어 여러 시청자에게 전달하는 브로드캐스터
+    - source()는 처리된 프레임(ndarray, PooledFrame 또는 StreamFrame)을 yield하는 제너레이터
+    - 첫 시청자가 들어오면 생산 스레드 하나를 시작하고, 마지막 시청자가 나가면 종료
+    - JPEG 인코딩은 StreamFrame에서 (크기, 품질) 조합마다 한 번만 수행되므로
+      시청자가 늘어나도 분석/인코딩 비용은 그대로이고 큐에 넣는 비용만 추가됨
+    """
+    def __init__(self, source, queue_size=2, name="stream"):
+        self.source = source
+        self.queue_size = queue_size
+        self.name = name
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        with self._lock:
+            subscriber = StreamSubscriber(self.queue_size)
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._produce, daemon=True)
+                self._thread.start()
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+        subscriber.close()
+
+    def _produce(self):
+        """생산 스레드: 프레임을 한 번 만들어 모든 시청자 큐에 넣음"""
+        frames = self.source()
+        try:
+            for image in frames:
+                frame = image if isinstance(image, StreamFrame) else StreamFrame(image)
+                with self._lock:
+                    subscribers = list(self._subscribers)
+                    if not subscribers:
+                        # 시청자가 모두 나가면 생산 중지
+                        self._thread = None
+                        return
+                for subscriber in subscribers:
+                    subscriber.put(frame)
+        except Exception as e:
+            print(f"❌ [{self.name}] 프레임 생산 중 오류 발생: {e}")
+        finally:
+            frames.close()
+
+        # 소스가 끝나면(모니터링 중지 등) 남은 시청자 스트림도 종료
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+            if self._thread is threading.current_thread():
+                self._thread = None
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def stream(self, quality=None, timeout=5.0):
+        """시청자 한 명을 위한 multipart 제너레이터 (StreamingResponse에 그대로 사용)"""
+        subscriber = self.subscribe()
+        try:
+            yield from adaptive_stream(self._frames(subscriber, timeout), quality,
+                                       dropped=lambda: subscriber.dropped)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _frames(self, subscriber, timeout):
+        """시청자 큐에서 프레임을 꺼내는 제너레이터"""
+        last_frame_time = time.time()
+        while not subscriber.closed:
+            frame = subscriber.get(timeout=1.0)
+            if frame is None:
+                # 생산자가 멈춘 채로 timeout이 지나면 스트림 종료
+                if time.time() - last_frame_time >= timeout:
+                    break
+                continue
+            last_frame_time = time.time()
+            yield frame
@@ -0,0 +1,271 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import dlib
+import numpy as np
+
+from service.face_detection import scan_regions
+from service.face_geometry import NUM_LANDMARKS, shape_to_array
+
+# 워커 프로세스 수 (0이면 풀을 사용하지 않고 호출한 스레드에서 바로 실행)
+VISION_WORKERS = int(os.environ.get("VISION_WORKERS", "0") or 0)
+
+MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "models"))
+LANDMARK_MODEL_PATH = os.path.join(MODEL_DIR, "shape_predictor_68_face_landmarks.dat")
+RECOGNITION_MODEL_PATH = os.path.join(MODEL_DIR, "dlib_face_recognition_resnet_model_v1.dat")
+
+FRAME_SLOT_SIZE = 1280 * 720 * 3  # 공유 메모리 슬롯 하나의 크기 (이보다 큰 프레임은 직렬화해서 전달)
+
+
+# ===== 워커 프로세스 쪽 =====
+_models = {}
+_attached = {}
+_IN_WORKER = False  # 워커 프로세스 안인지 (initializer에서 설정)
+
+def _init_worker(landmark_path, recognition_path):
+    """워커 시작 시 모델을 미리 로드 (요청마다 로드하지 않음)"""
+    global _IN_WORKER
+    _IN_WORKER = True
+    _models["detector"] = dlib.get_frontal_face_detector()
+    _models["predictor"] = dlib.shape_predictor(landmark_path) if os.path.exists(landmark_path) else None
+    _models["recognizer"] = (dlib.face_recognition_model_v1(recognition_path)
+                             if os.path.exists(recognition_path) else None)
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        # spawn 워커는 부모와 같은 resource tracker를 공유하므로 해제(unlink)는 부모가 담당
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+def _frame(ref):
+    """("shm", 이름, shape, dtype) 또는 ("array", 배열) -> ndarray (복사 없음)"""
+    if ref[0] == "shm":
+        _, name, shape, dtype = ref
+        return np.ndarray(shape, dtype=dtype, buffer=_attach(name).buf)
+    return ref[1]
+
+def _warm_up_task(delay):
+    # 잠깐 붙잡고 있어야 작업이 한 워커에 몰리지 않고 모든 워커가 뜸
+    time.sleep(delay)
+    return os.getpid()
+
+def _detect_task(ref, upsample, threshold):
+    rects, scores, _ = _models["detector"].run(_frame(ref), upsample, threshold)
+    return [(r.left(), r.top(), r.right(), r.bottom()) for r in rects], list(scores)
+
+def _faces_task(ref, regions, boxes, threshold, landmarks):
+    """
+    프레임 하나의 얼굴 탐지 + 랜드마크를 한 작업에서 실행
+    - boxes가 없으면 regions를 순서대로 탐색 (ROI -> 전체 프레임), 있으면 탐지 없이 그 위치 사용
+    - landmarks=True면 모든 얼굴의 랜드마크를 (N, 68, 2) int32 배열로 반환 (full_object_detection을 보내지 않음)
+    """
+    image = _frame(ref)
+    if boxes is None:
+        boxes = scan_regions(_models["detector"], image, regions, threshold)
+    if not landmarks:
+        return boxes, None
+    predictor = _models["predictor"]
+    if predictor is None:
+        raise RuntimeError("워커에 랜드마크 모델이 없습니다")
+    points = np.empty((len(boxes), NUM_LANDMARKS, 2), dtype=np.int32)
+    for i, box in enumerate(boxes):
+        shape_to_array(predictor(image, dlib.rectangle(*box)), points[i])
+    return boxes, points
+
+def _descriptor_task(ref, rect, parts):
+    recognizer = _models["recognizer"]
+    if recognizer is None:
+        raise RuntimeError("워커에 얼굴 인식 모델이 없습니다")
+    shape = dlib.full_object_detection(dlib.rectangle(*rect), [dlib.point(int(x), int(y)) for x, y in parts])
+    return list(recognizer.compute_face_descriptor(_frame(ref), shape))
+
+
+# ===== 메인 프로세스 쪽 =====
+class SharedFrameSlots:
+    """
+    프레임 전달용 공유 메모리 슬롯
+    - 미리 만든 슬롯에 프레임을 복사하고 워커는 이름으로 붙어서 복사 없이 읽음
+    - 작업이 끝날 때까지 슬롯을 잡고 있다가 결과를 받으면 반환
+    """
+    def __init__(self, count, size=FRAME_SLOT_SIZE):
+        self.size = size
+        self._blocks = [shared_memory.SharedMemory(create=True, size=size) for _ in range(count)]
+        self._free = queue.Queue()
+        for index in range(count):
+            self._free.put(index)
+
+    def write(self, image, timeout=None):
+        """프레임을 빈 슬롯에 복사 -> (슬롯 번호, 워커용 참조), 너무 크면 (None, 배열 참조)"""
+        image = np.ascontiguousarray(image)
+        if image.nbytes > self.size:
+            return None, ("array", image)
+        index = self._free.get(timeout=timeout)
+        block = self._blocks[index]
+        np.ndarray(image.shape, dtype=image.dtype, buffer=block.buf)[...] = image
+        return index, ("shm", block.name, image.shape, image.dtype.str)
+
+    def release(self, index):
+        if index is not None:
+            self._free.put(index)
+
+    def close(self):
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except Exception:
+                pass
+        self._blocks = []
+
+
+class VisionWorkerPool:
+    """
+    dlib 얼굴 탐지 / 랜드마크 / 임베딩을 별도 프로세스에서 실행하는 워커 풀
+    - 모든 호출이 한 프로세스의 GIL을 두고 경쟁하지 않도록 작업을 워커 프로세스로 보냄
+    - 프레임은 공유 메모리 슬롯으로 전달하고 결과는 작은 값(좌표, 벡터)만 돌려받음
+    - faces(): 프레임당 공유 메모리 복사 한 번, 작업 하나로 탐지 + 모든 얼굴 랜드마크
+    - 워커마다 모델을 미리 로드 (VISION_WORKERS 환경 변수로 워커 수 설정)
+    - 호출한 스레드는 결과가 올 때까지 GIL을 놓고 대기하므로 다른 스레드가 계속 실행됨
+    """
+    def __init__(self, workers, landmark_path=LANDMARK_MODEL_PATH, recognition_path=RECOGNITION_MODEL_PATH,
+                 slot_count=None, slot_size=FRAME_SLOT_SIZE):
+        self.workers = workers
+        # 윈도우와 같은 방식(spawn)으로 통일 - fork 시 dlib/OpenCV 스레드 상태가 복사되는 문제 방지
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                             initializer=_init_worker,
+                                             initargs=(landmark_path, recognition_path))
+        self._slots = SharedFrameSlots(slot_count or workers * 2, slot_size)
+        self._closed = False
+        atexit.register(self.shutdown)
+
+    def warm_up(self):
+        """모든 워커를 미리 띄워서 모델 로드 (첫 요청 지연 방지, 서버 시작 후 백그라운드에서 호출)"""
+        futures = [self._executor.submit(_warm_up_task, 0.2) for _ in range(self.workers)]
+        pids = {future.result() for future in futures}
+        print(f"✅ 비전 워커 {len(pids)}개 준비 완료 (pid: {sorted(pids)})")
+        return sorted(pids)
+
+    def _call(self, task, image, *args):
+        index, ref = self._slots.write(image)
+        try:
+            return self._executor.submit(task, ref, *args).result()
+        finally:
+            self._slots.release(index)
+
+    def detect(self, image, upsample=0, threshold=0.0):
+        """HOG 얼굴 탐지 -> ([(left, top, right, bottom)], [점수])"""
+        return self._call(_detect_task, image, upsample, threshold)
+
+    def faces(self, image, regions=None, boxes=None, threshold=0.0, landmarks=True):
+        """
+        얼굴 탐지 + 랜드마크를 작업 하나로 실행 -> ([(left, top, right, bottom)], (N, 68, 2) int32 배열 또는 None)
+        - regions: 탐색할 영역 [(x0, y0, x1, y1, scale, upsample)] (RoiFaceDetector.regions), 처음 얼굴이 나온 영역 사용
+        - boxes: 이미 아는 얼굴 위치 (추적 결과) -> 탐지 없이 랜드마크만
+        """
+        return self._call(_faces_task, image, regions, boxes, threshold, landmarks)
+
+    def landmarks(self, image, rect):
+        """68 랜드마크 -> (68, 2) int32 배열"""
+        box = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        return self.faces(image, boxes=[box])[1][0]
+
+    def descriptor(self, image, rect, parts):
+        """128차원 얼굴 임베딩 -> float 리스트"""
+        return self._call(_descriptor_task, image, (rect.left(), rect.top(), rect.right(), rect.bottom()), parts)
+
+    def shutdown(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._slots.close()
+
+
+class PooledHogDetector:
+    """dlib.get_frontal_face_detector()와 같은 인터페이스 (워커 풀에서 실행)"""
+    def __init__(self, pool):
+        self.pool = pool
+
+    def run(self, image, upsample_num_times=0, adjust_threshold=0.0):
+        boxes, scores = self.pool.detect(image, upsample_num_times, adjust_threshold)
+        rects = [dlib.rectangle(*box) for box in boxes]
+        return rects, scores, [0] * len(rects)
+
+    def __call__(self, image, upsample_num_times=0):
+        return self.run(image, upsample_num_times)[0]
+
+
+class PooledShapePredictor:
+    """
+    dlib.shape_predictor와 같은 인터페이스 (워커 풀에서 실행, full_object_detection 반환)
+    - 얼굴 임베딩처럼 full_object_detection이 필요한 곳용 (모니터링 분석은 faces()로 배열을 바로 받음)
+    """
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __call__(self, image, rect):
+        points = self.pool.landmarks(image, rect)
+        return dlib.full_object_detection(rect, [dlib.point(int(x), int(y)) for x, y in points])
+
+
+class PooledFaceRecognizer:
+    """dlib.face_recognition_model_v1과 같은 인터페이스 (워커 풀에서 실행)"""
+    def __init__(self, pool):
+        self.pool = pool
+
+    def compute_face_descriptor(self, image, shape):
+        parts = [(p.x, p.y) for p in shape.parts()]
+        return dlib.vector(self.pool.descriptor(image, shape.rect, parts))
+
+
+# 싱글톤 인스턴스 (VISION_WORKERS > 0일 때 처음 요청 시 생성)
+_pool = None
+_pool_lock = threading.Lock()
+
+def _in_worker():
+    """
+    비전 워커 프로세스 안인지
+    - initializer가 실행된 워커이거나, spawn된 워커가 부모의 메인 모듈을 다시 import하는 중 (initializer 실행 전)
+    - uvicorn --workers / --reload로 서버 자체가 spawn된 프로세스에서 실행되는 경우는 해당하지 않음
+    """
+    return _IN_WORKER or getattr(multiprocessing.current_process(), "_inheriting", False)
+
+def get_vision_pool():
+    """비전 워커 풀 반환 (VISION_WORKERS가 0이면 None, 만들기만 하고 워커는 warm_up_vision_pool()에서 띄움)"""
+    global _pool
+    if VISION_WORKERS <= 0 or _in_worker():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = VisionWorkerPool(VISION_WORKERS)
+        return _pool
+
+def warm_up_vision_pool():
+    """워커를 모두 띄우고 모델 로드 (서버 시작 관리자가 백그라운드에서 호출) -> 워커 pid 목록 또는 None"""
+    pool = get_vision_pool()
+    return pool.warm_up() if pool is not None else None
+
+
+def create_face_detector():
+    """HOG 얼굴 탐지기 (워커 풀이 있으면 풀에서 실행)"""
+    pool = get_vision_pool()
+    return PooledHogDetector(pool) if pool else dlib.get_frontal_face_detector()
+
+def create_shape_predictor(model_path=LANDMARK_MODEL_PATH):
+    """68 랜드마크 모델 (워커 풀이 있으면 워커에 미리 로드된 모델 사용)"""
+    pool = get_vision_pool()
+    return PooledShapePredictor(pool) if pool else dlib.shape_predictor(model_path)
+
+def create_face_recognizer(model_path=RECOGNITION_MODEL_PATH):
+    """얼굴 임베딩 모델 (워커 풀이 있으면 워커에 미리 로드된 모델 사용)"""
+    pool = get_vision_pool()
+    return PooledFaceRecognizer(pool) if pool else dlib.face_recognition_model_v1(model_path)
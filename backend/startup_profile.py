@@ -0,0 +1,83 @@
+"""
+서버 시작(import) 시간 프로파일
+- `python -X importtime`으로 모듈을 import해서 모듈별 import 시간(자기 자신 / 하위 포함)을 집계
+- 서버가 요청을 받기 전에 import되는 main.py와, 백그라운드에서 import되는 각 컨트롤러를 따로 측정
+  (어떤 패키지가 시작을 느리게 만드는지 확인용)
+
+사용 예 (backend 폴더에서):
+    python startup_profile.py
+    python startup_profile.py --top 30
+    python startup_profile.py --module controller.login_contoller
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from service.startup_service import DEFERRED_ROUTERS
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module):
+    """새 프로세스에서 모듈을 import -> [(모듈 이름, 자기 시간(초), 누적 시간(초))]"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1:] or ["알 수 없는 오류"]
+        raise RuntimeError(f"{module} import 실패: {last_line[0]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:       123 |       4567 |   package.module"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return rows
+
+
+def top_packages(rows, top):
+    """최상위 패키지별 자기 시간 합계 (예: torch, dlib, pymilvus)"""
+    totals = {}
+    for name, self_seconds, _ in rows:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + self_seconds
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def print_report(module, rows, top):
+    total = max((cumulative for _, _, cumulative in rows), default=0.0)
+    print(f"\n📦 {module}  (전체 import {total:.3f}초, 모듈 {len(rows)}개)")
+    print(f"  {'패키지':<28}{'시간(초)':>10}")
+    for package, seconds in top_packages(rows, top):
+        print(f"  {package:<28}{seconds:>10.3f}")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="서버 시작(import) 시간 프로파일")
+    parser.add_argument("--module", action="append", default=None,
+                        help="측정할 모듈 (여러 번 지정 가능, 기본: main + 백그라운드 컨트롤러)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 패키지 수")
+    args = parser.parse_args(argv)
+
+    modules = args.module or ["main"] + [module for module, _ in DEFERRED_ROUTERS]
+    totals = {}
+    for module in modules:
+        try:
+            totals[module] = print_report(module, import_times(module), args.top)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+
+    print("\n요약")
+    for module, total in totals.items():
+        phase = "요청 처리 전" if module == "main" else "백그라운드"
+        print(f"  {module:<40}{total:>8.3f}초  ({phase})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 폴더를 import 경로에 추가 (service.* 모듈을 서버와 같은 방식으로 import)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from service.camera_service import CameraBus, CameraCapture, warn_if_virtual
+
+
+def test_stop_wakes_waiting_readers():
+    capture = CameraCapture("synthetic")
+    capture._running = True  # 읽기 스레드 없이 프레임을 기다리는 상태만 만듦
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(capture.wait_frame(0, timeout=5.0)))
+    waiter.start()
+    time.sleep(0.1)
+
+    started = time.perf_counter()
+    capture.stop()
+    waiter.join(timeout=5.0)
+    assert not waiter.is_alive()
+    assert results == [None]
+    assert time.perf_counter() - started < 1.0  # timeout(5초)까지 기다리지 않음
+
+
+def test_probe_does_not_block_other_sources(monkeypatch):
+    bus = CameraBus()
+    probing = threading.Event()
+    finish = threading.Event()
+
+    def slow_probe():
+        probing.set()
+        finish.wait(5.0)
+        return "synthetic"
+
+    monkeypatch.setattr(bus, "_find_camera", slow_probe)
+    prober = threading.Thread(target=bus.get_capture)
+    prober.start()
+    assert probing.wait(5.0)
+    try:
+        # 기본 카메라를 찾는 동안에도 다른 소스는 바로 가져올 수 있음
+        started = time.perf_counter()
+        capture = bus.get_capture("synthetic:noise")
+        assert capture is not None
+        assert time.perf_counter() - started < 1.0
+    finally:
+        finish.set()
+        prober.join(timeout=5.0)
+
+
+def test_virtual_default_source_is_warned(caplog):
+    with caplog.at_level("WARNING", logger="service.camera_service"):
+        warn_if_virtual(0)
+        warn_if_virtual("device:1")
+        assert caplog.records == []
+        warn_if_virtual("synthetic", "SKIP_CAMERA=true")
+    assert "SKIP_CAMERA=true" in caplog.records[0].getMessage()
@@ -0,0 +1,48 @@
+import pytest
+
+from service.drowsiness_state import DrowsinessStateMachine
+
+OPEN_EAR = 0.30
+CLOSED_EAR = 0.10
+CLOSED_MAR = 0.30
+
+
+def first_alert(fps, close_at, duration=10.0):
+    """close_at초부터 눈을 감은 영상을 fps로 샘플링 -> 처음 경고가 뜬 시각과 그때의 눈 감김 시간"""
+    machine = DrowsinessStateMachine()
+    for i in range(int(duration * fps) + 1):
+        t = i / fps
+        ear = CLOSED_EAR if t >= close_at - 1e-9 else OPEN_EAR
+        machine.update(t, ear, CLOSED_MAR)
+        if machine.status() != "normal":
+            return t, machine.EYE_CLOSED_TIME
+    return None, machine.EYE_CLOSED_TIME
+
+
+@pytest.mark.parametrize("close_at", [5.0, 5.1])
+def test_eye_closed_alert_does_not_depend_on_frame_rate(close_at):
+    threshold = DrowsinessStateMachine().DROWSY_EYE_TIME
+    alerts = {}
+    for fps in (5, 30):
+        alerted, closed_time = first_alert(fps, close_at)
+        assert alerted is not None
+        # 직전의 눈 뜬 구간은 눈 감김 시간에 들어가지 않음 -> 실제로 감은 시간이 기준을 넘은 뒤에만 경고
+        assert alerted - close_at >= threshold - 1e-6
+        # 샘플 간격만큼만 늦게 감지
+        assert alerted - close_at <= threshold + 1.0 / fps + 1e-6
+        alerts[fps] = alerted
+    assert abs(alerts[5] - alerts[30]) <= 1.0 / 5 + 1e-6
+
+
+def test_perclos_matches_across_frame_rates():
+    results = []
+    for fps in (5, 30):
+        machine = DrowsinessStateMachine()
+        for i in range(int(20 * fps) + 1):
+            t = i / fps
+            # 2초마다 0.4초씩 눈 감기 (실제 PERCLOS 0.2)
+            ear = CLOSED_EAR if (t % 2.0) < 0.4 - 1e-9 else OPEN_EAR
+            machine.update(t, ear, CLOSED_MAR)
+        results.append(machine.PERCLOS)
+    assert results[0] == pytest.approx(0.2, abs=0.02)
+    assert results[1] == pytest.approx(0.2, abs=0.02)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+dlib = pytest.importorskip("dlib")
+
+from service.face_detection import RoiFaceDetector, scan_region
+
+
+class BrightDetector:
+    """밝은 영역을 얼굴로 보는 테스트용 탐지기 (dlib 탐지기와 같은 run() 인터페이스)"""
+    def __init__(self):
+        self.shapes = []  # 탐지기에 들어온 이미지 크기
+
+    def run(self, image, upsample, threshold):
+        self.shapes.append(image.shape[:2])
+        ys, xs = np.nonzero(image > 128)
+        if len(xs) == 0:
+            return [], [], []
+        return [dlib.rectangle(int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max()))], [1.0], [0]
+
+
+class FixedDetector:
+    """축소된 이미지 좌표로 항상 같은 사각형을 돌려주는 탐지기"""
+    def run(self, image, upsample, threshold):
+        return [dlib.rectangle(10, 20, 60, 80)], [1.0], [0]
+
+
+def face_image(left=300, top=200, size=100):
+    image = np.zeros((480, 640), dtype=np.uint8)
+    image[top:top + size, left:left + size] = 255
+    return image
+
+
+def test_scan_region_maps_roi_back_to_full_resolution():
+    image = np.zeros((480, 640), dtype=np.uint8)
+    boxes = scan_region(FixedDetector(), image, (100, 50, 300, 250, 0.5, 0))
+    # 0.5배 축소한 ROI 좌표 -> 2배 후 ROI 원점만큼 이동
+    assert boxes == [(100 + 20, 50 + 40, 100 + 120, 50 + 160)]
+
+
+def test_roi_detection_returns_full_resolution_rects():
+    detector = BrightDetector()
+    face_detector = RoiFaceDetector(detector, fallback_scale=0.5)
+    image = face_image()
+
+    first = face_detector.detect(image)  # 이전 얼굴이 없으므로 전체 프레임을 0.5배로 탐색
+    assert detector.shapes[-1] == (240, 320)
+    assert len(first) == 1
+
+    second = face_detector.detect(image)  # 마지막 얼굴 주변(ROI)만 탐색
+    assert detector.shapes[-1][0] < 240 and detector.shapes[-1][1] < 320
+    rect = second[0]
+    for value, expected in ((rect.left(), 300), (rect.top(), 200), (rect.right(), 399), (rect.bottom(), 299)):
+        assert abs(value - expected) <= 2  # 축소 비율만큼의 반올림 오차만 허용
+
+
+def test_fallback_scans_full_resolution_by_default():
+    detector = BrightDetector()
+    RoiFaceDetector(detector).detect(face_image())
+    assert detector.shapes == [(480, 640)]
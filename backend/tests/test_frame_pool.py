@@ -0,0 +1,131 @@
+import time
+
+import numpy as np
+import pytest
+
+from service.camera_service import CameraSubscription
+from service.frame_pool import FramePool
+
+SHAPE = (4, 6, 3)
+
+
+def test_released_buffer_is_reused():
+    pool = FramePool("test")
+    frame = pool.acquire(SHAPE)
+    array = frame.array
+    frame.release()
+    assert pool.free_count() == 1
+
+    again = pool.acquire(SHAPE)
+    assert again.array is array  # 새로 할당하지 않고 같은 버퍼
+    assert pool.free_count() == 0
+    assert pool.acquire(SHAPE).array is not array  # 빌려준 버퍼는 다시 주지 않음
+
+
+def test_shapes_have_separate_free_lists():
+    pool = FramePool("test")
+    pool.acquire(SHAPE).release()
+    assert pool.acquire((2, 2, 3)).array.shape == (2, 2, 3)
+    assert pool.free_count() == 1
+
+
+def test_free_buffers_are_capped_by_max_free():
+    pool = FramePool("test", max_free=2)
+    frames = [pool.acquire(SHAPE) for _ in range(4)]
+    for frame in frames:
+        frame.release()
+    assert pool.free_count() == 2
+    kept = {id(pool.acquire(SHAPE).array) for _ in range(2)}
+    assert kept <= {id(frame.array) for frame in frames}
+
+
+def test_buffer_returns_only_after_every_holder_releases():
+    pool = FramePool("test")
+    frame = pool.acquire(SHAPE)
+    frame.retain()
+    frame.release()
+    assert pool.free_count() == 0
+    frame.release()
+    assert pool.free_count() == 1
+
+
+def test_double_release_is_an_error():
+    pool = FramePool("test")
+    frame = pool.acquire(SHAPE)
+    frame.release()
+    with pytest.raises(RuntimeError):
+        frame.release()
+    with pytest.raises(RuntimeError):
+        frame.retain()
+    assert pool.free_count() == 1  # 풀에 두 번 들어가지 않음
+
+
+class RingCapture:
+    """링 버퍼에 프레임 하나를 가진 캡처 (CameraCapture.wait_frame과 같이 retain해서 반환)"""
+    class frame_age:
+        @staticmethod
+        def observe(value):
+            pass
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.seq = 0
+        self.frame = None
+
+    def push(self):
+        """새 프레임을 링에 넣고 밀려난 프레임의 링 참조를 놓음"""
+        previous = self.frame
+        self.frame = self.pool.acquire(SHAPE)
+        self.frame.array[:] = self.seq
+        self.seq += 1
+        if previous is not None:
+            previous.release()
+        return self.frame
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        return self.seq, time.time(), self.frame.retain()
+
+    def unsubscribe(self, subscription):
+        pass
+
+
+def test_two_consumers_hold_the_same_frame():
+    pool = FramePool("test")
+    capture = RingCapture(pool)
+    subscription = CameraSubscription(capture)
+    stream, snapshot = object(), object()
+
+    pooled = capture.push()
+    ok, stream_frame = subscription.read(consumer=stream)
+    assert ok
+    ok, snapshot_frame = subscription.read(consumer=snapshot)
+    assert snapshot_frame is stream_frame
+
+    capture.push()  # 링에서 밀려나도 두 소비자가 들고 있으므로 풀로 돌아가지 않음
+    assert pool.free_count() == 0
+    subscription.release_frame(stream)
+    assert pool.free_count() == 0
+    assert np.all(snapshot_frame == 0)  # 다른 소비자가 쓰는 동안 내용 유지
+
+    subscription.release_frame(snapshot)
+    assert pool.free_count() == 1
+    subscription.release_frame(snapshot)  # 이미 반환한 소비자는 아무것도 하지 않음
+    assert pool.acquire(SHAPE).array is pooled.array
+
+
+def test_next_read_and_release_return_held_frames():
+    pool = FramePool("test")
+    capture = RingCapture(pool)
+    subscription = CameraSubscription(capture)
+
+    capture.push()
+    subscription.read()
+    capture.push()
+    subscription.read()  # 같은 소비자의 다음 read()가 이전 프레임을 반환
+    assert pool.free_count() == 1
+
+    token = object()
+    subscription.read(consumer=token)
+    subscription.release()  # 구독 해제는 모든 소비자의 프레임을 반환
+    capture.frame.release()
+    assert pool.free_count() == 2
@@ -0,0 +1,74 @@
+import math
+
+import cv2
+import numpy as np
+import pytest
+
+from service.head_pose import MODEL_POINTS, POSE_LANDMARKS, HeadPoseEstimator, camera_model
+
+FRAME_SIZE = (480, 640)
+
+
+def project(yaw_rotation, pitch_rotation, distance=1000.0):
+    """
+    3D 얼굴 모델을 카메라 좌표계에서 회전시켜 투영한 (68, 2) 랜드마크 (포즈에 쓰는 6점만 채움)
+    - yaw_rotation: y축(아래 방향) 기준 회전 각도, pitch_rotation: x축(오른쪽 방향) 기준 회전 각도 (도)
+    """
+    yaw, pitch = math.radians(yaw_rotation), math.radians(pitch_rotation)
+    rotation_y = np.array([
+        [math.cos(yaw), 0.0, math.sin(yaw)],
+        [0.0, 1.0, 0.0],
+        [-math.sin(yaw), 0.0, math.cos(yaw)],
+    ])
+    rotation_x = np.array([
+        [1.0, 0.0, 0.0],
+        [0.0, math.cos(pitch), -math.sin(pitch)],
+        [0.0, math.sin(pitch), math.cos(pitch)],
+    ])
+    rvec, _ = cv2.Rodrigues(rotation_y @ rotation_x)
+    matrix, distortion = camera_model(FRAME_SIZE[1], FRAME_SIZE[0])
+    points, _ = cv2.projectPoints(MODEL_POINTS, rvec, np.array([0.0, 0.0, distance]), matrix, distortion)
+    landmarks = np.zeros((68, 2), dtype=np.float64)
+    landmarks[POSE_LANDMARKS] = points.reshape(-1, 2)
+    return landmarks
+
+
+def nose_offset(landmarks):
+    """눈 바깥쪽 끝 중점 기준 코끝 위치 (x: 화면 오른쪽 +, y: 아래 +)"""
+    eyes = (landmarks[36] + landmarks[45]) / 2.0
+    return landmarks[30] - eyes
+
+
+@pytest.mark.parametrize("yaw_rotation, pitch_rotation", [(0, 0), (-20, 0), (25, 0), (0, 15), (0, -10), (-15, 10)])
+def test_recovers_projected_angles(yaw_rotation, pitch_rotation):
+    yaw, pitch, roll = HeadPoseEstimator().estimate(project(yaw_rotation, pitch_rotation), FRAME_SIZE)
+    # 화면 오른쪽으로 돌리면 yaw +가 되도록 y축 회전 부호를 뒤집음
+    assert yaw == pytest.approx(-yaw_rotation, abs=0.5)
+    assert pitch == pytest.approx(pitch_rotation, abs=0.5)
+    assert roll == pytest.approx(0.0, abs=0.5)
+
+
+def test_turning_right_is_positive_yaw():
+    landmarks = project(-20, 0)
+    assert nose_offset(landmarks)[0] > 0  # 코끝이 화면 오른쪽으로 이동
+    yaw, _, _ = HeadPoseEstimator().estimate(landmarks, FRAME_SIZE)
+    assert yaw > 15
+
+
+def test_bowing_head_is_positive_pitch():
+    front = nose_offset(project(0, 0))
+    landmarks = project(0, 15)
+    assert nose_offset(landmarks)[1] > front[1]  # 고개를 숙이면 코끝이 눈보다 더 아래로
+    _, pitch, _ = HeadPoseEstimator().estimate(landmarks, FRAME_SIZE)
+    assert pitch > 10
+
+
+def test_previous_pose_guess_converges_to_new_pose():
+    estimator = HeadPoseEstimator()
+    estimator.estimate(project(-20, 0), FRAME_SIZE)
+    # 직전 프레임 자세를 초기값으로 풀어도 새 자세로 수렴
+    yaw, pitch, _ = estimator.estimate(project(10, 5), FRAME_SIZE)
+    assert yaw == pytest.approx(-10, abs=0.5)
+    assert pitch == pytest.approx(5, abs=0.5)
+    assert estimator.estimate_all([], FRAME_SIZE) == []
+    assert estimator._guesses == {}
@@ -0,0 +1,54 @@
+from config.metrics import MetricsRegistry, get_registry
+
+
+def test_render_counter_and_gauge():
+    registry = MetricsRegistry()
+    frames = registry.counter("test_frames_total", "처리한 프레임 수", ("stage",))
+    frames.labels("detect").inc()
+    frames.labels("detect").inc(2)
+    frames.labels('a"b').inc()
+    registry.gauge("test_connections", "연결 수", ("topic",)).set_function(lambda: {"monitoring": 3})
+
+    assert registry.render() == (
+        "# HELP test_frames_total 처리한 프레임 수\n"
+        "# TYPE test_frames_total counter\n"
+        'test_frames_total{stage="detect"} 3.0\n'
+        'test_frames_total{stage="a\\"b"} 1.0\n'
+        "# HELP test_connections 연결 수\n"
+        "# TYPE test_connections gauge\n"
+        'test_connections{topic="monitoring"} 3.0\n'
+    )
+
+
+def test_render_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_seconds", "처리 시간", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP test_seconds 처리 시간", "# TYPE test_seconds histogram"]
+    assert lines[2:6] == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1.0"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 4.25",
+    ]
+    assert lines[6] == "test_seconds_count 4"
+
+
+def test_same_name_returns_existing_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("test_total", "횟수")
+    assert registry.counter("test_total", "횟수") is first
+
+
+def test_help_is_escaped_and_shared_metrics_render():
+    registry = MetricsRegistry()
+    registry.gauge("test_value", "줄\n바꿈 \\ 포함").set(1)
+    assert "# HELP test_value 줄\\n바꿈 \\\\ 포함\n" in registry.render()
+
+    # 서비스들이 쓰는 공통 메트릭도 모두 HELP / TYPE 줄이 있음
+    text = get_registry().render()
+    assert "# TYPE dms_pipeline_stage_seconds histogram" in text
+    assert text.endswith("\n")
@@ -0,0 +1,61 @@
+import numpy as np
+
+from service.monitoring_scheduler import MonitoringScheduler, MotionPresence
+
+
+def frame(value):
+    return np.full((480, 640, 3), value, dtype=np.uint8)
+
+
+def idle_scheduler(**kwargs):
+    """얼굴이 없는 채로 idle_after초가 지나 idle 모드가 된 스케줄러 (t=10에 전환)"""
+    scheduler = MonitoringScheduler("test", idle_after=3.0, idle_fps=2.0, **kwargs)
+    scheduler.last_face_time = 7.0
+    assert scheduler.record(False, now=10.0) == MonitoringScheduler.IDLE
+    return scheduler
+
+
+def test_idle_skips_still_frames_until_next_tick():
+    scheduler = idle_scheduler(presence_threshold=6)
+    assert scheduler.checks_presence
+    assert not scheduler.should_analyze(frame(50), now=10.1)  # 첫 프레임은 움직임 기준
+    assert not scheduler.should_analyze(frame(51), now=10.2)
+    assert scheduler.should_analyze(frame(51), now=10.5)  # 저주기(2fps) 탐지 시각
+
+
+def test_motion_in_idle_triggers_detection_on_the_same_frame():
+    scheduler = idle_scheduler(presence_threshold=6)
+    scheduler.should_analyze(frame(50), now=10.03)
+    # 운전자가 들어오는 프레임은 idle 주기(0.5초)를 기다리지 않고 바로 탐지
+    assert scheduler.should_analyze(frame(120), now=10.07)
+    assert scheduler.record(True, now=10.08) == MonitoringScheduler.ACTIVE
+    assert scheduler.delay(now=10.09) == 0.0
+    assert scheduler.should_analyze(frame(120), now=10.1)
+
+
+def test_presence_check_can_be_disabled():
+    scheduler = idle_scheduler(presence_threshold=0)
+    assert not scheduler.checks_presence
+    assert scheduler.delay(now=10.1) > 0
+    assert not scheduler.should_analyze(frame(200), now=10.1)
+
+
+def test_active_mode_analyzes_every_frame():
+    scheduler = MonitoringScheduler("test", idle_after=3.0, idle_fps=2.0)
+    scheduler.last_face_time = 0.0
+    assert scheduler.record(False, now=1.0) == MonitoringScheduler.ACTIVE
+    assert scheduler.delay(now=1.01) == 0.0
+    assert scheduler.should_analyze(frame(0), now=1.01)
+
+
+def test_motion_presence_ignores_sensor_noise():
+    presence = MotionPresence(threshold=6)
+    rng = np.random.default_rng(0)
+    base = rng.integers(60, 200, (480, 640, 3), dtype=np.uint8)
+    noisy = np.clip(base.astype(np.int16) + rng.integers(-4, 5, base.shape), 0, 255).astype(np.uint8)
+    assert not presence.changed(base)
+    assert not presence.changed(noisy)
+
+    moved = noisy.copy()
+    moved[100:400, 200:450] = 0  # 화면 일부를 가리는 물체
+    assert presence.changed(moved)
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("dlib")
+
+from service import monitoring_session_service
+from service.monitoring_session_service import (
+    DEFAULT_SESSION_ID, MonitoringSessionManager, SessionLimitError, validate_camera_source)
+
+
+class FakeSession:
+    """카메라 / 모델 없이 세션 수만 세는 세션"""
+    def __init__(self, session_id, camera_source=None, thresholds=None):
+        self.session_id = session_id
+        self.camera_source = camera_source
+
+    def stop_monitoring(self):
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(monitoring_session_service, "MonitoringService", FakeSession)
+    return MonitoringSessionManager(max_sessions=2)
+
+
+@pytest.mark.parametrize("source, expected", [(None, None), (0, 0), (3, 3), ("1", 1)])
+def test_device_indexes_are_allowed(source, expected):
+    assert validate_camera_source(source) == expected
+
+
+@pytest.mark.parametrize("source", [
+    "file:/etc/passwd", "images:/", "/etc/passwd", "synthetic", "device:0", -1, 10, True, 1.5, "",
+])
+def test_other_sources_are_rejected(source):
+    with pytest.raises(ValueError):
+        validate_camera_source(source)
+
+
+def test_allowlisted_names_are_allowed(monkeypatch):
+    monkeypatch.setattr(monitoring_session_service, "ALLOWED_CAMERA_SOURCES", {"file:drive.mp4", "synthetic"})
+    assert validate_camera_source("file:drive.mp4") == "file:drive.mp4"
+    assert validate_camera_source("synthetic") == "synthetic"
+    with pytest.raises(ValueError):
+        validate_camera_source("file:other.mp4")
+
+
+def test_create_rejects_source_before_creating_session(manager):
+    with pytest.raises(ValueError):
+        manager.create("seat-1", "file:/etc/passwd")
+    assert manager.get("seat-1") is None
+
+
+def test_session_count_is_capped(manager):
+    manager.create("seat-1", 0)
+    manager.create("seat-2", 1)
+    with pytest.raises(SessionLimitError):
+        manager.create("seat-3", 2)
+
+    # 기본 세션은 제한과 관계없이 만들 수 있음
+    assert manager.default().session_id == DEFAULT_SESSION_ID
+
+    # 세션을 지우면 다시 만들 수 있음
+    assert manager.remove("seat-1")
+    assert manager.create("seat-3", 2).camera_source == 2
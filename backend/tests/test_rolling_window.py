@@ -0,0 +1,68 @@
+import pytest
+
+from service.drowsiness_state import DrowsinessStateMachine
+from service.rolling_window import DrowsinessWindows, RollingWindow
+
+
+def test_old_bins_expire_as_time_advances():
+    window = RollingWindow(window=5.0)
+    window.add(0.5, 2.0)
+    window.add(2.5, 1.0)
+    assert window.total() == 3.0
+    assert window.total(4.9) == 3.0
+    assert window.total(5.2) == 1.0  # 0초 칸이 창을 벗어남 (경계 오차는 최대 한 칸)
+    assert window.total(7.2) == 0.0
+
+
+def test_gap_longer_than_window_clears_everything():
+    window = RollingWindow(window=5.0)
+    for t in range(5):
+        window.add(t + 0.5, 1.0)
+    assert window.total() == 5.0
+    window.add(100.0, 1.0)
+    assert window.total() == 1.0
+    assert window._bins.count(0.0) == window.size - 1
+
+
+def test_small_step_back_stays_in_window():
+    window = RollingWindow(window=5.0)
+    window.add(10.5, 1.0)
+    window.add(8.5, 1.0)  # 창 안의 과거 -> 그 칸에 더함
+    assert window.total() == 2.0
+    assert window.total(13.5) == 1.0  # 8초 칸이 먼저 만료
+    assert window.total(10.0) == 1.0  # 시간이 거꾸로 가도 이미 만료된 값은 되살아나지 않음
+
+
+def test_large_step_back_restarts_window():
+    window = RollingWindow(window=5.0)
+    window.add(100.5, 1.0)
+    # 영상을 처음부터 다시 재생 (시계가 창보다 크게 거꾸로 감) -> 이후 샘플이 무시되지 않음
+    window.add(0.5, 1.0)
+    window.add(1.5, 1.0)
+    assert window.total() == 2.0
+    assert window.total(5.5) == 1.0  # 다시 시작한 시각 기준으로 만료
+
+
+def test_perclos_expires_after_window():
+    windows = DrowsinessWindows(perclos_window=10.0)
+    for i in range(1, 101):
+        t = i * 0.1
+        windows.add_sample(t, 0.1, 0.1 if t <= 5.0 else 0.0)
+    assert windows.perclos(10.0) == pytest.approx(0.5, abs=0.1)  # 창 경계 오차 한 칸
+    # 눈 감은 구간(0~5초)이 창을 벗어나면 PERCLOS도 0으로 떨어짐
+    for i in range(101, 161):
+        windows.add_sample(i * 0.1, 0.1, 0.0)
+    assert windows.perclos(16.0) == 0.0
+
+
+def test_window_size_change_takes_effect_after_first_sample():
+    machine = DrowsinessStateMachine()
+    machine.update(0.0, 0.30, 0.30)
+    assert machine.metrics()["windows"]["perclos"] == machine.PERCLOS_WINDOW
+
+    # 세션 임계값으로 첫 샘플 뒤에 윈도우 크기를 바꿔도 다음 샘플부터 반영
+    machine.PERCLOS_WINDOW = 20
+    machine.BLINK_WINDOW = 30
+    assert machine.metrics()["windows"] == {"perclos": 20.0, "blink": 30.0, "yawn": machine.YAWN_WINDOW}
+    machine.update(0.1, 0.30, 0.30)
+    assert machine.windows.sizes() == (20.0, 30.0, float(machine.YAWN_WINDOW))
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+
+from service import startup_service
+from service.startup_service import FAILED, PENDING, READY, RouterGateMiddleware, StartupManager
+
+
+class FakeRouter:
+    def __init__(self, on_startup=()):
+        self.on_startup = list(on_startup)
+
+
+class FakeApp:
+    openapi_schema = None
+
+    def __init__(self):
+        self.routers = []
+
+    def include_router(self, router):
+        self.routers.append(router)
+
+
+def install_module(monkeypatch, name, load):
+    """import할 때마다 load()를 호출하는 router 속성을 가진 가짜 컨트롤러 모듈"""
+    class RouterModule(types.ModuleType):
+        @property
+        def router(self):
+            return load()
+
+    monkeypatch.setitem(sys.modules, name, RouterModule(name))
+
+
+@pytest.fixture
+def manager():
+    return StartupManager(routers=[("fake_monitoring", "/monitoring")], checks={})
+
+
+def test_router_prefix_matches_on_path_boundary(manager):
+    assert manager.pending_router("/monitoring") == "fake_monitoring"
+    assert manager.pending_router("/monitoring/ws") == "fake_monitoring"
+    assert manager.pending_router("/monitoringfoo") is None
+    assert manager.pending_router("/healthz") is None
+
+
+def test_rejection_follows_router_state(manager):
+    status, body, headers = manager.rejection("/monitoring/status")
+    assert (status, body["pending"], headers) == (503, "fake_monitoring", [(b"retry-after", b"1")])
+
+    component = manager.components["fake_monitoring"]
+    component.state, component.error = FAILED, "db down"
+    status, body, headers = manager.rejection("/monitoring/status")
+    assert (status, body["failed"], body["error"]) == (500, "fake_monitoring", "db down")
+    assert manager.status()["failed"] == ["fake_monitoring"]
+
+    component.state = READY
+    assert manager.rejection("/monitoring/status") is None
+
+
+def test_failed_router_is_retried_without_adding_routes_twice(manager, monkeypatch):
+    attempts = []
+
+    def load():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("db down")
+        return FakeRouter()
+
+    install_module(monkeypatch, "fake_monitoring", load)
+    monkeypatch.setattr(startup_service, "CHECK_RETRY_INTERVAL", 0)
+    app = FakeApp()
+
+    async def scenario():
+        assert not await manager._load_router(app, "fake_monitoring")
+        assert manager.components["fake_monitoring"].state == FAILED
+        await manager._retry_routers(app, ["fake_monitoring"])
+
+    asyncio.run(scenario())
+    component = manager.components["fake_monitoring"]
+    assert component.state == READY
+    assert component.error is None
+    assert component.attempts == 3
+    assert len(app.routers) == 1
+
+
+def test_failed_startup_handler_marks_router_failed(manager, monkeypatch):
+    calls = []
+
+    def on_startup():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("pool not ready")
+
+    router = FakeRouter([on_startup])
+    install_module(monkeypatch, "fake_monitoring", lambda: router)
+    app = FakeApp()
+
+    async def scenario():
+        assert not await manager._load_router(app, "fake_monitoring")
+        assert manager.components["fake_monitoring"].state == FAILED
+        assert manager.components["fake_monitoring"].error == "startup: pool not ready"
+        assert await manager._load_router(app, "fake_monitoring")
+
+    asyncio.run(scenario())
+    assert manager.components["fake_monitoring"].state == READY
+    assert app.routers == [router]  # 다시 로드해도 라우트는 한 번만 추가
+
+
+def test_service_check_backs_off_up_to_cap(manager, monkeypatch):
+    monkeypatch.setattr(startup_service, "CHECK_RETRY_INTERVAL", 10)
+    monkeypatch.setattr(startup_service, "CHECK_RETRY_MAX_INTERVAL", 30)
+    failures = iter([True, True, True, True, False])
+    sleeps = []
+
+    def check():
+        if next(failures):
+            raise ConnectionError("refused")
+
+    def sleep(seconds):
+        # 재시도를 기다리는 동안 /readyz에는 실패 상태와 오류가 보임
+        component = manager.components["mysql"]
+        assert component.state == FAILED and component.error == "refused"
+        assert component.to_dict()["retry_in"] is not None
+        sleeps.append(seconds)
+
+    manager._check("mysql", check, sleep=sleep)
+    component = manager.components["mysql"]
+    assert sleeps == [10, 20, 30, 30]
+    assert component.state == READY
+    assert component.attempts == 5
+    assert component.to_dict()["retry_in"] is None
+
+
+def run_gate(manager, scope, received=()):
+    sent = []
+    app_calls = []
+
+    async def app(scope, receive, send):
+        app_calls.append(scope["path"])
+
+    messages = list(received)
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(RouterGateMiddleware(app, manager)(scope, receive, send))
+    return sent, app_calls
+
+
+def test_gate_rejects_pending_http_route(manager):
+    sent, app_calls = run_gate(manager, {"type": "http", "path": "/monitoring/status"})
+    assert app_calls == []
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"1") in sent[0]["headers"]
+    assert json.loads(sent[1]["body"])["pending"] == "fake_monitoring"
+
+
+def test_gate_rejects_pending_websocket_route(manager):
+    scope = {"type": "websocket", "path": "/monitoring/ws", "extensions": {"websocket.http.response": {}}}
+    sent, app_calls = run_gate(manager, scope, [{"type": "websocket.connect"}])
+    assert app_calls == []
+    assert sent[0]["type"] == "websocket.http.response.start"
+    assert sent[0]["status"] == 503
+
+    # 거절 응답 확장이 없는 서버는 close 코드로 알림
+    scope = {"type": "websocket", "path": "/monitoring/ws"}
+    sent, _ = run_gate(manager, scope, [{"type": "websocket.connect"}])
+    assert sent == [{"type": "websocket.close", "code": 1013}]
+
+    manager.components["fake_monitoring"].state = FAILED
+    sent, _ = run_gate(manager, scope, [{"type": "websocket.connect"}])
+    assert sent == [{"type": "websocket.close", "code": 1011}]
+
+
+def test_gate_passes_ready_and_unrelated_routes(manager):
+    _, app_calls = run_gate(manager, {"type": "websocket", "path": "/ws"})
+    assert app_calls == ["/ws"]
+
+    manager.components["fake_monitoring"].state = READY
+    _, app_calls = run_gate(manager, {"type": "http", "path": "/monitoring/status"})
+    assert app_calls == ["/monitoring/status"]
+    assert manager.components["fake_monitoring"].state != PENDING
@@ -0,0 +1,48 @@
+from service.status_service import StatusPublisher
+
+
+def make_publisher(history_size=100):
+    state = {"status": 0}
+    publisher = StatusPublisher(lambda: dict(state), manager=None, topic="monitoring", history_size=history_size)
+    return publisher, state
+
+
+def publish(publisher, state, count):
+    for _ in range(count):
+        state["status"] += 1
+        publisher.check()
+
+
+def seqs(events):
+    return [event["seq"] for event in events]
+
+
+def test_unchanged_state_is_not_published():
+    publisher, state = make_publisher()
+    assert publisher.check()["seq"] == 1
+    assert publisher.check() is None
+    assert publisher.seq == 1
+
+
+def test_resume_returns_missed_events():
+    publisher, state = make_publisher()
+    publish(publisher, state, 5)
+    assert seqs(publisher.events_since(2)) == [3, 4, 5]
+    assert seqs(publisher.events_since(0)) == [1, 2, 3, 4, 5]
+    assert publisher.events_since(5) == []  # 놓친 이벤트 없음
+
+
+def test_resume_after_history_eviction_needs_snapshot():
+    publisher, state = make_publisher(history_size=3)
+    publish(publisher, state, 6)  # 보관 중인 이벤트는 4, 5, 6
+    assert publisher.events_since(1) is None
+    assert publisher.events_since(2) is None
+    assert seqs(publisher.events_since(3)) == [4, 5, 6]
+
+
+def test_resume_from_future_seq_needs_snapshot():
+    publisher, state = make_publisher()
+    publish(publisher, state, 3)
+    # 서버 재시작 전 seq로 다시 연결한 클라이언트
+    assert publisher.events_since(10) is None
+    assert publisher.snapshot_message()["seq"] == 3
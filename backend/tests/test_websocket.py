@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from config import websocket as websocket_config
+from config.websocket import ClientConnection, ConnectionManager, DISCONNECT, DROP_OLDEST, LATEST
+
+
+class SlowWebSocket:
+    """gate가 열릴 때까지 send_text에서 멈추는 느린 클라이언트"""
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.sent = []
+        self.closed_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.gate.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_code = code
+
+
+async def fill_slow_client(policy, queue_size=3, count=6):
+    """첫 메시지 전송이 멈춘 동안 메시지 count개를 더 넣음 -> (연결, 소켓, 닫힘 콜백 기록)"""
+    websocket = SlowWebSocket()
+    closed = []
+    client = ClientConnection(websocket, queue_size, policy, on_close=closed.append)
+    client.start()
+    client.put("m0")
+    await asyncio.sleep(0)  # writer가 m0을 꺼내서 send_text에서 대기
+    for i in range(1, count):
+        client.put(f"m{i}")
+    return client, websocket, closed
+
+
+async def drain(client, websocket):
+    websocket.gate.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    client.close()
+
+
+def test_drop_oldest_keeps_newest_messages():
+    async def scenario():
+        client, websocket, closed = await fill_slow_client(DROP_OLDEST)
+        assert list(client.queue) == ["m3", "m4", "m5"]
+        assert client.dropped == 2
+        await drain(client, websocket)
+        return websocket, closed
+
+    websocket, closed = asyncio.run(scenario())
+    assert websocket.sent == ["m0", "m3", "m4", "m5"]
+    assert closed == []
+
+
+def test_latest_discards_backlog():
+    async def scenario():
+        client, websocket, closed = await fill_slow_client(LATEST)
+        # m1~m3으로 가득 찬 상태에서 m4가 오면 대기 중인 메시지를 모두 버림
+        assert list(client.queue) == ["m4", "m5"]
+        assert client.dropped == 3
+        await drain(client, websocket)
+        return websocket, closed
+
+    websocket, closed = asyncio.run(scenario())
+    assert websocket.sent == ["m0", "m4", "m5"]
+    assert closed == []
+
+
+def test_disconnect_closes_slow_client():
+    async def scenario():
+        client, websocket, closed = await fill_slow_client(DISCONNECT)
+        await asyncio.sleep(0)  # 소켓 종료 태스크 실행
+        assert client.closed
+        assert client.queue_depth() == 0
+        client.put("after")  # 닫힌 연결에는 더 넣지 않음
+        assert client.queue_depth() == 0
+        return websocket, closed
+
+    websocket, closed = asyncio.run(scenario())
+    assert closed == [websocket]
+    assert websocket.closed_code == 1013
+    assert websocket.sent == []
+
+
+def test_publish_serializes_once_per_topic(monkeypatch):
+    calls = []
+    dumps = websocket_config.json.dumps
+
+    def counting_dumps(message):
+        calls.append(message)
+        return dumps(message)
+
+    monkeypatch.setattr(websocket_config.json, "dumps", counting_dumps)
+
+    async def scenario():
+        manager = ConnectionManager()
+        sockets = [SlowWebSocket() for _ in range(3)]
+        for websocket in sockets:
+            websocket.gate.set()
+            await manager.connect(websocket, "monitoring")
+        other = SlowWebSocket()
+        other.gate.set()
+        await manager.connect(other, "face-status")
+
+        manager.publish("monitoring", {"type": "status", "seq": 1})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        for websocket in sockets + [other]:
+            manager.disconnect(websocket)
+        return sockets, other
+
+    sockets, other = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [websocket.sent for websocket in sockets] == [['{"type": "status", "seq": 1}']] * 3
+    assert other.sent == []  # 다른 토픽 구독자에게는 보내지 않음
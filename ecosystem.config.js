@@ -26,8 +26,10 @@ module.exports = {
       autorestart: true,
       disable_metrics: true,
       env: {
-        "SKIP_CAMERA": "true",
-        "LOG_LEVEL": "ERROR"
+        "SKIP_CAMERA": "false", // true면 카메라 장치 대신 합성 영상 사용 (카메라 없는 개발 서버용, CAMERA_SOURCE로 영상 파일/이미지 폴더 지정 가능)
+        "LOG_LEVEL": "ERROR",
+        "VISION_WORKERS": "0", // dlib 탐지/랜드마크/임베딩 워커 프로세스 수 (0이면 사용 안 함, 측정 후 켜기)
+        "MODEL_WARM_UP": "landmark_68,face_recognition" // 시작 시 백그라운드로 미리 로드할 모델 (비우면 첫 사용 시 로드)
       }
     }
   ]
@@ -47,6 +47,9 @@ class DepthValidator:
         self.color_thread = None
 
         self.frame_timeout = 200  # 타임아웃을 200ms로 증가
+
+        # 추론 시간 콜백 (초 단위 추론 시간을 인자로 호출, 백엔드 메트릭 기록용)
+        self.on_inference = None
         
     def start(self):
         """모든 센서와 스레드를 시작"""
@@ -126,6 +129,8 @@ class DepthValidator:
                 start_time = time.time()
                 predicted_depth_m = self.depth_predictor.get_depth_metric()
                 inference_time = time.time() - start_time
+                if self.on_inference is not None:
+                    self.on_inference(inference_time)
                 
                 if predicted_depth_m is not None:
                     try: